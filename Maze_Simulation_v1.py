@@ -1,10 +1,17 @@
-import pygame
 import random
 import sys
 import math
+import time
+from collections import deque
+
+try:
+    import pygame
+except ImportError:  # 无界面运行（simulation.py）时可以不安装pygame
+    pygame = None
 
 # 初始化pygame
-pygame.init()
+if pygame is not None:
+    pygame.init()
 
 # 常量定义
 WINDOW_WIDTH = 800
@@ -24,29 +31,224 @@ LIGHT_BLUE = (100, 150, 255)
 YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 
+# 方向定义（与Robot.direction一致）：0=上，1=右，2=下，3=左
+DIRECTION_DELTAS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+DELTA_TO_DIRECTION = {delta: d for d, delta in enumerate(DIRECTION_DELTAS)}
+
+# 邻居遍历顺序
+ORDER_RDLU = (1, 2, 3, 0)  # 右、下、左、上
+ORDER_UDLR = (0, 2, 3, 1)  # 上、下、左、右
+
+# 邻接掩码 -> 邻居偏移列表（每种遍历顺序一张16项的表）
+NEIGHBOR_TABLES = {
+    order: [tuple(DIRECTION_DELTAS[d] for d in order if (mask >> d) & 1) for mask in range(16)]
+    for order in (ORDER_RDLU, ORDER_UDLR)
+}
+
+# 字节 -> 8个0/1字节（低位在前），用于整行解包墙壁位图
+BYTE_TO_BITS = [bytes((byte >> i) & 1 for i in range(8)) for byte in range(256)]
+BITS_TO_BYTE = {bits: byte for byte, bits in enumerate(BYTE_TO_BITS)}
+
+# 四方向墙壁掩码 -> 四方向通路掩码
+INVERT_NIBBLE = bytes(15 - (i & 15) for i in range(256))
+
+# 格子数不少于这个值时距离表用NumPy波前距离变换计算（小迷宫直接BFS更快）
+WAVEFRONT_CELLS = 1 << 16
+
+
+class WallBits:
+    """墙壁位图：每条墙边占1个比特，每行按字节对齐，查询和修改都是O(1)"""
+
+    def __init__(self, lines, width, buffer=None):
+        self.lines = lines  # 行数（水平墙为rows+1，垂直墙为rows）
+        self.width = width  # 每行的墙边数（水平墙为cols，垂直墙为cols+1）
+        self.stride = (width + 7) // 8  # 每行占用的字节数
+        if buffer is None:
+            buffer = bytearray(self.stride * lines)
+        self.data = buffer
+
+    def get(self, line, pos):
+        """读取(line, pos)处是否有墙"""
+        return (self.data[line * self.stride + (pos >> 3)] >> (pos & 7)) & 1
+
+    def set(self, line, pos, value=True):
+        """设置(line, pos)处的墙，返回是否真正发生了变化"""
+        index = line * self.stride + (pos >> 3)
+        bit = 1 << (pos & 7)
+        old = self.data[index]
+        new = (old | bit) if value else (old & ~bit)
+        if new == old:
+            return False
+        self.data[index] = new
+        return True
+
+    def unpack_line(self, line):
+        """把一行位图解包成每条墙边一个0/1字节"""
+        base = line * self.stride
+        bits = b''.join([BYTE_TO_BITS[byte] for byte in self.data[base:base + self.stride]])
+        return bits[:self.width]
+
+    def store_line(self, line, values):
+        """用一组0/1值整体覆盖一行位图"""
+        padded = bytes(values) + bytes(self.stride * 8 - self.width)
+        base = line * self.stride
+        self.data[base:base + self.stride] = bytes(
+            [BITS_TO_BYTE[padded[i:i + 8]] for i in range(0, len(padded), 8)])
+
+    def in_range(self, line, pos):
+        """检查坐标是否在位图范围内"""
+        return 0 <= line < self.lines and 0 <= pos < self.width
+
+    def clear(self):
+        """清空所有墙壁"""
+        self.data[:] = bytes(len(self.data))
+
+    def fill(self):
+        """把所有墙边都设为有墙"""
+        self.store_line(0, b'\x01' * self.width)
+        self.data[:] = bytes(self.data[:self.stride]) * self.lines
+
+    def copy(self):
+        """复制位图（总是复制到新的bytearray）"""
+        return WallBits(self.lines, self.width, bytearray(self.data))
+
+    def load(self, other):
+        """从另一个同尺寸位图复制内容"""
+        self.data[:] = other.data
+
+    def iter_set(self):
+        """按行优先顺序遍历所有有墙的位置，整字节为0时直接跳过"""
+        data = self.data
+        stride = self.stride
+        for line in range(self.lines):
+            base = line * stride
+            for offset in range(stride):
+                byte = data[base + offset]
+                while byte:
+                    low = byte & -byte
+                    pos = (offset << 3) + low.bit_length() - 1
+                    if pos < self.width:
+                        yield (line, pos)
+                    byte ^= low
+
+    def count(self):
+        """统计墙壁数量"""
+        return sum(bin(byte).count('1') for byte in self.data)
+
+
+class WallListView:
+    """兼容旧接口的墙壁列表视图：maze.walls['horizontal']等仍可像列表一样使用"""
+
+    def __init__(self, maze, kind):
+        self.maze = maze
+        self.kind = kind
+
+    def __contains__(self, pos):
+        return self.maze.has_wall(self.kind, pos)
+
+    def __iter__(self):
+        return self.maze.wall_bits(self.kind).iter_set()
+
+    def __len__(self):
+        return self.maze.wall_bits(self.kind).count()
+
+    def __eq__(self, other):
+        return sorted(self) == sorted(other)
+
+    def append(self, pos):
+        self.maze.set_wall(self.kind, pos)
+
+    def extend(self, positions):
+        for pos in positions:
+            self.maze.set_wall(self.kind, pos)
+
+    def remove(self, pos):
+        if not self.maze.remove_wall(self.kind, pos):
+            raise ValueError(f"{pos} not in walls['{self.kind}']")
+
+    def copy(self):
+        return list(self)
+
+
 class Maze:
-    def __init__(self):
-        self.grid = [[0 for _ in range(MAZE_SIZE)] for _ in range(MAZE_SIZE)]
-        # 按照精确位置设置所有特殊标记点
-        self.castle = (7, 4)  # 城堡位置（起点）
-        self.goal = (0, 3)    # 棋盘格终点
-        self.robot_pos = (7, 4)  # 机器人位置（在绿色方块起点上）
-        
-        # 数字方块位置
-        self.numbered_squares = {
-            1: (7, 6),  # 数字1
-            2: (6, 1),  # 数字2
-            3: (2, 1),  # 数字3
-            4: (0, 7)   # 数字4
-        }
-        
-        # 字母圆圈位置
-        self.lettered_circles = {
-            'A': (7, 3),  # 字母A
-            'B': (4, 0),  # 字母B
-            'C': (0, 0),  # 字母C
-            'D': (3, 5)   # 字母D
-        }
+    def __init__(self, rows=MAZE_SIZE, cols=None, generate=True):
+        # 迷宫尺寸（支持rows x cols的矩形迷宫）
+        self.rows = rows
+        self.cols = rows if cols is None else cols
+        if self.rows < 1 or self.cols < 1 or self.rows * self.cols < 2:
+            raise ValueError(f"迷宫至少需要两个格子（起点和终点不能重合），收到{self.rows}x{self.cols}")
+        # 墙壁位图：水平墙(行, 列)的行取0..rows，垂直墙(行, 列)的列取0..cols
+        self.h_walls = WallBits(self.rows + 1, self.cols)
+        self.v_walls = WallBits(self.rows, self.cols + 1)
+        # 墙壁版本号：墙壁每真正变化一次就加1
+        self.version = 0
+        # 邻接索引：每个格子一个字节，第d位为1表示可以向方向d移动
+        self.open_masks = bytearray(self.rows * self.cols)
+        self.index_version = -1  # 邻接索引对应的墙壁版本
+        # 通路掩码 -> 一维格子下标的偏移（右、下、左、上）
+        self.mask_steps = [tuple(dr * self.cols + dc for dr, dc in offsets)
+                           for offsets in NEIGHBOR_TABLES[ORDER_RDLU]]
+        # 连通分量：每个格子的分量编号 + 分量编号上的并查集
+        # 移除墙壁时原地合并两个分量，添加墙壁后在下次查询时重新标记
+        self.component_labels = None
+        self.components = None
+        self.components_version = -1
+        # ALT地标（planners.Landmarks），记录建立时的墙壁版本，过期后下次查询时重建
+        self.landmarks = None
+        # 当前墙壁版本上启发式查询的次数（查询足够多时才建立地标）
+        self.heuristic_queries = 0
+        self.heuristic_version = -1
+        # 分层规划器（planners.HierarchicalPlanner），通过墙壁监听器自己保持最新
+        self.hierarchy = None
+        # 走廊收缩图（planners.JunctionGraph），记录建立时的墙壁版本
+        self.junctions = None
+        # 墙壁变化监听器：set_wall真正改变一条墙边后调用listener(kind, pos, present)
+        # 整体替换墙壁（生成、读取文件）不逐条通知，监听器通过版本号跳变发现
+        self.wall_listeners = []
+        
+        # 绘制尺寸：格子不足4像素时整张迷宫按比例缩放绘制
+        self.cell_size = max(1, min(WINDOW_WIDTH // self.cols, WINDOW_HEIGHT // self.rows))
+        if self.cell_size >= 4:
+            self.cell_pixels = self.cell_size
+        else:
+            self.cell_pixels = min(WINDOW_WIDTH / self.cols, WINDOW_HEIGHT / self.rows)
+        # 静态图层缓存（格子、网格线、墙壁），墙壁变化后才重绘
+        self.static_layer = None
+        self.static_layer_version = -1
+        
+        # 只有8x8迷宫使用图片中的精确布局和特殊标记
+        self.is_exact_layout = (self.rows, self.cols) == (MAZE_SIZE, MAZE_SIZE)
+        if self.is_exact_layout:
+            # 按照精确位置设置所有特殊标记点
+            self.castle = (7, 4)  # 城堡位置（起点）
+            self.goal = (0, 3)    # 棋盘格终点
+            self.robot_pos = (7, 4)  # 机器人位置（在绿色方块起点上）
+            
+            # 数字方块位置
+            self.numbered_squares = {
+                1: (7, 6),  # 数字1
+                2: (6, 1),  # 数字2
+                3: (2, 1),  # 数字3
+                4: (0, 7)   # 数字4
+            }
+            
+            # 字母圆圈位置
+            self.lettered_circles = {
+                'A': (7, 3),  # 字母A
+                'B': (4, 0),  # 字母B
+                'C': (0, 0),  # 字母C
+                'D': (3, 5)   # 字母D
+            }
+        else:
+            # 其他尺寸：起点在底边中间，终点在顶边中间
+            self.castle = (self.rows - 1, self.cols // 2)
+            self.goal = (0, (self.cols - 1) // 2)
+            if self.goal == self.castle:
+                # 只有一行且列数为奇数时两个位置重合，终点改放在最左边
+                self.goal = (0, 0)
+            self.robot_pos = self.castle
+            self.numbered_squares = {}
+            self.lettered_circles = {}
         
         # 计时器
         self.timer = 0
@@ -57,28 +259,296 @@ class Maze:
         # 是否显示特殊标记（字母和数字）
         self.show_special_markers = True
         
-        # 生成严格按照新图片的迷宫
-        self.generate_exact_maze()
+        # generate=False时只创建空迷宫（例如从文件读取墙壁时）
+        if not generate:
+            return
+        
+        if self.is_exact_layout:
+            # 生成严格按照新图片的迷宫
+            self.generate_exact_maze()
+        else:
+            # 其他尺寸没有固定布局，生成随机迷宫
+            self.generate_random_maze()
         
         # 保存当前迷宫为原始迷宫
         self.save_as_original()
     
+    def save(self, path):
+        """保存为二进制迷宫文件（.mazb）"""
+        from maze_io import save_maze
+        save_maze(self, path)
+    
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        """从二进制迷宫文件读取迷宫，默认用mmap直接映射墙壁位图"""
+        from maze_io import load_maze
+        return load_maze(path, cls, use_mmap)
+    
+    @property
+    def walls(self):
+        """旧接口的墙壁字典视图（用于绘制和兼容），实际数据保存在位图中"""
+        return {
+            'horizontal': WallListView(self, 'horizontal'),
+            'vertical': WallListView(self, 'vertical')
+        }
+
+    @walls.setter
+    def walls(self, walls):
+        """用墙壁字典整体替换当前墙壁"""
+        self.clear_walls()
+        for kind in ('horizontal', 'vertical'):
+            for pos in walls.get(kind, []):
+                self.set_wall(kind, pos)
+
+    def wall_bits(self, kind):
+        """获取指定类型墙壁的位图"""
+        return self.h_walls if kind == 'horizontal' else self.v_walls
+
+    def has_wall(self, kind, pos):
+        """O(1)查询指定位置是否有墙"""
+        bits = self.wall_bits(kind)
+        row, col = pos
+        return bits.in_range(row, col) and bits.get(row, col) == 1
+
+    def set_wall(self, kind, pos, present=True):
+        """O(1)添加（或移除）墙壁，返回墙壁状态是否发生了变化"""
+        bits = self.wall_bits(kind)
+        row, col = pos
+        if not bits.in_range(row, col):
+            return False
+        if not bits.set(row, col, present):
+            return False
+        
+        if self.index_version == self.version:
+            # 索引是最新的，只需修补墙两侧的两个格子
+            self.patch_index(kind, row, col, present)
+            self.index_version = self.version + 1
+        if self.components_version == self.version and not present:
+            # 移除墙壁只会合并连通分量，直接合并墙两侧的格子
+            cells = self.wall_cells(kind, row, col)
+            if cells is not None:
+                self.components.union(self.component_labels[cells[0]], self.component_labels[cells[2]])
+            self.components_version = self.version + 1
+        self.version += 1
+        for listener in self.wall_listeners:
+            listener(kind, pos, present)
+        return True
+    
+    def add_wall_listener(self, listener):
+        """注册墙壁变化监听器"""
+        self.wall_listeners.append(listener)
+    
+    def remove_wall_listener(self, listener):
+        """注销墙壁变化监听器"""
+        if listener in self.wall_listeners:
+            self.wall_listeners.remove(listener)
+
+    def remove_wall(self, kind, pos):
+        """O(1)移除墙壁，返回是否真的移除了墙"""
+        return self.set_wall(kind, pos, False)
+
+    def clear_walls(self):
+        """清空所有墙壁"""
+        self.h_walls.clear()
+        self.v_walls.clear()
+        self.version += 1
+    
+    def fill_walls(self):
+        """把所有墙边都设为有墙（完美迷宫算法从这里开始打通）"""
+        self.h_walls.fill()
+        self.v_walls.fill()
+        self.version += 1
+    
+    def wall_cells(self, kind, row, col):
+        """内部墙两侧的格子，返回(第一个格子, 墙在其中的方向, 第二个格子, 墙在其中的方向)，边界墙返回None"""
+        cols = self.cols
+        if kind == 'horizontal':
+            if not 0 < row < self.rows:
+                return None
+            return (row - 1) * cols + col, 2, row * cols + col, 0  # 上方格子的下侧、下方格子的上侧
+        if not 0 < col < cols:
+            return None
+        return row * cols + col - 1, 1, row * cols + col, 3  # 左侧格子的右侧、右侧格子的左侧
+    
+    def patch_index(self, kind, row, col, present):
+        """单条墙边变化时修补邻接索引（边界墙在索引中始终不可通行）"""
+        cells = self.wall_cells(kind, row, col)
+        if cells is None:
+            return
+        first, first_dir, second, second_dir = cells
+        
+        if present:
+            self.open_masks[first] &= ~(1 << first_dir)
+            self.open_masks[second] &= ~(1 << second_dir)
+        else:
+            self.open_masks[first] |= 1 << first_dir
+            self.open_masks[second] |= 1 << second_dir
+    
+    def rebuild_index(self):
+        """按行重建邻接索引（整行位运算，不逐格查询墙壁）"""
+        cols = self.cols
+        closed = b'\x01' * cols
+        for row in range(self.rows):
+            up = self.h_walls.unpack_line(row) if row > 0 else closed
+            down = self.h_walls.unpack_line(row + 1) if row < self.rows - 1 else closed
+            vertical = bytearray(self.v_walls.unpack_line(row))
+            vertical[0] = vertical[cols] = 1  # 左右边界始终不可通行
+            
+            # 每个格子的四个方向墙壁组合成一个4位掩码，各位互不进位
+            walls = (int.from_bytes(up, 'little')
+                     | int.from_bytes(vertical[1:], 'little') << 1
+                     | int.from_bytes(down, 'little') << 2
+                     | int.from_bytes(vertical[:cols], 'little') << 3)
+            self.open_masks[row * cols:(row + 1) * cols] = walls.to_bytes(cols, 'little').translate(INVERT_NIBBLE)
+        
+        self.index_version = self.version
+    
+    def get_adjacency(self):
+        """获取最新的邻接索引（按一维下标row * cols + col存放）"""
+        if self.index_version != self.version:
+            self.rebuild_index()
+        return self.open_masks
+    
+    def rebuild_components(self):
+        """重新标记连通分量：逐个分量做一次搜索标号，再在分量编号上建立并查集"""
+        from array import array
+        from maze_generators import DisjointSet
+        
+        masks = self.get_adjacency()
+        steps = self.mask_steps
+        total = self.rows * self.cols
+        labels = array('i', [0]) * total
+        visited = bytearray(total)
+        count = 0
+        
+        # 每次从第一个未访问的格子开始标记一个新分量
+        seed = visited.find(0)
+        while seed != -1:
+            visited[seed] = 1
+            labels[seed] = count
+            stack = [seed]
+            while stack:
+                current = stack.pop()
+                for step in steps[masks[current]]:
+                    neighbor = current + step
+                    if not visited[neighbor]:
+                        visited[neighbor] = 1
+                        labels[neighbor] = count
+                        stack.append(neighbor)
+            count += 1
+            seed = visited.find(0, seed + 1)
+        
+        self.component_labels = labels
+        self.components = DisjointSet(count)
+        self.components_version = self.version
+    
+    def get_components(self):
+        """获取最新的连通分量，返回(每个格子的分量编号, 分量编号上的并查集)"""
+        if self.components_version != self.version:
+            self.rebuild_components()
+        return self.component_labels, self.components
+    
+    def get_heuristic(self, target):
+        """到target的启发函数（一维下标 -> 步数下界），启发式搜索都从这里取
+        
+        地标是最新的时候用ALT启发；否则同一个墙壁版本上查询满LANDMARK_QUERIES次才建立地标，
+        之前的查询用曼哈顿距离（一次性的查询不值得付出整图预处理的代价）。
+        预先调用get_landmarks()可以让之后的查询直接使用ALT。
+        """
+        from planners import LANDMARK_QUERIES, manhattan_heuristic
+        
+        landmarks = self.landmarks
+        if landmarks is None or landmarks.version != self.version:
+            if self.heuristic_version != self.version:
+                self.heuristic_version = self.version
+                self.heuristic_queries = 0
+            self.heuristic_queries += 1
+            if self.heuristic_queries < LANDMARK_QUERIES:
+                return manhattan_heuristic(self.cols, target)
+            landmarks = self.get_landmarks()
+        return landmarks.heuristic(target)
+    
+    def get_landmarks(self, count=None):
+        """获取最新的ALT地标（count为None时用默认数量）"""
+        from planners import DEFAULT_LANDMARKS, Landmarks
+        
+        count = DEFAULT_LANDMARKS if count is None else count
+        if self.landmarks is None or self.landmarks.version != self.version or self.landmarks.count != count:
+            self.landmarks = Landmarks(self, count)
+        return self.landmarks
+    
+    def get_junction_graph(self):
+        """获取最新的走廊收缩图（墙壁变化后下次查询时重建）"""
+        from planners import JunctionGraph
+        
+        if self.junctions is None or self.junctions.version != self.version:
+            self.junctions = JunctionGraph(self)
+        return self.junctions
+    
+    def get_hierarchy(self, cluster_size=None, spacing=None, weight=None):
+        """获取分层规划器（参数为None时用默认值），簇边长或入口间距变化时重建，权重直接修改"""
+        from planners import (DEFAULT_CLUSTER_SIZE, DEFAULT_ENTRANCE_SPACING, DEFAULT_HIERARCHY_WEIGHT,
+                              HierarchicalPlanner)
+        
+        cluster_size = DEFAULT_CLUSTER_SIZE if cluster_size is None else cluster_size
+        spacing = DEFAULT_ENTRANCE_SPACING if spacing is None else spacing
+        planner = self.hierarchy
+        if planner is None or (planner.cluster_size, planner.spacing) != (cluster_size, spacing):
+            if planner is not None:
+                planner.close()
+            planner = self.hierarchy = HierarchicalPlanner(self, cluster_size, spacing)
+        planner.weight = DEFAULT_HIERARCHY_WEIGHT if weight is None else weight
+        return planner
+    
+    def get_open_mask(self, pos):
+        """获取格子的通路掩码，墙壁变化后首次访问时才重建索引"""
+        if self.index_version != self.version:
+            self.rebuild_index()
+        return self.open_masks[pos[0] * self.cols + pos[1]]
+    
+    def in_bounds(self, pos):
+        """检查位置是否在迷宫范围内"""
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
+    
+    def to_index(self, pos):
+        """(行, 列) -> 一维格子下标"""
+        return pos[0] * self.cols + pos[1]
+    
+    def to_pos(self, index):
+        """一维格子下标 -> (行, 列)"""
+        return divmod(index, self.cols)
+    
+    def get_open_neighbors(self, pos, order=ORDER_RDLU):
+        """从邻接索引读取可以到达的相邻格子"""
+        row, col = pos
+        return [(row + dr, col + dc) for dr, dc in NEIGHBOR_TABLES[order][self.get_open_mask(pos)]]
+
+    def wall_between(self, from_pos, to_pos):
+        """返回两个相邻格子之间那条墙边的(类型, 位置)，不相邻时返回None"""
+        from_row, from_col = from_pos
+        to_row, to_col = to_pos
+
+        if from_row == to_row:  # 水平移动
+            if to_col == from_col + 1:  # 向右移动
+                return 'vertical', (to_row, to_col)
+            if to_col == from_col - 1:  # 向左移动
+                return 'vertical', (to_row, from_col)
+        elif from_col == to_col:  # 垂直移动
+            if to_row == from_row + 1:  # 向下移动
+                return 'horizontal', (to_row, to_col)
+            if to_row == from_row - 1:  # 向上移动
+                return 'horizontal', (from_row, to_col)
+        return None
+
     def generate_exact_maze(self):
         """严格按照图片生成迷宫，所有位置都是通路，墙壁用红色线条表示"""
-        # 所有位置都是通路
-        for i in range(MAZE_SIZE):
-            for j in range(MAZE_SIZE):
-                self.grid[i][j] = 0
-        
         # 创建严格按照图片的墙壁布局
         self.create_exact_walls()
     
     def create_exact_walls(self):
         """创建严格按照图片的墙壁布局"""
-        self.walls = {
-            'horizontal': [],  # 水平墙壁
-            'vertical': []    # 垂直墙壁
-        }
+        # 清空水平墙壁和垂直墙壁
+        self.clear_walls()
         
         # 添加边界墙壁
         self.add_boundary_walls()
@@ -89,17 +559,17 @@ class Maze:
     def add_boundary_walls(self):
         """添加边界墙壁"""
         # 外边界墙壁
-        for i in range(MAZE_SIZE):
+        for i in range(self.rows):
             # 左边界
-            self.walls['vertical'].append((i, 0))
+            self.set_wall('vertical', (i, 0))
             # 右边界
-            self.walls['vertical'].append((i, MAZE_SIZE))
+            self.set_wall('vertical', (i, self.cols))
         
-        for j in range(MAZE_SIZE):
+        for j in range(self.cols):
             # 上边界
-            self.walls['horizontal'].append((0, j))
+            self.set_wall('horizontal', (0, j))
             # 下边界
-            self.walls['horizontal'].append((MAZE_SIZE, j))
+            self.set_wall('horizontal', (self.rows, j))
     
     def add_exact_internal_walls(self):
         """严格按照用户描述添加精确的墙壁位置"""
@@ -149,27 +619,25 @@ class Maze:
     def save_as_original(self):
         """保存当前迷宫为原始迷宫"""
         self.original_walls = {
-            'horizontal': self.walls['horizontal'].copy(),
-            'vertical': self.walls['vertical'].copy()
+            'horizontal': self.h_walls.copy(),
+            'vertical': self.v_walls.copy()
         }
     
     def restore_original(self):
         """恢复到原始迷宫"""
         if self.original_walls:
-            self.walls = {
-                'horizontal': self.original_walls['horizontal'].copy(),
-                'vertical': self.original_walls['vertical'].copy()
-            }
+            if (self.h_walls.data != self.original_walls['horizontal'].data or
+                    self.v_walls.data != self.original_walls['vertical'].data):
+                self.h_walls.load(self.original_walls['horizontal'])
+                self.v_walls.load(self.original_walls['vertical'])
+                self.version += 1
             # 恢复显示特殊标记
             self.show_special_markers = True
     
     def generate_random_maze(self):
-        """生成完全随机的8x8迷宫"""
+        """生成完全随机的迷宫"""
         # 清空现有墙壁
-        self.walls = {
-            'horizontal': [],
-            'vertical': []
-        }
+        self.clear_walls()
         
         # 添加边界墙壁
         self.add_boundary_walls()
@@ -177,24 +645,34 @@ class Maze:
         # 随机生成终点位置
         self.generate_random_goal()
         
-        # 生成随机内部墙壁
+        # 生成随机内部墙壁（其中已经确保起点和终点连通，之后只会移除墙壁，不需要再检查）
         self.add_random_internal_walls()
+    
+    def generate_maze(self, algorithm='backtracker', braid=0.0, seed=None):
+        """用完美迷宫算法生成迷宫（backtracker/kruskal/wilson/prim），保证连通，无需修补
         
-        # 确保起点和终点连通
-        self.ensure_connectivity()
+        braid为0~1之间的回路密度：按这个概率打通死胡同，让迷宫出现回路
+        """
+        from maze_generators import generate_perfect_maze
+        
+        rng = random.Random(seed) if seed is not None else random
+        
+        # 随机生成终点位置
+        self.generate_random_goal(rng)
+        
+        # 生成迷宫墙壁（所有格子都连通）
+        generate_perfect_maze(self, algorithm, braid, rng)
+        
+        # 不显示特殊标记（字母和数字）
+        self.show_special_markers = False
     
-    def generate_random_goal(self):
-        """随机生成终点位置"""
-        # 确保终点不与起点相同
-        while True:
-            # 随机选择终点位置（可以是四周或中间）
-            goal_row = random.randint(0, MAZE_SIZE - 1)
-            goal_col = random.randint(0, MAZE_SIZE - 1)
-            
-            # 如果终点不是起点，则设置
-            if (goal_row, goal_col) != self.castle:
-                self.goal = (goal_row, goal_col)
-                break
+    def generate_random_goal(self, rng=random):
+        """随机生成终点位置（在起点以外的格子中均匀选择，不需要重试）"""
+        index = rng.randrange(self.rows * self.cols - 1)
+        # 跳过起点：起点及之后的下标整体后移一位
+        if index >= self.to_index(self.castle):
+            index += 1
+        self.goal = self.to_pos(index)
     
     def generate_vex_official_maze(self):
         """生成VEX官方8x8迷宫"""
@@ -239,18 +717,31 @@ class Maze:
         self.walls['vertical'].extend(vertical_walls)
     
     def add_random_internal_walls(self):
-        """添加随机内部墙壁"""
-        # 随机生成水平墙壁
-        for row in range(1, MAZE_SIZE):
-            for col in range(MAZE_SIZE):
-                if random.random() < 0.4:  # 40%概率添加墙壁
-                    self.walls['horizontal'].append((row, col))
-        
-        # 随机生成垂直墙壁
-        for row in range(MAZE_SIZE):
-            for col in range(1, MAZE_SIZE):
-                if random.random() < 0.4:  # 40%概率添加墙壁
-                    self.walls['vertical'].append((row, col))
+        """添加随机内部墙壁（安装了numpy时使用向量化版本，结果逐位相同）"""
+        try:
+            import maze_numpy
+        except ImportError:
+            maze_numpy = None
+        if maze_numpy is not None:
+            stream = maze_numpy.WordStream(random)
+            maze_numpy.add_random_internal_walls(self, stream)
+            maze_numpy.ensure_connectivity(self)
+            maze_numpy.prevent_dead_ends(self, stream)
+            stream.sync()
+            self.show_special_markers = False
+            return
+        
+        # 随机生成水平墙壁（整行写入位图，内部行原本为空）
+        for row in range(1, self.rows):
+            self.h_walls.store_line(row, [random.random() < 0.4 for _ in range(self.cols)])  # 40%概率添加墙壁
+        
+        # 随机生成垂直墙壁（两端保留边界墙）
+        for row in range(self.rows):
+            inner = [random.random() < 0.4 for _ in range(1, self.cols)]  # 40%概率添加墙壁
+            self.v_walls.store_line(row, [True] + inner + [True])
+        
+        # 位图被整行改写，邻接索引需要重建
+        self.version += 1
         
         # 确保起点和终点可达（移除阻挡的墙壁）
         self.ensure_connectivity()
@@ -263,188 +754,247 @@ class Maze:
     
     def prevent_dead_ends(self):
         """防止四面封死的墙，确保每个格子至少有一个方向可以移动"""
-        # 检查每个内部格子
-        for row in range(1, MAZE_SIZE - 1):
-            for col in range(1, MAZE_SIZE - 1):
-                # 检查当前格子是否四面都被封死
-                if self.is_dead_end(row, col):
-                    # 随机选择一个方向移除墙壁
-                    self.remove_random_wall(row, col)
-    
-    def is_dead_end(self, row, col):
-        """检查指定位置是否四面都被封死"""
-        # 检查四个方向是否都有墙壁阻挡
-        directions_blocked = 0
-        
-        # 检查上方
-        if (row, col) in self.walls['horizontal']:
-            directions_blocked += 1
-        
-        # 检查下方
-        if (row + 1, col) in self.walls['horizontal']:
-            directions_blocked += 1
-        
-        # 检查左方
-        if (row, col) in self.walls['vertical']:
-            directions_blocked += 1
-        
-        # 检查右方
-        if (row, col + 1) in self.walls['vertical']:
-            directions_blocked += 1
-        
-        # 如果四个方向都被阻挡，则是死胡同
-        return directions_blocked == 4
+        # 在邻接索引中查找通路掩码为0的格子（按行优先顺序，与逐格检查一致）
+        masks = self.get_adjacency()
+        index = masks.find(0)
+        while index != -1:
+            row, col = divmod(index, self.cols)
+            # 只处理内部格子（内部格子的通路掩码为0就是四面封死）
+            if 0 < row < self.rows - 1 and 0 < col < self.cols - 1:
+                # 随机选择一个方向移除墙壁（移除时索引会原地修补）
+                self.remove_random_wall(row, col)
+            index = masks.find(0, index + 1)
     
     def remove_random_wall(self, row, col):
         """随机移除指定位置的一个墙壁"""
         walls_to_remove = []
         
         # 收集可以移除的墙壁
-        if (row, col) in self.walls['horizontal']:
+        if self.has_wall('horizontal', (row, col)):
             walls_to_remove.append(('horizontal', (row, col)))
         
-        if (row + 1, col) in self.walls['horizontal']:
+        if self.has_wall('horizontal', (row + 1, col)):
             walls_to_remove.append(('horizontal', (row + 1, col)))
         
-        if (row, col) in self.walls['vertical']:
+        if self.has_wall('vertical', (row, col)):
             walls_to_remove.append(('vertical', (row, col)))
         
-        if (row, col + 1) in self.walls['vertical']:
+        if self.has_wall('vertical', (row, col + 1)):
             walls_to_remove.append(('vertical', (row, col + 1)))
         
         # 随机选择一个墙壁移除
         if walls_to_remove:
             wall_type, wall_pos = random.choice(walls_to_remove)
-            if wall_pos in self.walls[wall_type]:
-                self.walls[wall_type].remove(wall_pos)
+            self.remove_wall(wall_type, wall_pos)
     
     def ensure_connectivity(self):
-        """确保起点和终点连通"""
-        # 使用BFS检查连通性
-        from collections import deque
-        
+        """确保起点和终点连通（不连通时只移除最少的墙壁）"""
         start = self.castle
         goal = self.goal
         
-        # 检查是否已经连通
+        # 查连通分量（过期时先重新标记一次，之后移除墙壁都在并查集上原地合并）
         if self.is_connected(start, goal):
             return True
         
-        # 如果不连通，使用更智能的路径创建方法
-        self.create_guaranteed_path()
+        # 不连通时做一次0-1 BFS，找出需要移除的最少墙壁
+        for kind, pos in self.find_min_wall_path(start, goal):
+            self.remove_wall(kind, pos)
         
-        # 再次检查连通性
-        return self.is_connected(start, goal)
+        return True
     
     def is_connected(self, start, goal):
-        """检查两个点是否连通"""
+        """检查两个点是否连通（并查集查询；只移除墙壁时分量原地合并，添加墙壁后下次查询重新标记）"""
+        labels, components = self.get_components()
+        return components.connected(labels[self.to_index(start)], labels[self.to_index(goal)])
+    
+    def find_min_wall_path(self, start, goal):
+        """0-1 BFS：经过通路代价为0，穿过内部墙壁代价为1，
+        返回连通起点和终点需要移除的最少墙壁列表[(类型, 位置)]，已经连通时返回空列表
+        
+        按代价分层进行：先沿通路填充当前层（与普通连通性检查的开销相同），
+        只有没到达终点时才扫描这一层格子的墙壁，得到下一层的起点。
+        """
+        from array import array
+        
+        if start == goal:
+            return []
+        
+        masks = self.get_adjacency()
+        steps = self.mask_steps
+        rows, cols = self.rows, self.cols
+        start_index = self.to_index(start)
+        goal_index = self.to_index(goal)
+        parent = array('i', [-1]) * (rows * cols)
+        parent[start_index] = start_index
+        level = [start_index]
+        
+        while level:
+            # 沿通路填充当前层（level在填充过程中不断扩大）
+            stack = list(level)
+            while stack:
+                current = stack.pop()
+                for step in steps[masks[current]]:
+                    neighbor = current + step
+                    if parent[neighbor] < 0:
+                        parent[neighbor] = current
+                        if neighbor == goal_index:
+                            return self.walls_on_parent_path(parent, start_index, goal_index)
+                        stack.append(neighbor)
+                        level.append(neighbor)
+            
+            # 穿过一面内部墙壁进入下一层
+            next_level = []
+            for current in level:
+                row, col = divmod(current, cols)
+                inner = ((row > 0) | (col < cols - 1) << 1 | (row < rows - 1) << 2 | (col > 0) << 3)
+                for step in steps[inner & ~masks[current]]:
+                    neighbor = current + step
+                    if parent[neighbor] < 0:
+                        parent[neighbor] = current
+                        if neighbor == goal_index:
+                            return self.walls_on_parent_path(parent, start_index, goal_index)
+                        next_level.append(neighbor)
+            level = next_level
+        
+        return []
+    
+    def walls_on_parent_path(self, parent, start_index, goal_index):
+        """沿父指针从终点回溯到起点，收集路径上穿过的墙壁"""
+        masks = self.open_masks
+        steps = self.mask_steps
+        walls = []
+        current = goal_index
+        while current != start_index:
+            previous = parent[current]
+            if current - previous not in steps[masks[previous]]:
+                walls.append(self.wall_between(divmod(previous, self.cols), divmod(current, self.cols)))
+            current = previous
+        walls.reverse()
+        return walls
+    
+    def bfs_distances(self, sources):
+        """从一个或多个起点做BFS，返回每个格子的步数数组（-1表示不可达）"""
+        from array import array
         from collections import deque
         
-        queue = deque([start])
-        visited = set([start])
+        masks = self.get_adjacency()
+        steps = self.mask_steps
+        distances = array('i', [-1]) * (self.rows * self.cols)
+        queue = deque()
+        for pos in sources:
+            index = self.to_index(pos)
+            if distances[index] < 0:
+                distances[index] = 0
+                queue.append(index)
         
         while queue:
             current = queue.popleft()
-            if current == goal:
-                return True
-            
-            # 检查四个方向
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # 右、下、左、上
-            
-            for direction in directions:
-                new_pos = (current[0] + direction[0], current[1] + direction[1])
-                
-                if (0 <= new_pos[0] < MAZE_SIZE and 0 <= new_pos[1] < MAZE_SIZE and 
-                    new_pos not in visited and self.is_valid_move_between(current, new_pos)):
-                    visited.add(new_pos)
-                    queue.append(new_pos)
-        
-        return False
+            next_distance = distances[current] + 1
+            for step in steps[masks[current]]:
+                neighbor = current + step
+                if distances[neighbor] < 0:
+                    distances[neighbor] = next_distance
+                    queue.append(neighbor)
+        
+        return distances
+    
+    def distance_map(self, sources):
+        """多源距离表（格式同bfs_distances）：格子较多且安装了numpy时用波前距离变换"""
+        if self.rows * self.cols >= WAVEFRONT_CELLS:
+            try:
+                import maze_numpy
+            except ImportError:
+                maze_numpy = None
+            if maze_numpy is not None:
+                return maze_numpy.distance_array(self, sources)
+        return self.bfs_distances(sources)
     
-    def create_guaranteed_path(self):
-        """创建一条保证连通的路径"""
-        start_row, start_col = self.castle
-        goal_row, goal_col = self.goal
-        
-        # 使用L形路径：先水平移动，再垂直移动
-        # 或者先垂直移动，再水平移动
-        
-        # 方案1：先水平后垂直
-        self.create_l_path_horizontal_first(start_row, start_col, goal_row, goal_col)
-        
-        # 如果方案1失败，尝试方案2：先垂直后水平
-        if not self.is_connected(self.castle, self.goal):
-            self.create_l_path_vertical_first(start_row, start_col, goal_row, goal_col)
-    
-    def create_l_path_horizontal_first(self, start_row, start_col, goal_row, goal_col):
-        """创建L形路径：先水平移动，再垂直移动"""
-        # 第一步：水平移动到目标列
-        if start_col != goal_col:
-            for col in range(min(start_col, goal_col), max(start_col, goal_col)):
-                wall_to_remove = (start_row, col + 1)
-                if wall_to_remove in self.walls['vertical']:
-                    self.walls['vertical'].remove(wall_to_remove)
-        
-        # 第二步：垂直移动到目标行
-        if start_row != goal_row:
-            for row in range(min(start_row, goal_row), max(start_row, goal_row)):
-                wall_to_remove = (row + 1, goal_col)
-                if wall_to_remove in self.walls['horizontal']:
-                    self.walls['horizontal'].remove(wall_to_remove)
-    
-    def create_l_path_vertical_first(self, start_row, start_col, goal_row, goal_col):
-        """创建L形路径：先垂直移动，再水平移动"""
-        # 第一步：垂直移动到目标行
-        if start_row != goal_row:
-            for row in range(min(start_row, goal_row), max(start_row, goal_row)):
-                wall_to_remove = (row + 1, start_col)
-                if wall_to_remove in self.walls['horizontal']:
-                    self.walls['horizontal'].remove(wall_to_remove)
-        
-        # 第二步：水平移动到目标列
-        if start_col != goal_col:
-            for col in range(min(start_col, goal_col), max(start_col, goal_col)):
-                wall_to_remove = (goal_row, col + 1)
-                if wall_to_remove in self.walls['vertical']:
-                    self.walls['vertical'].remove(wall_to_remove)
+    def shortest_path(self, start, goal):
+        """双向BFS求最短路径，返回包含起点和终点的位置列表，不可达时返回None
+        
+        从两端交替扩展当前较小的一层，两棵搜索树相遇时沿两个父指针数组拼接路径；
+        开阔的迷宫中搜索范围大约是单向BFS的一半。
+        """
+        from array import array
+        
+        if start == goal:
+            return [start]
+        
+        masks = self.get_adjacency()
+        steps = self.mask_steps
+        total = self.rows * self.cols
+        start_index = self.to_index(start)
+        goal_index = self.to_index(goal)
+        start_parent = array('i', [-1]) * total
+        goal_parent = array('i', [-1]) * total
+        start_parent[start_index] = start_index
+        goal_parent[goal_index] = goal_index
+        start_layer = [start_index]
+        goal_layer = [goal_index]
+        
+        while start_layer and goal_layer:
+            # 扩展较小的一层；先在这一层发现对方访问过的格子就是最短路径的相遇点
+            if len(start_layer) <= len(goal_layer):
+                layer, parent, other = start_layer, start_parent, goal_parent
+            else:
+                layer, parent, other = goal_layer, goal_parent, start_parent
+            next_layer = []
+            for current in layer:
+                for step in steps[masks[current]]:
+                    neighbor = current + step
+                    if parent[neighbor] < 0:
+                        parent[neighbor] = current
+                        if other[neighbor] >= 0:
+                            path = self.trace_parents(start_parent, start_index, neighbor)
+                            path.extend(reversed(self.trace_parents(goal_parent, goal_index, neighbor)[:-1]))
+                            return path
+                        next_layer.append(neighbor)
+            if layer is start_layer:
+                start_layer = next_layer
+            else:
+                goal_layer = next_layer
+        
+        return None
     
+    def trace_parents(self, parent, start_index, goal_index):
+        """沿父指针数组从终点回溯到起点，返回位置列表"""
+        path = []
+        current = goal_index
+        while current != start_index:
+            path.append(divmod(current, self.cols))
+            current = parent[current]
+        path.append(divmod(start_index, self.cols))
+        path.reverse()
+        return path
     
     def is_valid_move_between(self, from_pos, to_pos):
-        """检查两个位置之间是否可以移动"""
+        """检查两个位置之间是否可以移动（O(1)邻接索引查询，Maze和Robot共用）"""
         from_row, from_col = from_pos
-        to_row, to_col = to_pos
+        if from_row < 0 or from_row >= self.rows or from_col < 0 or from_col >= self.cols:
+            return False
         
-        if from_row == to_row:  # 水平移动
-            if from_col < to_col:  # 向右移动
-                return (to_row, to_col) not in self.walls['vertical']
-            else:  # 向左移动
-                return (to_row, from_col) not in self.walls['vertical']
-        elif from_col == to_col:  # 垂直移动
-            if from_row < to_row:  # 向下移动
-                return (to_row, to_col) not in self.walls['horizontal']
-            else:  # 向上移动
-                return (from_row, to_col) not in self.walls['horizontal']
+        direction = DELTA_TO_DIRECTION.get((to_pos[0] - from_row, to_pos[1] - from_col))
+        if direction is None:  # 不相邻
+            return False
         
-        return False
+        return (self.get_open_mask(from_pos) >> direction) & 1 == 1
     
     
+    def cell_origin(self, pos):
+        """格子左上角的屏幕坐标"""
+        return int(pos[1] * self.cell_pixels), int(pos[0] * self.cell_pixels)
+    
+    def cell_center(self, pos):
+        """格子中心的屏幕坐标"""
+        return int((pos[1] + 0.5) * self.cell_pixels), int((pos[0] + 0.5) * self.cell_pixels)
+    
     def draw(self, screen, robot):
         """绘制魔方迷宫"""
-        # 绘制所有格子为白色通路
-        for i in range(MAZE_SIZE):
-            for j in range(MAZE_SIZE):
-                x = j * CELL_SIZE
-                y = i * CELL_SIZE
-                pygame.draw.rect(screen, WHITE, (x, y, CELL_SIZE, CELL_SIZE))
-        
-        # 绘制网格线
-        for i in range(MAZE_SIZE + 1):
-            pygame.draw.line(screen, GRAY, (0, i * CELL_SIZE), (WINDOW_WIDTH, i * CELL_SIZE), 1)
-        for j in range(MAZE_SIZE + 1):
-            pygame.draw.line(screen, GRAY, (j * CELL_SIZE, 0), (j * CELL_SIZE, WINDOW_HEIGHT), 1)
-        
-        # 绘制墙壁线条
-        self.draw_walls(screen)
+        # 绘制静态图层（白色通路、网格线和墙壁），只在墙壁变化后重绘
+        if self.static_layer is None or self.static_layer_version != self.version:
+            self.static_layer = self.render_static_layer()
+            self.static_layer_version = self.version
+        screen.blit(self.static_layer, (0, 0))
         
         # 绘制特殊标记点
         self.draw_special_markers(screen)
@@ -452,43 +1002,103 @@ class Maze:
         # 绘制机器人
         self.draw_robot(screen, robot)
     
+    def render_static_layer(self):
+        """把格子、网格线和墙壁绘制到一张缓存图层上"""
+        layer = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        # 绘制所有格子为白色通路
+        layer.fill(WHITE)
+        
+        if self.cell_size < 4:
+            # 大迷宫：格子不足4像素，改为缩放位图
+            self.draw_wall_bitmap(layer)
+            return layer
+        
+        cell = self.cell_size
+        # 绘制网格线（格子太小时省略）
+        if cell >= 8:
+            for i in range(self.rows + 1):
+                pygame.draw.line(layer, GRAY, (0, i * cell), (WINDOW_WIDTH, i * cell), 1)
+            for j in range(self.cols + 1):
+                pygame.draw.line(layer, GRAY, (j * cell, 0), (j * cell, WINDOW_HEIGHT), 1)
+        
+        # 绘制墙壁线条
+        self.draw_walls(layer)
+        return layer
+    
     def draw_walls(self, screen):
         """绘制黑色墙壁线条"""
+        cell = self.cell_size
+        # 线宽随格子大小缩放（8x8时边界5像素、内部3像素）
+        border_thickness = max(1, min(5, cell // 20))
+        inner_thickness = max(1, min(3, cell // 30))
+        
         # 绘制水平墙壁
         for wall in self.walls['horizontal']:
-            x = wall[1] * CELL_SIZE
-            y = wall[0] * CELL_SIZE
+            x = wall[1] * cell
+            y = wall[0] * cell
             # 判断是否为边界墙壁，加粗显示
-            thickness = 5 if (wall[0] == 0 or wall[0] == MAZE_SIZE) else 3
-            pygame.draw.line(screen, BLACK, (x, y), (x + CELL_SIZE, y), thickness)
+            thickness = border_thickness if (wall[0] == 0 or wall[0] == self.rows) else inner_thickness
+            pygame.draw.line(screen, BLACK, (x, y), (x + cell, y), thickness)
         
         # 绘制垂直墙壁
         for wall in self.walls['vertical']:
-            x = wall[1] * CELL_SIZE
-            y = wall[0] * CELL_SIZE
+            x = wall[1] * cell
+            y = wall[0] * cell
             # 判断是否为边界墙壁，加粗显示
-            thickness = 5 if (wall[1] == 0 or wall[1] == MAZE_SIZE) else 3
-            pygame.draw.line(screen, BLACK, (x, y), (x, y + CELL_SIZE), thickness)
+            thickness = border_thickness if (wall[1] == 0 or wall[1] == self.cols) else inner_thickness
+            pygame.draw.line(screen, BLACK, (x, y), (x, y + cell), thickness)
+    
+    def draw_wall_bitmap(self, layer):
+        """大迷宫：每个格子对应2x2像素画出墙壁位图，再整体缩放到窗口"""
+        bitmap = pygame.Surface((2 * self.cols + 1, 2 * self.rows + 1))
+        bitmap.fill(WHITE)
+        black = bitmap.map_rgb(BLACK)
+        white = bitmap.map_rgb(WHITE)
+        pixels = pygame.PixelArray(bitmap)
+        # 所有格子角点都画成墙
+        pixels[::2, ::2] = black
+        # 按行整段写入墙壁像素
+        for row in range(self.rows + 1):
+            line = self.h_walls.unpack_line(row)
+            pixels[1::2, 2 * row] = [black if bit else white for bit in line]
+        for row in range(self.v_walls.lines):
+            line = self.v_walls.unpack_line(row)
+            pixels[::2, 2 * row + 1] = [black if bit else white for bit in line]
+        del pixels
+        
+        size = (int(self.cols * self.cell_pixels), int(self.rows * self.cell_pixels))
+        try:
+            scaled = pygame.transform.smoothscale(bitmap, size)
+        except (ValueError, pygame.error):
+            scaled = pygame.transform.scale(bitmap, size)
+        layer.blit(scaled, (0, 0))
     
     def draw_special_markers(self, screen):
         """绘制所有特殊标记点"""
+        cell = self.cell_size
+        if cell < 12:
+            # 大迷宫：格子太小，只用色点标出起点和终点
+            pygame.draw.circle(screen, DARK_GREEN, self.cell_center(self.castle), 4)
+            pygame.draw.circle(screen, RED, self.cell_center(self.goal), 4)
+            return
+        
         # 绘制城堡（起点）
-        castle_x = self.castle[1] * CELL_SIZE
-        castle_y = self.castle[0] * CELL_SIZE
-        pygame.draw.rect(screen, DARK_GREEN, (castle_x + 5, castle_y + 5, CELL_SIZE - 10, CELL_SIZE - 10))
+        castle_x = self.castle[1] * cell
+        castle_y = self.castle[0] * cell
+        pygame.draw.rect(screen, DARK_GREEN, (castle_x + 5, castle_y + 5, cell - 10, cell - 10))
         # 绘制城堡顶部
         pygame.draw.polygon(screen, GRAY, [
-            (castle_x + CELL_SIZE//2, castle_y + 5),
+            (castle_x + cell//2, castle_y + 5),
             (castle_x + 10, castle_y + 20),
-            (castle_x + CELL_SIZE - 10, castle_y + 20)
+            (castle_x + cell - 10, castle_y + 20)
         ])
         
         # 绘制红黑相间的终点方块
-        goal_x = self.goal[1] * CELL_SIZE
-        goal_y = self.goal[0] * CELL_SIZE
+        goal_x = self.goal[1] * cell
+        goal_y = self.goal[0] * cell
         # 绘制棋盘格图案（适中大小，不压到黑墙）
-        square_size = CELL_SIZE // 5  # 适中的方块大小
-        margin = CELL_SIZE // 8  # 较小的边距
+        square_size = cell // 5  # 适中的方块大小
+        margin = cell // 8  # 较小的边距
         for i in range(4):
             for j in range(4):
                 if (i + j) % 2 == 0:
@@ -503,23 +1113,23 @@ class Maze:
         # 绘制数字方块
         if self.show_special_markers:
             for num, pos in self.numbered_squares.items():
-                x = pos[1] * CELL_SIZE
-                y = pos[0] * CELL_SIZE
-                pygame.draw.rect(screen, GREEN, (x + 5, y + 5, CELL_SIZE - 10, CELL_SIZE - 10))
+                x = pos[1] * cell
+                y = pos[0] * cell
+                pygame.draw.rect(screen, GREEN, (x + 5, y + 5, cell - 10, cell - 10))
                 try:
                     font = pygame.font.SysFont('simhei', 36)
                 except:
                     font = pygame.font.Font(None, 36)
                 text = font.render(str(num), True, WHITE)
-                text_rect = text.get_rect(center=(x + CELL_SIZE//2, y + CELL_SIZE//2))
+                text_rect = text.get_rect(center=(x + cell//2, y + cell//2))
                 screen.blit(text, text_rect)
         
         # 绘制字母圆圈
         if self.show_special_markers:
             for letter, pos in self.lettered_circles.items():
-                x = pos[1] * CELL_SIZE + CELL_SIZE // 2
-                y = pos[0] * CELL_SIZE + CELL_SIZE // 2
-                pygame.draw.circle(screen, LIGHT_BLUE, (x, y), CELL_SIZE // 3)
+                x = pos[1] * cell + cell // 2
+                y = pos[0] * cell + cell // 2
+                pygame.draw.circle(screen, LIGHT_BLUE, (x, y), cell // 3)
                 try:
                     font = pygame.font.SysFont('simhei', 36)
                 except:
@@ -530,12 +1140,18 @@ class Maze:
     
     def draw_robot(self, screen, robot):
         """绘制Arduino小车"""
-        robot_x = robot.position[1] * CELL_SIZE + CELL_SIZE // 2
-        robot_y = robot.position[0] * CELL_SIZE + CELL_SIZE // 2
+        cell = self.cell_size
+        if cell < 12:
+            # 大迷宫：格子太小，只画一个蓝色圆点
+            pygame.draw.circle(screen, BLUE, self.cell_center(robot.position), max(3, cell // 3))
+            return
+        
+        robot_x = robot.position[1] * cell + cell // 2
+        robot_y = robot.position[0] * cell + cell // 2
         
         # Arduino小车的基本形状（向上方向）
-        car_width = CELL_SIZE // 2.5
-        car_height = CELL_SIZE // 3
+        car_width = cell // 2.5
+        car_height = cell // 3
         
         # 基础小车形状（相对于中心）
         base_points = [
@@ -637,7 +1253,8 @@ class Maze:
     
     def draw_sensors(self, screen, robot, robot_x, robot_y):
         """绘制超声波传感器"""
-        sensor_length = CELL_SIZE // 2
+        cell = self.cell_size
+        sensor_length = cell // 2
         
         # 获取传感器距离
         front_distance = robot.get_sensor_distance('front')
@@ -649,8 +1266,8 @@ class Maze:
         if front_sensor:
             color = RED if front_distance > 0 else GRAY
             pygame.draw.line(screen, color, (robot_x, robot_y), 
-                           (front_sensor[1] * CELL_SIZE + CELL_SIZE // 2, 
-                            front_sensor[0] * CELL_SIZE + CELL_SIZE // 2), 3)
+                           (front_sensor[1] * cell + cell // 2, 
+                            front_sensor[0] * cell + cell // 2), 3)
             # 显示距离
             try:
                 font = pygame.font.SysFont('simhei', 12)
@@ -664,8 +1281,8 @@ class Maze:
         if left_sensor:
             color = GREEN if left_distance > 0 else GRAY
             pygame.draw.line(screen, color, (robot_x, robot_y), 
-                           (left_sensor[1] * CELL_SIZE + CELL_SIZE // 2, 
-                            left_sensor[0] * CELL_SIZE + CELL_SIZE // 2), 3)
+                           (left_sensor[1] * cell + cell // 2, 
+                            left_sensor[0] * cell + cell // 2), 3)
             # 显示距离
             try:
                 font = pygame.font.SysFont('simhei', 12)
@@ -679,8 +1296,8 @@ class Maze:
         if right_sensor:
             color = YELLOW if right_distance > 0 else GRAY
             pygame.draw.line(screen, color, (robot_x, robot_y), 
-                           (right_sensor[1] * CELL_SIZE + CELL_SIZE // 2, 
-                            right_sensor[0] * CELL_SIZE + CELL_SIZE // 2), 3)
+                           (right_sensor[1] * cell + cell // 2, 
+                            right_sensor[0] * cell + cell // 2), 3)
             # 显示距离
             try:
                 font = pygame.font.SysFont('simhei', 12)
@@ -690,13 +1307,22 @@ class Maze:
             screen.blit(distance_text, (robot_x + 10, robot_y + 10))
     
 
+def get_ticks():
+    """毫秒计时器：有pygame时使用pygame.time.get_ticks()，否则使用系统单调时钟"""
+    if pygame is not None:
+        return pygame.time.get_ticks()
+    return int(time.monotonic() * 1000)
+
+
 class Robot:
-    def __init__(self, maze):
+    def __init__(self, maze, clock=None, verbose=True):
         self.maze = maze
+        self.clock = clock if clock is not None else get_ticks  # 毫秒计时器（无界面运行时传入模拟时钟）
+        self.verbose = verbose  # 是否打印转向和传感器信息
         self.position = maze.robot_pos  # 机器人初始位置在城堡附近
         self.direction = 0  # 方向：0=上，1=右，2=下，3=左
         self.path = []  # DFS路径
-        self.dfs_path = []  # 保存的完整DFS路径
+        self.dfs_path = deque()  # 保存的完整DFS路径
         self.visited = set()  # 已访问的位置
         self.dfs_complete = False  # DFS是否完成
         self.current_step = 0  # 当前步骤
@@ -706,7 +1332,15 @@ class Robot:
         self.turning = False  # 是否正在转向
         self.turn_direction = None  # 转向方向
         self.turn_progress = 0  # 转向进度
-        self.pending_move = False  # 转向完成后是否需要移动
+        self.turns = 0  # 转向次数（每次90度）
+        self.run = None  # 当前的算法运行（algorithms.AlgorithmRun）
+        self.turn_costs = None  # 最终冲刺规划的代价（None为planners.DEFAULT_TURN_COSTS）
+        self.final_plan = deque()  # 最终冲刺剩余的动作
+    
+    def log(self, message):
+        """打印调试信息（verbose为False时不打印）"""
+        if self.verbose:
+            print(message)
     
     def get_position(self):
         return self.position
@@ -722,9 +1356,9 @@ class Robot:
             if self.direction == 0:  # 向上
                 target_pos = (row - 1, col) if row > 0 else None
             elif self.direction == 1:  # 向右
-                target_pos = (row, col + 1) if col < MAZE_SIZE - 1 else None
+                target_pos = (row, col + 1) if col < self.maze.cols - 1 else None
             elif self.direction == 2:  # 向下
-                target_pos = (row + 1, col) if row < MAZE_SIZE - 1 else None
+                target_pos = (row + 1, col) if row < self.maze.rows - 1 else None
             else:  # 向左
                 target_pos = (row, col - 1) if col > 0 else None
         
@@ -734,15 +1368,15 @@ class Robot:
             elif self.direction == 1:  # 向右
                 target_pos = (row - 1, col) if row > 0 else None
             elif self.direction == 2:  # 向下
-                target_pos = (row, col + 1) if col < MAZE_SIZE - 1 else None
+                target_pos = (row, col + 1) if col < self.maze.cols - 1 else None
             else:  # 向左
-                target_pos = (row + 1, col) if row < MAZE_SIZE - 1 else None
+                target_pos = (row + 1, col) if row < self.maze.rows - 1 else None
         
         elif sensor_type == 'right':
             if self.direction == 0:  # 向上
-                target_pos = (row, col + 1) if col < MAZE_SIZE - 1 else None
+                target_pos = (row, col + 1) if col < self.maze.cols - 1 else None
             elif self.direction == 1:  # 向右
-                target_pos = (row + 1, col) if row < MAZE_SIZE - 1 else None
+                target_pos = (row + 1, col) if row < self.maze.rows - 1 else None
             elif self.direction == 2:  # 向下
                 target_pos = (row, col - 1) if col > 0 else None
             else:  # 向左
@@ -767,9 +1401,9 @@ class Robot:
             if self.direction == 0:  # 向上
                 return (row - 1, col) if row > 0 else None
             elif self.direction == 1:  # 向右
-                return (row, col + 1) if col < MAZE_SIZE - 1 else None
+                return (row, col + 1) if col < self.maze.cols - 1 else None
             elif self.direction == 2:  # 向下
-                return (row + 1, col) if row < MAZE_SIZE - 1 else None
+                return (row + 1, col) if row < self.maze.rows - 1 else None
             else:  # 向左
                 return (row, col - 1) if col > 0 else None
         
@@ -779,15 +1413,15 @@ class Robot:
             elif self.direction == 1:  # 向右
                 return (row - 1, col) if row > 0 else None
             elif self.direction == 2:  # 向下
-                return (row, col + 1) if col < MAZE_SIZE - 1 else None
+                return (row, col + 1) if col < self.maze.cols - 1 else None
             else:  # 向左
-                return (row + 1, col) if row < MAZE_SIZE - 1 else None
+                return (row + 1, col) if row < self.maze.rows - 1 else None
         
         elif sensor_type == 'right':
             if self.direction == 0:  # 向上
-                return (row, col + 1) if col < MAZE_SIZE - 1 else None
+                return (row, col + 1) if col < self.maze.cols - 1 else None
             elif self.direction == 1:  # 向右
-                return (row + 1, col) if row < MAZE_SIZE - 1 else None
+                return (row + 1, col) if row < self.maze.rows - 1 else None
             elif self.direction == 2:  # 向下
                 return (row, col - 1) if col > 0 else None
             else:  # 向左
@@ -799,6 +1433,7 @@ class Robot:
         """左转"""
         old_direction = self.direction
         self.direction = (self.direction - 1) % 4
+        self.turns += 1
         
         if use_animation:
             self.turning = True
@@ -809,12 +1444,13 @@ class Robot:
             self.turn_direction = None
             self.turn_progress = 0
             
-        print(f"左转: {old_direction} -> {self.direction}")
+        self.log(f"左转: {old_direction} -> {self.direction}")
     
     def turn_right(self, use_animation=True):
         """右转"""
         old_direction = self.direction
         self.direction = (self.direction + 1) % 4
+        self.turns += 1
         
         if use_animation:
             self.turning = True
@@ -825,7 +1461,7 @@ class Robot:
             self.turn_direction = None
             self.turn_progress = 0
             
-        print(f"右转: {old_direction} -> {self.direction}")
+        self.log(f"右转: {old_direction} -> {self.direction}")
     
     def update_turning_animation(self):
         """更新转向动画"""
@@ -858,7 +1494,7 @@ class Robot:
     def reset_dfs(self):
         """重置DFS状态"""
         self.path = []
-        self.dfs_path = []
+        self.dfs_path = deque()
         self.visited = set()
         self.dfs_complete = False
         self.current_step = 0
@@ -870,738 +1506,29 @@ class Robot:
         self.turning = False
         self.turn_direction = None
         self.turn_progress = 0
-        self.pending_move = False
-        # 重置DFS专用状态
-        self.dfs_stack = []
-        self.dfs_visited = set()
-        self.dfs_target = None
-        self.dfs_moving_to_target = False
-        # 重置BFS专用状态
-        self.bfs_queue = []
-        self.bfs_visited = set()
-        self.bfs_target = None
-        self.bfs_moving_to_target = False
-        # 重置Greedy专用状态
-        self.greedy_visited = set()
-        self.greedy_path = []
-        self.greedy_target = None
-        self.greedy_moving_to_target = False
+        self.turns = 0
+        self.run = None  # 算法的运行状态都在生成器里，丢弃即可重新开始
+        self.final_plan = deque()
     
     def is_valid_move(self, pos):
         """检查移动是否有效（不撞墙）"""
-        row, col = pos
-        if row < 0 or row >= MAZE_SIZE or col < 0 or col >= MAZE_SIZE:
-            return False
-        
-        # 检查垂直墙壁
-        current_row, current_col = self.position
-        if current_row == row:  # 水平移动
-            if current_col < col:  # 向右移动
-                if (row, col) in self.maze.walls['vertical']:
-                    return False
-            else:  # 向左移动
-                if (row, current_col) in self.maze.walls['vertical']:
-                    return False
-        elif current_col == col:  # 垂直移动
-            if current_row < row:  # 向下移动
-                if (row, col) in self.maze.walls['horizontal']:
-                    return False
-            else:  # 向上移动
-                if (current_row, col) in self.maze.walls['horizontal']:
-                    return False
-        
-        return True
-    
-    def dfs_search(self):
-        """执行深度优先搜索算法（DFS）- 简化版本"""
-        if self.dfs_complete:
-            return
-        
-        if not self.is_running:
-            self.start_time = pygame.time.get_ticks()
-            self.is_running = True
-            # 初始化DFS状态
-            self.dfs_stack = [self.position]  # 只存储位置
-            self.dfs_visited = {self.position}
-            self.dfs_path = []
-            self.dfs_target = None
-            self.dfs_moving_to_target = False
-        
-        # 如果到达终点
-        if self.position == self.maze.goal:
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-            self.dfs_path = self.path.copy()
-            return
-        
-        # 如果正在移动到目标位置
-        if self.dfs_moving_to_target and self.dfs_target:
-            if self.position == self.dfs_target:
-                # 到达目标位置
-                self.dfs_moving_to_target = False
-                self.dfs_target = None
-                # 继续DFS探索
-                self.continue_dfs_exploration()
-            else:
-                # 继续移动到目标位置
-                self.move_towards_target(self.dfs_target)
-            return
-        
-        # 如果栈为空，没有找到路径
-        if not self.dfs_stack:
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-            return
-        
-        # 开始新的探索
-        self.continue_dfs_exploration()
+        return self.maze.is_valid_move_between(self.position, pos)
     
-    def continue_dfs_exploration(self):
-        """继续DFS探索过程 - 简化版本"""
-        if not self.dfs_stack:
-            return
+    def step_algorithm(self, algorithm, animate=True):
+        """按算法名称执行一步（算法是algorithms模块中的步进生成器，本方法只负责应用它产出的动作）"""
+        from algorithms import AlgorithmRun, resolve_algorithm
         
-        # 获取当前位置
-        current = self.position
-        
-        # 四个方向 (上, 下, 左, 右)
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        current_row, current_col = current
-        
-        # 寻找第一个未访问的邻居
-        for dr, dc in directions:
-            nr, nc = current_row + dr, current_col + dc
-            if (0 <= nr < MAZE_SIZE and 0 <= nc < MAZE_SIZE):  # 边界检查
-                if self.is_valid_move_from_to(current, (nr, nc)) and (nr, nc) not in self.dfs_visited:
-                    # 找到未访问的邻居，移动到该位置
-                    self.dfs_visited.add((nr, nc))
-                    self.dfs_target = (nr, nc)
-                    self.dfs_moving_to_target = True
-                    # 开始移动到目标位置
-                    self.move_towards_target((nr, nc))
-                    return
-        
-        # 没有找到未访问的邻居，需要回溯
-        if len(self.path) > 1:
-            # 回溯到上一个位置
-            prev_position = self.path[-2]  # 上一个位置
-            self.dfs_target = prev_position
-            self.dfs_moving_to_target = True
-            # 从路径中移除当前位置
-            self.path.pop()
-            # 开始回溯移动
-            self.move_towards_target(prev_position)
-        else:
-            # 没有更多位置可探索，DFS完成
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-    
-    def move_towards_target(self, target):
-        """移动到目标位置"""
-        current_row, current_col = self.position
-        target_row, target_col = target
-        
-        # 计算需要移动的方向
-        if target_row < current_row:  # 需要向上
-            target_direction = 0
-        elif target_row > current_row:  # 需要向下
-            target_direction = 2
-        elif target_col < current_col:  # 需要向左
-            target_direction = 3
-        elif target_col > current_col:  # 需要向右
-            target_direction = 1
-        else:
-            # 已经在目标位置
-            return
-        
-        # 如果当前方向不正确，先转向
-        if self.direction != target_direction:
-            self.turn_to_direction(target_direction)
-            return
-        
-        # 方向正确，尝试前进
-        if self.move_forward():
-            self.path.append(self.position)
-            self.current_step += 1
-        else:
-            # 无法前进，可能路径被阻塞
-            self.dfs_moving_to_target = False
-            self.dfs_target = None
-    
-    def turn_to_direction(self, target_direction):
-        """转向到指定方向"""
-        # 计算需要转向的次数
-        turns_needed = (target_direction - self.direction) % 4
-        
-        if turns_needed == 1:
-            self.turn_right()
-        elif turns_needed == 2:
-            # 选择最短路径：右转2次或左转2次
-            self.turn_right()
-        elif turns_needed == 3:
-            self.turn_left()
-    
-    def get_neighbors(self, position):
-        """获取指定位置的所有邻居"""
-        row, col = position
-        neighbors = []
-        
-        # 四个方向的邻居
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # 右、下、左、上
-        
-        for direction in directions:
-            neighbor_row = row + direction[0]
-            neighbor_col = col + direction[1]
-            
-            # 检查是否在迷宫范围内
-            if (0 <= neighbor_row < MAZE_SIZE and 0 <= neighbor_col < MAZE_SIZE):
-                neighbors.append((neighbor_row, neighbor_col))
-        
-        return neighbors
-    
-    def bfs_search(self):
-        """执行广度优先搜索算法（BFS）- 模仿DFS工作方式"""
-        if self.dfs_complete:
-            return
-        
-        if not self.is_running:
-            self.start_time = pygame.time.get_ticks()
-            self.is_running = True
-            # 初始化BFS状态
-            self.bfs_queue = [self.position]  # 只存储位置
-            self.bfs_visited = {self.position}
-            self.bfs_path = []
-            self.bfs_target = None
-            self.bfs_moving_to_target = False
-        
-        # 如果到达终点
-        if self.position == self.maze.goal:
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-            self.dfs_path = self.path.copy()
-            return
-        
-        # 如果正在移动到目标位置
-        if self.bfs_moving_to_target and self.bfs_target:
-            if self.position == self.bfs_target:
-                # 到达目标位置
-                self.bfs_moving_to_target = False
-                self.bfs_target = None
-                # 继续BFS探索
-                self.continue_bfs_exploration()
-            else:
-                # 继续移动到目标位置
-                self.move_towards_target(self.bfs_target)
-            return
-        
-        # 如果队列为空，没有找到路径
-        if not self.bfs_queue:
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-            return
-        
-        # 开始新的探索
-        self.continue_bfs_exploration()
-    
-    def continue_bfs_exploration(self):
-        """继续BFS探索过程 - 模仿DFS工作方式"""
-        if not self.bfs_queue:
-            return
-        
-        # 获取当前位置
-        current = self.position
-        
-        # 四个方向 (上, 下, 左, 右)
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        current_row, current_col = current
-        
-        # 寻找第一个未访问的邻居
-        for dr, dc in directions:
-            nr, nc = current_row + dr, current_col + dc
-            if (0 <= nr < MAZE_SIZE and 0 <= nc < MAZE_SIZE):  # 边界检查
-                if self.is_valid_move_from_to(current, (nr, nc)) and (nr, nc) not in self.bfs_visited:
-                    # 找到未访问的邻居，移动到该位置
-                    self.bfs_visited.add((nr, nc))
-                    self.bfs_target = (nr, nc)
-                    self.bfs_moving_to_target = True
-                    # 开始移动到目标位置
-                    self.move_towards_target((nr, nc))
-                    return
-        
-        # 没有找到未访问的邻居，需要回溯
-        if len(self.path) > 1:
-            # 回溯到上一个位置
-            prev_position = self.path[-2]  # 上一个位置
-            self.bfs_target = prev_position
-            self.bfs_moving_to_target = True
-            # 从路径中移除当前位置
-            self.path.pop()
-            # 开始回溯移动
-            self.move_towards_target(prev_position)
-        else:
-            # 没有更多位置可探索，BFS完成
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-    
-    def reconstruct_path(self, parent, start, goal):
-        """重构从起点到终点的路径"""
-        path = []
-        current = goal
-        
-        while current != start:
-            path.append(current)
-            current = parent.get(current)
-            if current is None:
-                return None  # 无法重构路径
-        
-        path.append(start)
-        path.reverse()
-        return path
-    
-    def greedy_search(self):
-        """执行改进的贪心搜索算法（最佳优先搜索）"""
-        if self.dfs_complete:
-            return
-        
-        if not self.is_running:
-            self.start_time = pygame.time.get_ticks()
-            self.is_running = True
-            # 初始化贪心搜索专用状态
-            self.greedy_visited = set()
-            self.greedy_path = []
-            self.greedy_target = None
-            self.greedy_moving_to_target = False
-        
-        # 如果到达终点
-        if self.position == self.maze.goal:
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-            self.dfs_path = self.path.copy()
-            return
-        
-        # 如果正在移动到目标位置
-        if self.greedy_moving_to_target and self.greedy_target:
-            if self.position == self.greedy_target:
-                # 到达目标位置
-                self.greedy_moving_to_target = False
-                self.greedy_target = None
-                # 继续贪心探索
-                self.continue_greedy_exploration()
-            else:
-                # 继续移动到目标位置
-                self.move_towards_target(self.greedy_target)
-            return
-        
-        # 开始新的贪心探索
-        self.continue_greedy_exploration()
-    
-    def continue_greedy_exploration(self):
-        """继续贪心探索过程"""
-        # 标记当前位置为已访问
-        self.greedy_visited.add(self.position)
-        
-        # 改进的启发式函数：结合曼哈顿距离和路径质量
-        def enhanced_heuristic(pos):
-            """增强的启发式函数"""
-            # 基础曼哈顿距离
-            manhattan_dist = abs(pos[0] - self.maze.goal[0]) + abs(pos[1] - self.maze.goal[1])
-            
-            # 路径质量评估：检查该位置是否会导致死胡同
-            dead_end_penalty = calculate_dead_end_penalty(pos)
-            
-            # 方向偏好：优先选择朝向目标的方向
-            direction_bonus = calculate_direction_bonus(pos)
-            
-            # 综合评估
-            return manhattan_dist + dead_end_penalty - direction_bonus
-        
-        def calculate_dead_end_penalty(pos):
-            """计算死胡同惩罚"""
-            # 检查该位置的邻居数量
-            neighbors = self.get_valid_neighbors(pos)
-            unvisited_neighbors = [n for n in neighbors if n not in self.greedy_visited]
-            
-            if len(unvisited_neighbors) == 0:
-                return 10  # 死胡同，高惩罚
-            elif len(unvisited_neighbors) == 1:
-                return 5   # 只有一个选择，中等惩罚
-            else:
-                return 0   # 多个选择，无惩罚
-        
-        def calculate_direction_bonus(pos):
-            """计算方向奖励"""
-            current_row, current_col = self.position
-            target_row, target_col = self.maze.goal
-            
-            # 计算朝向目标的方向
-            row_diff = target_row - current_row
-            col_diff = target_col - current_col
-            
-            # 检查移动是否朝向目标
-            if row_diff != 0 and pos[0] == current_row + (1 if row_diff > 0 else -1):
-                return 2  # 朝向目标的行方向
-            elif col_diff != 0 and pos[1] == current_col + (1 if col_diff > 0 else -1):
-                return 2  # 朝向目标的列方向
-            else:
-                return 0  # 不朝向目标
-        
-        # 获取所有可移动的邻居
-        neighbors = self.get_valid_neighbors(self.position)
-        unvisited_neighbors = [n for n in neighbors if n not in self.greedy_visited]
-        
-        if unvisited_neighbors:
-            # 计算每个邻居的启发式值
-            neighbor_scores = []
-            for neighbor in unvisited_neighbors:
-                score = enhanced_heuristic(neighbor)
-                neighbor_scores.append((neighbor, score))
-            
-            # 选择最佳邻居
-            best_neighbor = min(neighbor_scores, key=lambda x: x[1])
-            self.greedy_target = best_neighbor[0]
-            self.greedy_moving_to_target = True
-            
-            # 开始移动到目标位置
-            self.move_towards_target(self.greedy_target)
-        else:
-            # 没有未访问的邻居，需要智能回溯
-            self.smart_backtrack()
-    
-    def get_valid_neighbors(self, pos):
-        """获取指定位置的所有有效邻居"""
-        row, col = pos
-        neighbors = []
-        
-        # 四个方向的邻居
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # 右、下、左、上
-        
-        for direction in directions:
-            neighbor_row = row + direction[0]
-            neighbor_col = col + direction[1]
-            
-            # 检查是否在迷宫范围内且可以移动
-            if (0 <= neighbor_row < MAZE_SIZE and 0 <= neighbor_col < MAZE_SIZE and 
-                self.is_valid_move_from_to(pos, (neighbor_row, neighbor_col))):
-                neighbors.append((neighbor_row, neighbor_col))
-        
-        return neighbors
-    
-    def smart_backtrack(self):
-        """智能回溯：寻找最近的未访问区域"""
-        # 从路径中寻找最近的未访问邻居
-        for i in range(len(self.path) - 1, -1, -1):
-            backtrack_pos = self.path[i]
-            neighbors = self.get_valid_neighbors(backtrack_pos)
-            unvisited_neighbors = [n for n in neighbors if n not in self.greedy_visited]
-            
-            if unvisited_neighbors:
-                # 找到有未访问邻居的位置，回溯到那里
-                self.greedy_target = backtrack_pos
-                self.greedy_moving_to_target = True
-                # 从路径中移除当前位置到回溯位置之间的所有位置
-                self.path = self.path[:i+1]
-                # 开始回溯移动
-                self.move_towards_target(backtrack_pos)
-                return
-        
-        # 如果所有位置都没有未访问的邻居，搜索完成
-        self.dfs_complete = True
-        self.end_time = pygame.time.get_ticks()
-    
-    def flood_filled_search(self):
-        """执行洪水填充搜索算法（Flood Fill）"""
-        if self.dfs_complete:
-            return
-        
-        if not self.is_running:
-            self.start_time = pygame.time.get_ticks()
-            self.is_running = True
-        
-        # 如果到达终点
-        if self.position == self.maze.goal:
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-            self.dfs_path = self.path.copy()
-            return
-        
-        # 洪水填充算法：从终点开始填充距离值
-        if not hasattr(self, 'flood_map'):
-            self.create_flood_map()
-        
-        # 标记当前位置为已访问
-        self.visited.add(self.position)
-        
-        # 找到所有可移动的位置
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # 右、下、左、上
-        valid_moves = []
-        
-        for direction in directions:
-            new_pos = (self.position[0] + direction[0], self.position[1] + direction[1])
-            if (new_pos not in self.visited and 
-                self.is_valid_move(new_pos) and 
-                new_pos in self.flood_map):
-                valid_moves.append((new_pos, self.flood_map[new_pos]))
-        
-        if valid_moves:
-            # 选择洪水值最小的位置（离终点最近）
-            best_move = min(valid_moves, key=lambda x: x[1])
-            self.position = best_move[0]
-            self.path.append(self.position)
-            self.current_step += 1
-        else:
-            # 如果没有可移动的方向，回溯
-            if self.path:
-                self.path.pop()
-                if self.path:
-                    self.position = self.path[-1]
-                else:
-                    self.position = self.maze.robot_pos
-                self.current_step += 1
-            else:
-                self.dfs_complete = True
-                self.end_time = pygame.time.get_ticks()
-    
-    def create_flood_map(self):
-        """创建洪水填充地图（从终点开始BFS填充距离值）"""
-        from collections import deque
-        
-        self.flood_map = {}
-        queue = deque([(self.maze.goal, 0)])
-        visited = set([self.maze.goal])
-        
-        while queue:
-            current, distance = queue.popleft()
-            self.flood_map[current] = distance
-            
-            # 检查四个方向
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # 右、下、左、上
-            
-            for direction in directions:
-                new_pos = (current[0] + direction[0], current[1] + direction[1])
-                
-                if (new_pos not in visited and 
-                    self.is_valid_move_from_to(current, new_pos)):
-                    visited.add(new_pos)
-                    queue.append((new_pos, distance + 1))
-    
-    def wall_follow_search(self, speed=5):
-        """执行墙跟随搜索算法（标准右手法则）"""
-        if self.dfs_complete:
-            return
-        
-        if not self.is_running:
-            self.start_time = pygame.time.get_ticks()
-            self.is_running = True
-        
-        # 如果到达终点
-        if self.position == self.maze.goal:
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-            self.dfs_path = self.path.copy()
-            return
-        
-        # 如果正在转向，等待转向完成
-        if self.turning:
-            return
-        
-        # 如果转向完成且有待移动，执行移动
-        if self.pending_move:
-            if self.move_forward():
-                self.path.append(self.position)
-                self.current_step += 1
-            self.pending_move = False
-            return
-        
-        # 标记当前位置为已访问
-        self.visited.add(self.position)
-        
-        # 标准墙跟随算法：
-        # while not at exit:
-        #     if right is free:
-        #         turn right
-        #         move forward
-        #     else if front is free:
-        #         move forward
-        #     else if left is free:
-        #         turn left
-        #         move forward
-        #     else:
-        #         turn around (180°)
-        
-        # 检查右侧是否空闲
-        if self.is_right_free():
-            use_animation = speed > 1  # 速度为1时不使用动画
-            self.turn_right(use_animation)
-            if not use_animation:
-                # 不使用动画时，直接移动
-                if self.move_forward():
-                    self.path.append(self.position)
-                    self.current_step += 1
-            else:
-                self.pending_move = True  # 转向完成后需要移动
-            return  # 等待转向完成
-        
-        # 检查前方是否空闲
-        elif self.is_front_free():
-            if self.move_forward():
-                self.path.append(self.position)
-                self.current_step += 1
-            return
-        
-        # 检查左侧是否空闲
-        elif self.is_left_free():
-            use_animation = speed > 1  # 速度为1时不使用动画
-            self.turn_left(use_animation)
-            if not use_animation:
-                # 不使用动画时，直接移动
-                if self.move_forward():
-                    self.path.append(self.position)
-                    self.current_step += 1
-            else:
-                self.pending_move = True  # 转向完成后需要移动
-            return  # 等待转向完成
-        
-        # 都不空闲，掉头180度
-        else:
-            use_animation = speed > 1  # 速度为1时不使用动画
-            self.turn_right(use_animation)  # 右转90度
-            if not use_animation:
-                # 不使用动画时，直接移动
-                if self.move_forward():
-                    self.path.append(self.position)
-                    self.current_step += 1
-            else:
-                self.pending_move = True  # 转向完成后需要移动
-            return  # 等待转向完成
-    
-    def is_right_free(self):
-        """检查右侧是否空闲"""
-        row, col = self.position
-        
-        if self.direction == 0:  # 向上
-            right_pos = (row, col + 1)
-        elif self.direction == 1:  # 向右
-            right_pos = (row + 1, col)
-        elif self.direction == 2:  # 向下
-            right_pos = (row, col - 1)
-        else:  # 向左
-            right_pos = (row - 1, col)
-        
-        return self.is_valid_move(right_pos)
-    
-    def is_front_free(self):
-        """检查前方是否空闲"""
-        row, col = self.position
-        
-        if self.direction == 0:  # 向上
-            front_pos = (row - 1, col)
-        elif self.direction == 1:  # 向右
-            front_pos = (row, col + 1)
-        elif self.direction == 2:  # 向下
-            front_pos = (row + 1, col)
-        else:  # 向左
-            front_pos = (row, col - 1)
-        
-        return self.is_valid_move(front_pos)
-    
-    def is_left_free(self):
-        """检查左侧是否空闲"""
-        row, col = self.position
-        
-        if self.direction == 0:  # 向上
-            left_pos = (row, col - 1)
-        elif self.direction == 1:  # 向右
-            left_pos = (row - 1, col)
-        elif self.direction == 2:  # 向下
-            left_pos = (row, col + 1)
-        else:  # 向左
-            left_pos = (row + 1, col)
-        
-        return self.is_valid_move(left_pos)
-    
-    def astar_search(self):
-        """执行A*搜索算法（A-Star）"""
-        if self.dfs_complete:
-            return
-        
-        if not self.is_running:
-            self.start_time = pygame.time.get_ticks()
-            self.is_running = True
-        
-        # 如果到达终点
-        if self.position == self.maze.goal:
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-            self.dfs_path = self.path.copy()
-            return
-        
-        # A*算法：f(n) = g(n) + h(n)
-        # g(n): 从起点到n的实际距离
-        # h(n): 从n到终点的启发式距离（曼哈顿距离）
-        # f(n): 总评估函数
-        import heapq
-        
-        start = self.position
-        goal = self.maze.goal
-        
-        if start == goal:
-            self.dfs_complete = True
-            self.end_time = pygame.time.get_ticks()
-            return
-        
-        # 启发式函数（曼哈顿距离）
-        def heuristic(pos):
-            return abs(pos[0] - goal[0]) + abs(pos[1] - goal[1])
-        
-        # 优先队列：(f_score, g_score, position, path)
-        open_set = [(heuristic(start), 0, start, [start])]
-        closed_set = set()
-        
-        while open_set:
-            f_score, g_score, current, path = heapq.heappop(open_set)
-            
-            if current in closed_set:
-                continue
-            
-            closed_set.add(current)
-            
-            if current == goal:
-                # 找到最优路径，移动到下一个位置
-                if len(path) > 1:
-                    self.position = path[1]
-                    self.path = path[1:]
-                    self.visited.add(self.position)
-                    self.current_step += 1
-                else:
-                    self.dfs_complete = True
-                    self.end_time = pygame.time.get_ticks()
-                return
-            
-            # 检查四个方向
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # 右、下、左、上
-            
-            for direction in directions:
-                new_pos = (current[0] + direction[0], current[1] + direction[1])
-                
-                if (new_pos not in closed_set and 
-                    self.is_valid_move_from_to(current, new_pos)):
-                    
-                    new_g_score = g_score + 1
-                    new_f_score = new_g_score + heuristic(new_pos)
-                    new_path = path + [new_pos]
-                    
-                    heapq.heappush(open_set, (new_f_score, new_g_score, new_pos, new_path))
-        
-        # 如果没有找到路径，标记为完成
-        self.dfs_complete = True
-        self.end_time = pygame.time.get_ticks()
+        if self.run is None or self.run.name != resolve_algorithm(algorithm):
+            self.run = AlgorithmRun(self, algorithm, animate)
+        self.run.animate = animate
+        return self.run.step()
     
     def turn_to_target(self, target_pos):
         """转向到目标位置（逐步转向）"""
         current_row, current_col = self.position
         target_row, target_col = target_pos
         
-        print(f"转向计算: 当前位置{self.position}, 目标位置{target_pos}, 当前方向{self.direction}")
+        self.log(f"转向计算: 当前位置{self.position}, 目标位置{target_pos}, 当前方向{self.direction}")
         
         # 计算需要转向的方向
         if target_row < current_row:  # 需要向上
@@ -1613,24 +1540,24 @@ class Robot:
         elif target_col > current_col:  # 需要向右
             target_direction = 1
         else:
-            print("已经在目标位置")
+            self.log("已经在目标位置")
             return  # 已经在目标位置
         
         # 计算转向次数（最多3次）
         turns_needed = (target_direction - self.direction) % 4
         
-        print(f"需要转向到方向{target_direction}, 需要{turns_needed}次转向")
+        self.log(f"需要转向到方向{target_direction}, 需要{turns_needed}次转向")
         
         # 只进行一次转向，让机器人逐步转向
         if turns_needed == 1:
-            print("执行右转")
+            self.log("执行右转")
             self.turn_right()
         elif turns_needed == 2:
             # 选择最短路径：右转2次或左转2次，这里选择右转
-            print("执行右转（还需要1次）")
+            self.log("执行右转（还需要1次）")
             self.turn_right()
         elif turns_needed == 3:
-            print("执行左转")
+            self.log("执行左转")
             self.turn_left()  # 左转更近
     
     
@@ -1641,62 +1568,75 @@ class Robot:
         left_distance = self.get_sensor_distance('left')
         right_distance = self.get_sensor_distance('right')
         
-        print(f"传感器读数: 前方={front_distance}, 左方={left_distance}, 右方={right_distance}")
+        self.log(f"传感器读数: 前方={front_distance}, 左方={left_distance}, 右方={right_distance}")
         
         # 如果前方有路，优先直行
         if front_distance > 0:
-            print("前方无障碍，直行")
+            self.log("前方无障碍，直行")
             return self.move_forward()
         
         # 前方有障碍，需要转向
         if left_distance > 0 and right_distance > 0:
             # 左右都有路，优先左转（左转优先策略）
-            print("前方有障碍，左右都有路，选择左转")
+            self.log("前方有障碍，左右都有路，选择左转")
             self.turn_left()
             return False
         elif left_distance > 0:
             # 只有左边有路
-            print("前方有障碍，只有左边有路，左转")
+            self.log("前方有障碍，只有左边有路，左转")
             self.turn_left()
             return False
         elif right_distance > 0:
             # 只有右边有路
-            print("前方有障碍，只有右边有路，右转")
+            self.log("前方有障碍，只有右边有路，右转")
             self.turn_right()
             return False
         else:
             # 三个方向都有障碍，需要掉头
-            print("三个方向都有障碍，掉头")
+            self.log("三个方向都有障碍，掉头")
             self.turn_right()  # 右转两次等于掉头
             return False
     
     def move_to_goal_with_sensors(self):
-        """使用传感器系统移动到终点"""
-        if not self.dfs_complete or not self.dfs_path:
-            print(f"DFS未完成或路径为空: dfs_complete={self.dfs_complete}, dfs_path长度={len(self.dfs_path)}")
+        """搜索结束后走到终点：沿用时最短的路线（转向感知规划），转向动画期间等待，前进前用前方传感器确认"""
+        if not self.dfs_complete:
+            self.log(f"搜索未完成: dfs_complete={self.dfs_complete}")
             return False
-
+        
         # 如果已经在终点
         if self.position == self.maze.goal:
-            print("已到达终点")
+            self.log("已到达终点")
             return True
-
-        # 查看下一个目标格子
-        target_pos = self.dfs_path[0]
-        print(f"当前位置: {self.position}, 目标位置: {target_pos}, 当前方向: {self.direction}")
-
-        # 使用传感器系统进行移动决策
-        moved = self.sensor_based_movement()
         
-        if moved:
-            # 成功移动，检查是否到达了目标位置
-            if self.position == target_pos:
-                self.dfs_path.pop(0)  # 移除已走的格子
-                print("到达目标位置")
-            else:
-                print("移动了但不是目标位置")
+        if self.turning:
+            return False
         
-        return moved
+        if not self.final_plan:
+            from planners import fastest_path
+            plan = fastest_path(self.maze, self.position, self.direction, self.maze.goal, self.turn_costs)
+            if plan is None:
+                self.log("无法到达终点")
+                return False
+            actions, cells, cost = plan
+            # 掉头拆成两次右转
+            self.final_plan = deque(step for action in actions
+                                    for step in (('right', 'right') if action == 'u_turn' else (action,)))
+            self.log(f"最快路线: {len(cells) - 1}格, {len(actions)}个动作, 代价{cost}")
+        
+        action = self.final_plan.popleft()
+        if action == 'left':
+            self.turn_left()
+            return False
+        if action == 'right':
+            self.turn_right()
+            return False
+        
+        # 前方传感器发现墙壁（迷宫被修改过）时重新规划
+        if self.get_sensor_distance('front') == 0:
+            self.log("前方有障碍，重新规划")
+            self.final_plan.clear()
+            return False
+        return self.move_forward()
 
     def facing_target(self, target_pos):
         """判断是否已经面向目标格子"""
@@ -1712,63 +1652,6 @@ class Robot:
         if target_col > current_col and self.direction == 1:
             return True
         return False
-    
-    def find_path_to_goal(self):
-        """使用BFS找到从当前位置到终点的最短路径"""
-        from collections import deque
-        
-        start = self.position
-        goal = self.maze.goal
-        
-        if start == goal:
-            return [start]
-        
-        queue = deque([(start, [start])])
-        visited = set([start])
-        
-        while queue:
-            current, path = queue.popleft()
-            
-            # 检查四个方向
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # 右、下、左、上
-            
-            for direction in directions:
-                new_pos = (current[0] + direction[0], current[1] + direction[1])
-                
-                if new_pos == goal:
-                    return path + [new_pos]
-                
-                if (new_pos not in visited and 
-                    self.is_valid_move_from_to(current, new_pos)):
-                    visited.add(new_pos)
-                    queue.append((new_pos, path + [new_pos]))
-        
-        return None
-    
-    def is_valid_move_from_to(self, from_pos, to_pos):
-        """检查从from_pos到to_pos的移动是否有效"""
-        row, col = to_pos
-        if row < 0 or row >= MAZE_SIZE or col < 0 or col >= MAZE_SIZE:
-            return False
-        
-        # 检查垂直墙壁
-        from_row, from_col = from_pos
-        if from_row == row:  # 水平移动
-            if from_col < col:  # 向右移动
-                if (row, col) in self.maze.walls['vertical']:
-                    return False
-            else:  # 向左移动
-                if (row, from_col) in self.maze.walls['vertical']:
-                    return False
-        elif from_col == col:  # 垂直移动
-            if from_row < row:  # 向下移动
-                if (row, col) in self.maze.walls['horizontal']:
-                    return False
-            else:  # 向上移动
-                if (from_row, col) in self.maze.walls['horizontal']:
-                    return False
-        
-        return True
 
 # 滑动按钮相关变量
 slider_x = WINDOW_WIDTH - 100
@@ -1837,7 +1720,7 @@ wall_following_button_width = 150
 wall_following_button_height = 30
 dropdown_open = False
 current_algorithm = "Wall-follow"
-algorithms = ["Wall-follow", "Greedy", "DFS", "BFS", "Flood-filled", "A*"]
+algorithms = ["Wall-follow", "Pledge", "Tremaux", "Greedy", "DFS", "BFS", "Flood-filled", "A*", "Bi-A*", "JPS", "HPA*", "Junction", "Markers", "Explore", "D* Lite", "Micromouse", "Micromouse 2-phase", "Fastest"]
 
 def draw_reset_button(screen):
     """绘制Reset按钮"""
@@ -1998,14 +1881,24 @@ def handle_wall_following_button_click(mouse_pos):
     
     return None
 
-def main():
+def main(rows=MAZE_SIZE, cols=None, maze_file=None):
+    # 创建迷宫和机器人（指定了迷宫文件时从文件读取）
+    if maze_file is not None:
+        maze = Maze.load(maze_file)
+        rows, cols = maze.rows, maze.cols
+    else:
+        cols = rows if cols is None else cols
+        maze = Maze(rows, cols)
+    robot = Robot(maze)
+    
     # 创建窗口
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-    pygame.display.set_caption("DFS迷宫寻路 - 8x8")
+    pygame.display.set_caption(f"DFS迷宫寻路 - {rows}x{cols}")
     
-    # 创建迷宫和机器人
-    maze = Maze()
-    robot = Robot(maze)
+    # 完美迷宫生成算法（按G键依次切换）
+    from maze_generators import GENERATORS
+    generator_names = list(GENERATORS)
+    generator_index = 0
     
     # 速度控制
     robot_speed = 5  # 机器人移动速度（帧数间隔）
@@ -2056,11 +1949,25 @@ def main():
                     robot_speed = new_speed
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:  # 按R键重新生成迷宫
-                    maze = Maze()
+                    maze = Maze(rows, cols)
                     robot = Robot(maze)
                     start_time = pygame.time.get_ticks()
                     dfs_running = False
                     dfs_paused = False
+                elif event.key == pygame.K_g:  # 按G键用下一种完美迷宫算法生成迷宫
+                    generator_name = generator_names[generator_index % len(generator_names)]
+                    generator_index += 1
+                    maze.generate_maze(generator_name)
+                    print(f"迷宫生成算法: {generator_name}")
+                    robot.reset_dfs()
+                    dfs_running = False
+                    dfs_paused = False
+                    speed_counter = 0
+                    start_time = pygame.time.get_ticks()
+                elif event.key == pygame.K_s:  # 按S键把当前迷宫保存为二进制文件
+                    save_path = f"maze_{rows}x{cols}.mazb"
+                    maze.save(save_path)
+                    print(f"迷宫已保存到: {save_path}")
                 elif event.key == pygame.K_SPACE:  # 按空格键开始/暂停DFS
                     if not dfs_running and not robot.dfs_complete:
                         dfs_running = True
@@ -2080,19 +1987,8 @@ def main():
         if dfs_running and not dfs_paused and not robot.dfs_complete:
             speed_counter += 1
             if speed_counter >= robot_speed:
-                # 根据选择的算法执行不同的搜索
-                if current_algorithm == "Wall-follow":
-                    robot.wall_follow_search(robot_speed)
-                elif current_algorithm == "Greedy":
-                    robot.greedy_search()
-                elif current_algorithm == "DFS":
-                    robot.dfs_search()
-                elif current_algorithm == "BFS":
-                    robot.bfs_search()
-                elif current_algorithm == "Flood-filled":
-                    robot.flood_filled_search()
-                elif current_algorithm == "A*":
-                    robot.astar_search()
+                # 执行选择的算法产出的下一个动作（速度为1时转向不使用动画）
+                robot.step_algorithm(current_algorithm, animate=robot_speed > 1)
                 speed_counter = 0
         
         # 更新转向动画
@@ -2163,6 +2059,14 @@ def main():
                 dfs_seconds = dfs_time % 60
                 algorithm_timer_text = font_small.render(f"{current_algorithm}用时: {dfs_minutes}:{dfs_seconds:02d}", True, RED)
             screen.blit(algorithm_timer_text, (10, WINDOW_HEIGHT - 60))
+            
+            # 两阶段微型鼠：分别显示探索用时、冲刺用时和总分
+            run_stats = robot.run.stats if robot.run is not None else {}
+            if 'score' in run_stats:
+                score_text = font_small.render(f"探索: {run_stats['exploration_time'] / 1000:.1f}s  "
+                                               f"冲刺: {run_stats['speed_run_time'] / 1000:.1f}s  "
+                                               f"总分: {run_stats['score'] / 1000:.2f}s", True, GREEN)
+                screen.blit(score_text, (10, WINDOW_HEIGHT - 80))
         
         
         # 显示DFS状态
@@ -2192,4 +2096,9 @@ def main():
     sys.exit()
 
 if __name__ == "__main__":
-    main()
+    # 可选参数：迷宫行数和列数，例如 python Maze_Simulation_v1.py 32 48
+    # 或者迷宫文件，例如 python Maze_Simulation_v1.py maze_32x48.mazb
+    if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+        main(maze_file=sys.argv[1])
+    else:
+        main(*[int(arg) for arg in sys.argv[1:3]])
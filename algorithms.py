@@ -0,0 +1,1234 @@
+"""
+搜索算法（步进生成器）
+Step-Generator Search Algorithms
+
+每个算法是一个生成器函数：参数是只读的RobotView，每次产出一个动作
+（左转、右转、前进、直接移动到相邻格子、等待、完成）。算法只能通过视图读取
+机器人和迷宫，动作由使用者（界面主循环、无界面仿真引擎）应用到Robot上，
+所以同一个算法可以同时运行多份，也可以随时暂停、继续、快进或分叉。
+
+每产出一个动作对应原来Robot上单步方法的一次调用，动作序列与原实现相同。
+"""
+
+import heapq
+from collections import deque
+
+# 界面中的显示名称 -> 算法名称
+ALGORITHM_ALIASES = {
+    'Wall-follow': 'wall_follow',
+    'Pledge': 'pledge',
+    'Tremaux': 'tremaux',
+    'Greedy': 'greedy',
+    'DFS': 'dfs',
+    'BFS': 'bfs',
+    'Flood-filled': 'flood',
+    'A*': 'astar',
+    'Bi-A*': 'bidirectional_astar',
+    'JPS': 'jps',
+    'HPA*': 'hpa',
+    'Junction': 'junction',
+    'Markers': 'markers',
+    'Explore': 'explore',
+    'D* Lite': 'dstar_lite',
+    'Micromouse': 'micromouse',
+    'Micromouse 2-phase': 'micromouse_2phase',
+    'Fastest': 'fastest'
+}
+
+# 机器人转向动画期间暂停的算法（转向完成后再前进）
+WAIT_FOR_TURNS = {'wall_follow', 'fastest', 'pledge', 'tremaux', 'micromouse_2phase'}
+
+# Pledge算法中同一个(位置, 朝向, 是否扶墙)最多出现的次数，超过时认为陷入循环
+PLEDGE_REVISITS = 4
+
+# 两阶段微型鼠的计分：冲刺用时 + 探索用时 / EXPLORATION_PENALTY（与微型鼠比赛的计分方式相同）
+EXPLORATION_PENALTY = 30
+
+
+class Action:
+    """算法产出的动作：kind为动作类型，target为move_to的目标格子，path为done携带的路径"""
+
+    __slots__ = ('kind', 'target', 'path')
+
+    def __init__(self, kind, target=None, path=None):
+        self.kind = kind
+        self.target = target
+        self.path = path
+
+    def __repr__(self):
+        if self.kind == 'move_to':
+            return f"Action('move_to', {self.target})"
+        if self.kind == 'done':
+            return f"Action('done', {len(self.path) if self.path is not None else None})"
+        return f"Action('{self.kind}')"
+
+
+# 不带参数的动作只创建一次
+TURN_LEFT = Action('turn_left')
+TURN_RIGHT = Action('turn_right')
+MOVE_FORWARD = Action('move_forward')
+WAIT = Action('wait')  # 本次不做任何动作
+
+
+# 转向感知规划的动作名称 -> 机器人动作（掉头为两次右转）
+PLAN_ACTIONS = {
+    'forward': (MOVE_FORWARD,),
+    'left': (TURN_LEFT,),
+    'right': (TURN_RIGHT,),
+    'u_turn': (TURN_RIGHT, TURN_RIGHT)
+}
+
+
+def move_to(target):
+    """直接移动到相邻格子（不转向）"""
+    return Action('move_to', target=target)
+
+
+def done(path=None):
+    """算法结束：path为到达终点时的路径（供走向终点阶段使用），没有找到终点时为None"""
+    return Action('done', path=path)
+
+
+class MazeView:
+    """迷宫的只读视图：只提供查询，不提供修改墙壁的方法"""
+
+    def __init__(self, maze):
+        self._maze = maze
+        # 只读查询直接绑定到迷宫的方法
+        self.in_bounds = maze.in_bounds
+        self.to_index = maze.to_index
+        self.to_pos = maze.to_pos
+        self.get_open_mask = maze.get_open_mask
+        self.get_open_neighbors = maze.get_open_neighbors
+        self.is_valid_move_between = maze.is_valid_move_between
+        self.wall_between = maze.wall_between
+        self.has_wall = maze.has_wall
+        self.is_connected = maze.is_connected
+        self.bfs_distances = maze.bfs_distances
+        self.distance_map = maze.distance_map
+        self.shortest_path = maze.shortest_path
+        self.trace_parents = maze.trace_parents
+        self.wall_cells = maze.wall_cells
+        self.get_landmarks = maze.get_landmarks
+        self.get_heuristic = maze.get_heuristic
+        self.get_hierarchy = maze.get_hierarchy
+        self.get_junction_graph = maze.get_junction_graph
+        # 监听墙壁变化不会修改迷宫
+        self.add_wall_listener = maze.add_wall_listener
+        self.remove_wall_listener = maze.remove_wall_listener
+
+    @property
+    def rows(self):
+        return self._maze.rows
+
+    @property
+    def cols(self):
+        return self._maze.cols
+
+    @property
+    def goal(self):
+        return self._maze.goal
+
+    @property
+    def castle(self):
+        return self._maze.castle
+
+    @property
+    def robot_pos(self):
+        return self._maze.robot_pos
+
+    @property
+    def numbered_squares(self):
+        return dict(self._maze.numbered_squares)
+
+    @property
+    def lettered_circles(self):
+        return dict(self._maze.lettered_circles)
+
+    @property
+    def version(self):
+        return self._maze.version
+
+    @property
+    def mask_steps(self):
+        return self._maze.mask_steps
+
+    def get_adjacency(self):
+        """最新的邻接索引（只读）"""
+        return memoryview(self._maze.get_adjacency()).toreadonly()
+
+
+class RobotView:
+    """算法看到的机器人：只能读取位置、朝向和传感器
+
+    stats是算法自己的统计信息（例如每一步的计算量），由使用者读取。
+    """
+
+    def __init__(self, robot):
+        self._robot = robot
+        self.maze = MazeView(robot.maze)
+        self.stats = {}
+
+    @property
+    def position(self):
+        return self._robot.position
+
+    @property
+    def direction(self):
+        return self._robot.direction
+
+    def sense(self, sensor_type):
+        """超声波传感器读数（'front'、'left'、'right'），0表示有墙"""
+        return self._robot.get_sensor_distance(sensor_type)
+
+    def clock(self):
+        """机器人计时器的当前时间（毫秒，无界面运行时是模拟时钟）"""
+        return self._robot.clock()
+
+    def is_free(self, turn):
+        """相对当前朝向的一侧是否可以通行：turn为0=前方，1=右侧，3=左侧"""
+        return (self.maze.get_open_mask(self._robot.position) >> ((self._robot.direction + turn) % 4)) & 1 == 1
+
+
+def resolve_algorithm(name):
+    """把算法名称（或界面中的显示名称）转换成ALGORITHMS中的键"""
+    key = ALGORITHM_ALIASES.get(name, name)
+    if key not in ALGORITHMS:
+        raise ValueError(f"未知的算法: {name}，可选: {', '.join(ALGORITHMS)}")
+    return key
+
+
+def step_towards(view, target):
+    """朝相邻目标格子走一步需要的动作：先逐次转向（转一次或两次时右转），朝向正确后前进
+
+    已经在目标格子时返回None。
+    """
+    row, col = view.position
+    target_row, target_col = target
+    if target_row < row:
+        target_direction = 0
+    elif target_row > row:
+        target_direction = 2
+    elif target_col < col:
+        target_direction = 3
+    elif target_col > col:
+        target_direction = 1
+    else:
+        return None
+
+    turns_needed = (target_direction - view.direction) % 4
+    if turns_needed == 0:
+        return MOVE_FORWARD
+    return TURN_LEFT if turns_needed == 3 else TURN_RIGHT
+
+
+def dfs(view):
+    """深度优先搜索：按上、下、左、右的顺序进入第一个未访问的邻居，无路可走时沿路径退回"""
+    from Maze_Simulation_v1 import ORDER_UDLR
+
+    maze = view.maze
+    goal = maze.goal
+    start = view.position
+    path = []  # 走过的格子（不含起点）
+    visited = {start}
+    target = None
+
+    while view.position != goal:
+        if target is None or view.position == target:
+            # 到达目标格子后选择下一个目标
+            target = None
+            for neighbor in maze.get_open_neighbors(view.position, ORDER_UDLR):
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    target = neighbor
+                    break
+            else:
+                if not path:
+                    # 回到起点也没有更多位置可探索
+                    yield done()
+                    return
+                # 回溯到上一个位置（路径只剩一格时回到起点）
+                path.pop()
+                target = path[-1] if path else start
+
+        action = step_towards(view, target)
+        if action is None:
+            yield WAIT
+            continue
+
+        position = view.position
+        yield action
+        if action is MOVE_FORWARD:
+            if view.position != position:
+                path.append(view.position)
+            else:
+                target = None  # 无法前进，重新选择目标
+
+    yield done(path)
+
+
+def bfs(view):
+    """广度优先搜索：与原实现一样按DFS的方式逐格移动探索（机器人无法瞬移到队列中的下一个格子）"""
+    return dfs(view)
+
+
+def greedy(view):
+    """改进的贪心搜索（最佳优先）：到终点的ALT地标估计 + 死胡同惩罚 - 朝向终点奖励，无路可走时智能回溯"""
+    maze = view.maze
+    goal = maze.goal
+    goal_row, goal_col = goal
+    start = view.position
+    path = []
+    visited = set()
+    target = None
+    estimate = None  # 当前墙壁版本上到终点的启发函数
+    estimate_version = None
+    retreat = deque()  # 回溯时还要沿路径退回的格子
+    retreating = False
+
+    def unvisited_neighbors(pos):
+        return [neighbor for neighbor in maze.get_open_neighbors(pos) if neighbor not in visited]
+
+    def score(pos):
+        row, col = view.position
+        # 死胡同惩罚：没有未访问的邻居为10，只有一个为5
+        remaining = len(unvisited_neighbors(pos))
+        penalty = 10 if remaining == 0 else 5 if remaining == 1 else 0
+        # 方向奖励：朝终点方向移动为2
+        row_diff = goal_row - row
+        col_diff = goal_col - col
+        if row_diff != 0 and pos[0] == row + (1 if row_diff > 0 else -1):
+            bonus = 2
+        elif col_diff != 0 and pos[1] == col + (1 if col_diff > 0 else -1):
+            bonus = 2
+        else:
+            bonus = 0
+        return estimate(maze.to_index(pos)) + penalty - bonus
+
+    while view.position != goal:
+        if target is None or view.position == target:
+            visited.add(view.position)
+            if estimate_version != maze.version:
+                estimate = maze.get_heuristic(goal)
+                estimate_version = maze.version
+            candidates = unvisited_neighbors(view.position)
+            retreating = bool(retreat)
+            if retreat:
+                target = retreat.popleft()
+            elif candidates:
+                target = min(candidates, key=score)
+            else:
+                # 智能回溯：沿路径往回找最近的还有未访问邻居的格子（包括起点），一格一格退回去
+                for i in range(len(path) - 2, -2, -1):
+                    if unvisited_neighbors(path[i] if i >= 0 else start):
+                        retreat.extend(reversed(path[max(i, 0):-1]))
+                        if i < 0:
+                            retreat.append(start)
+                        del path[i + 1:]
+                        target = retreat.popleft()
+                        retreating = True
+                        break
+                else:
+                    yield done()
+                    return
+
+        action = step_towards(view, target)
+        if action is None:
+            yield WAIT
+            continue
+
+        position = view.position
+        yield action
+        if action is MOVE_FORWARD and view.position != position and not retreating:
+            path.append(view.position)
+
+    yield done(path)
+
+
+def flood(view):
+    """洪水填充：从终点BFS得到距离表，每次移动到距离最小的未访问邻居，无路可走时沿路径退回"""
+    maze = view.maze
+    goal = maze.goal
+    cols = maze.cols
+    distances = maze.distance_map([goal])
+    path = []
+    visited = set()
+
+    while view.position != goal:
+        visited.add(view.position)
+        moves = [neighbor for neighbor in maze.get_open_neighbors(view.position)
+                 if neighbor not in visited and distances[neighbor[0] * cols + neighbor[1]] >= 0]
+        if moves:
+            best = min(moves, key=lambda pos: distances[pos[0] * cols + pos[1]])
+            path.append(best)
+            yield move_to(best)
+        elif path:
+            path.pop()
+            yield move_to(path[-1] if path else maze.robot_pos)
+        else:
+            yield done()
+            return
+
+    yield done(path)
+
+
+def wall_follow(view):
+    """墙跟随（标准右手法则）：右侧空闲就右转再前进，否则前方、左侧，都不通时右转
+
+    转向后的前进在转向动画结束后执行（见WAIT_FOR_TURNS）。右手法则是确定性的，同一个
+    (位置, 朝向)状态出现第二次说明终点不在沿墙能走到的范围内，机器人会一直绕圈：
+    这时记下view.stats['loop']并改用Tremaux算法从当前位置继续。
+    """
+    maze = view.maze
+    goal = maze.goal
+    path = []
+    seen = bytearray(maze.rows * maze.cols)  # 每个格子一个字节，第d位表示朝向d的状态出现过
+    seen_version = maze.version
+
+    while view.position != goal:
+        if seen_version != maze.version:
+            # 墙壁变化后旧状态不再能说明循环
+            seen = bytearray(maze.rows * maze.cols)
+            seen_version = maze.version
+        index = maze.to_index(view.position)
+        bit = 1 << view.direction
+        if seen[index] & bit:
+            view.stats['loop'] = view.position
+            yield from tremaux(view, path)
+            return
+        seen[index] |= bit
+
+        if view.is_free(1):
+            yield TURN_RIGHT
+        elif not view.is_free(0):
+            yield TURN_LEFT if view.is_free(3) else TURN_RIGHT
+        else:
+            position = view.position
+            yield MOVE_FORWARD
+            if view.position != position:
+                path.append(view.position)
+            continue
+
+        # 转向之后前进一步
+        position = view.position
+        yield MOVE_FORWARD
+        if view.position != position:
+            path.append(view.position)
+
+    yield done(path)
+
+
+def pledge(view):
+    """Pledge算法：朝首选方向（终点所在的方向）直走，碰墙后右手扶墙并累计转角（右转+1、左转-1），
+    转角回到0且首选方向通畅时离开墙壁继续直走
+
+    Pledge保证能绕出任何障碍，但终点被墙围在中间时可能一直绕圈。(位置, 朝向, 是否扶墙, 转角)
+    状态重复、或同一个(位置, 朝向, 是否扶墙)出现超过PLEDGE_REVISITS次时认为陷入循环，
+    记下view.stats['loop']并改用Tremaux算法。
+    """
+    maze = view.maze
+    goal = maze.goal
+    row, col = view.position
+    goal_row, goal_col = goal
+    if abs(goal_row - row) >= abs(goal_col - col):
+        preferred = 0 if goal_row < row else 2
+    else:
+        preferred = 3 if goal_col < col else 1
+    path = []
+    angle = 0
+    following = False
+    seen = {}  # (格子下标 * 4 + 朝向) * 2 + 是否扶墙 -> 出现过的转角
+
+    def forward():
+        position = view.position
+        yield MOVE_FORWARD
+        if view.position != position:
+            path.append(view.position)
+
+    # 先转向首选方向（不计入转角）
+    while view.direction != preferred:
+        yield TURN_LEFT if (preferred - view.direction) % 4 == 3 else TURN_RIGHT
+
+    while view.position != goal:
+        key = (maze.to_index(view.position) * 4 + view.direction) * 2 + following
+        angles = seen.setdefault(key, set())
+        if angle in angles or len(angles) >= PLEDGE_REVISITS:
+            view.stats['loop'] = view.position
+            yield from tremaux(view, path)
+            return
+        angles.add(angle)
+
+        if not following:
+            if view.is_free(0):
+                yield from forward()
+            else:
+                # 碰墙：左转让墙在右手边
+                following = True
+                angle -= 1
+                yield TURN_LEFT
+        elif angle == 0 and view.is_free(0):
+            following = False
+            yield from forward()
+        elif view.is_free(1):
+            angle += 1
+            yield TURN_RIGHT
+            yield from forward()
+        elif view.is_free(0):
+            yield from forward()
+        else:
+            angle -= 1
+            yield TURN_LEFT
+
+    yield done(path)
+
+
+def tremaux(view, path=None):
+    """Tremaux算法：经过一条通路就在上面做一个标记（每条边最多两个），总能找到终点或确定到不了
+
+    到达一个格子时：来的那条通路只有一个标记、而这个格子的其他通路已经有标记（走回了到过的地方），
+    就原路返回；否则走标记最少的通路（优先没有标记的），不走有两个标记的通路。标记按格子的
+    右边和下边存放在一个字节数组里（下标为格子下标 * 2 + 0或1），每条边最多走两次，运行时间有界。
+    path是之前已经走过的格子（从其他算法切换过来时），新走的格子接在后面。
+    """
+    from Maze_Simulation_v1 import DIRECTION_DELTAS
+
+    maze = view.maze
+    goal = maze.goal
+    cols = maze.cols
+    path = [] if path is None else path
+    marks = bytearray(maze.rows * cols * 2)
+    came_from = None  # 进入当前格子经过的边
+
+    def edge(index, direction):
+        """格子在direction一侧的边在marks中的下标"""
+        if direction == 1:
+            return index * 2
+        if direction == 2:
+            return index * 2 + 1
+        if direction == 3:
+            return (index - 1) * 2
+        return (index - cols) * 2 + 1
+
+    while view.position != goal:
+        index = maze.to_index(view.position)
+        mask = maze.get_open_mask(view.position)
+        options = [(edge(index, d), d) for d in range(4) if (mask >> d) & 1]
+        back = [d for e, d in options if e == came_from]
+        marked_elsewhere = any(marks[e] for e, d in options if e != came_from)
+        if came_from is not None and marks[came_from] == 1 and marked_elsewhere and back:
+            direction = back[0]
+        else:
+            candidates = [(marks[e], e != came_from, d) for e, d in options if marks[e] < 2]
+            if not candidates:
+                yield done()
+                return
+            # 标记最少的优先，同样少时不走回头路
+            direction = min(candidates, key=lambda item: (item[0], not item[1]))[2]
+
+        came_from = edge(index, direction)
+        marks[came_from] += 1
+        target = (view.position[0] + DIRECTION_DELTAS[direction][0], view.position[1] + DIRECTION_DELTAS[direction][1])
+        while view.position != target:
+            action = step_towards(view, target)
+            position = view.position
+            yield action
+            if action is MOVE_FORWARD:
+                if view.position == position:
+                    break  # 被挡住（墙壁在运行中变化），按新的墙壁重新选择
+                path.append(view.position)
+
+    yield done(path)
+
+
+def astar_path(maze, start, goal, stats=None):
+    """A*最短路径（ALT地标启发），返回包含起点和终点的位置列表，不可达时返回None
+
+    给出stats字典时把展开的格子数累加到stats['expanded']。
+    """
+    masks = maze.get_adjacency()
+    steps = maze.mask_steps
+    start_index = maze.to_index(start)
+    goal_index = maze.to_index(goal)
+    heuristic = maze.get_heuristic(goal)
+
+    # 优先队列：(f_score, g_score, 格子下标)，路径用父指针记录
+    open_set = [(heuristic(start_index), 0, start_index)]
+    g_scores = {start_index: 0}
+    parent = {start_index: start_index}
+    closed_set = set()
+
+    try:
+        while open_set:
+            f_score, g_score, current = heapq.heappop(open_set)
+            if current in closed_set:
+                continue
+            closed_set.add(current)
+
+            if current == goal_index:
+                return maze.trace_parents(parent, start_index, goal_index)
+
+            new_g_score = g_score + 1
+            for step in steps[masks[current]]:
+                neighbor = current + step
+                if neighbor not in closed_set and new_g_score < g_scores.get(neighbor, new_g_score + 1):
+                    g_scores[neighbor] = new_g_score
+                    parent[neighbor] = current
+                    heapq.heappush(open_set, (new_g_score + heuristic(neighbor), new_g_score, neighbor))
+
+        return None
+    finally:
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + len(closed_set)
+
+
+def bidirectional_astar_path(maze, start, goal, stats=None):
+    """双向A*：起点向终点、终点向起点各做一个A*（ALT地标启发），两边交替扩展较小的开放表
+
+    记录两棵搜索树之间最短的连接，任一边开放表的最小f值不小于它时就是最优路径。
+    返回包含起点和终点的位置列表，不可达时返回None。
+    给出stats字典时把两个方向展开的格子数之和累加到stats['expanded']。
+    """
+    if start == goal:
+        return [start]
+
+    masks = maze.get_adjacency()
+    steps = maze.mask_steps
+    start_index = maze.to_index(start)
+    goal_index = maze.to_index(goal)
+    to_goal = maze.get_heuristic(goal)
+    to_start = maze.get_heuristic(start)
+
+    # 每个方向：(开放表, g值, 父指针, 到搜索目标的启发函数)
+    forward = ([(to_goal(start_index), 0, start_index)], {start_index: 0}, {start_index: start_index}, to_goal)
+    backward = ([(to_start(goal_index), 0, goal_index)], {goal_index: 0}, {goal_index: goal_index}, to_start)
+    best = None  # 最短连接的长度
+    meet = None  # 最短连接经过的格子
+    expanded = 0
+
+    while forward[0] and backward[0]:
+        if best is not None and (forward[0][0][0] >= best or backward[0][0][0] >= best):
+            break
+        side, other = (forward, backward) if len(forward[0]) <= len(backward[0]) else (backward, forward)
+        open_set, g_scores, parent, heuristic = side
+        f_score, g_score, current = heapq.heappop(open_set)
+        if g_score > g_scores[current]:
+            continue
+        expanded += 1
+
+        new_g_score = g_score + 1
+        for step in steps[masks[current]]:
+            neighbor = current + step
+            if new_g_score < g_scores.get(neighbor, new_g_score + 1):
+                g_scores[neighbor] = new_g_score
+                parent[neighbor] = current
+                heapq.heappush(open_set, (new_g_score + heuristic(neighbor), new_g_score, neighbor))
+                if neighbor in other[1] and (best is None or new_g_score + other[1][neighbor] < best):
+                    best = new_g_score + other[1][neighbor]
+                    meet = neighbor
+
+    if stats is not None:
+        stats['expanded'] = stats.get('expanded', 0) + expanded
+    if meet is None:
+        return None
+    path = maze.trace_parents(forward[2], start_index, meet)
+    path.extend(reversed(maze.trace_parents(backward[2], goal_index, meet)[:-1]))
+    return path
+
+
+def jps_path(maze, start, goal, stats=None):
+    """跳点搜索（Jump Point Search），返回包含起点和终点的位置列表，不可达时返回None
+
+    按四连通、墙在格子边上的表示改写：等长路径中规定"先横向、后纵向"的走法为标准路径。
+    纵向跳跃只在侧面出现强制邻居（侧面开着，但从上一格先横走再纵走过不去）时停下；
+    横向跳跃的每一格都向上下各做一次纵向跳跃，能跳到跳点的格子才是跳点。开放表里只有
+    跳点，跳点之间都是直线，对称的等长路径不会被重复展开，适合空旷区域多的迷宫。
+    给出stats字典时把展开的跳点数累加到stats['expanded']。
+    """
+    masks = maze.get_adjacency()
+    cols = maze.cols
+    start_index = maze.to_index(start)
+    goal_index = maze.to_index(goal)
+    offsets = (-cols, 1, cols, -1)  # 上、右、下、左
+    heuristic = maze.get_heuristic(goal)
+
+    def forced(previous, direction):
+        """从previous纵向走一格后，两侧中先横走再纵走到不了的方向"""
+        bit = 1 << direction
+        return [side for side in (1, 3)
+                if not ((masks[previous] >> side) & 1 and masks[previous + offsets[side]] & bit)]
+
+    def jump_vertical(index, direction):
+        step = offsets[direction]
+        bit = 1 << direction
+        while masks[index] & bit:
+            previous = index
+            index += step
+            if index == goal_index:
+                return index
+            mask = masks[index]
+            # 与forced相同的判断，展开写以减少纵向扫描的开销（右侧位2，左侧位8）
+            if ((mask & 2 and not (masks[previous] & 2 and masks[previous + 1] & bit))
+                    or (mask & 8 and not (masks[previous] & 8 and masks[previous - 1] & bit))):
+                return index
+        return None
+
+    def jump(index, direction):
+        """从index沿direction跳跃，返回遇到的下一个跳点，碰墙前没有跳点时返回None"""
+        if not direction & 1:
+            return jump_vertical(index, direction)
+        step = offsets[direction]
+        bit = 1 << direction
+        while masks[index] & bit:
+            index += step
+            if index == goal_index or jump_vertical(index, 0) is not None or jump_vertical(index, 2) is not None:
+                return index
+        return None
+
+    def successors(index, arrival):
+        """跳点需要继续跳跃的方向：横向到达时继续横走或转纵向，纵向到达时继续纵走或转向强制邻居"""
+        if arrival < 0:
+            return (0, 1, 2, 3)
+        if arrival & 1:
+            return (arrival, 0, 2)
+        return [arrival] + forced(index - offsets[arrival], arrival)
+
+    # 优先队列：(f_score, g_score, 跳点下标, 到达方向)，父指针指向上一个跳点
+    open_set = [(heuristic(start_index), 0, start_index, -1)]
+    g_scores = {start_index: 0}
+    parent = {start_index: start_index}
+    closed_set = set()
+
+    try:
+        while open_set:
+            f_score, g_score, current, arrival = heapq.heappop(open_set)
+            if current in closed_set:
+                continue
+            closed_set.add(current)
+
+            if current == goal_index:
+                # 把相邻跳点之间的直线段展开成逐格路径
+                jumps = maze.trace_parents(parent, start_index, goal_index)
+                path = jumps[:1]
+                for (row, col), (next_row, next_col) in zip(jumps, jumps[1:]):
+                    d_row = (next_row > row) - (next_row < row)
+                    d_col = (next_col > col) - (next_col < col)
+                    while (row, col) != (next_row, next_col):
+                        row, col = row + d_row, col + d_col
+                        path.append((row, col))
+                return path
+
+            for direction in successors(current, arrival):
+                neighbor = jump(current, direction)
+                if neighbor is None or neighbor in closed_set:
+                    continue
+                row, col = divmod(neighbor, cols)
+                current_row, current_col = divmod(current, cols)
+                new_g_score = g_score + abs(row - current_row) + abs(col - current_col)
+                if new_g_score < g_scores.get(neighbor, new_g_score + 1):
+                    g_scores[neighbor] = new_g_score
+                    parent[neighbor] = current
+                    heapq.heappush(open_set, (new_g_score + heuristic(neighbor), new_g_score, neighbor, direction))
+
+        return None
+    finally:
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + len(closed_set)
+
+
+def hpa_path(maze, start, goal, stats=None):
+    """分层A*（见planners.HierarchicalPlanner，按迷宫缓存），返回包含起点和终点的位置列表，不可达时返回None"""
+    return maze.get_hierarchy().find_path(start, goal, stats)
+
+
+def junction_path(maze, start, goal, stats=None):
+    """在走廊收缩图（按墙壁版本缓存）上搜索并展开成逐格路径，不可达时返回None"""
+    return maze.get_junction_graph().find_path(start, goal, stats)
+
+
+def follow_plan(view, search):
+    """用search(maze, start, goal, stats)规划一次并缓存路径，沿路径逐格移动
+
+    只有迷宫版本变化（墙壁被修改）、机器人不在计划路径上或下一条边被墙挡住时才重新规划。
+    """
+    maze = view.maze
+    goal = maze.goal
+    plan = None
+    plan_version = None
+    index = 0  # 机器人在plan中的位置
+
+    while view.position != goal:
+        if (plan is None or plan_version != maze.version or plan[index] != view.position
+                or not maze.is_valid_move_between(view.position, plan[index + 1])):
+            plan = search(maze, view.position, goal, view.stats)
+            if plan is None:
+                yield done()
+                return
+            plan_version = maze.version
+            index = 0
+
+        index += 1
+        yield move_to(plan[index])
+
+    yield done(plan[1:] if plan is not None else [])
+
+
+def astar(view):
+    """A*：规划一次并缓存路径，沿路径逐格移动（展开的格子数记在view.stats['expanded']中）"""
+    return follow_plan(view, astar_path)
+
+
+def bidirectional_astar(view):
+    """双向A*：与A*相同地规划一次并沿路径移动（两个方向展开的格子数之和记在view.stats['expanded']中）"""
+    return follow_plan(view, bidirectional_astar_path)
+
+
+def jps(view):
+    """跳点搜索：与A*相同地规划一次并沿路径移动，只展开跳点（展开数记在view.stats['expanded']中）"""
+    return follow_plan(view, jps_path)
+
+
+def hpa(view):
+    """分层A*：在簇之间的抽象图上规划，沿路径移动时每次只把眼前一段还原成逐格路径
+
+    与follow_plan相同，迷宫版本变化、机器人不在计划位置或下一步被墙挡住时重新规划；
+    重新规划后没走到的段不会被还原。展开的抽象节点数记在view.stats['expanded']中。
+    """
+    maze = view.maze
+    goal = maze.goal
+    planner = None
+    abstract = None
+    plan_version = None
+    leg = []  # 当前这一段还没走的格子
+    walked = []  # 本次规划以来走过的格子
+
+    while view.position != goal:
+        if (abstract is None or plan_version != maze.version or walked and walked[-1] != view.position
+                or leg and not maze.is_valid_move_between(view.position, leg[0])):
+            planner = maze.get_hierarchy()
+            abstract = planner.plan(view.position, goal, view.stats)
+            if abstract is None:
+                yield done()
+                return
+            plan_version = maze.version
+            leg = []
+            walked = []
+            index = 0  # 当前这一段在abstract中的起点
+
+        if not leg:
+            leg = planner.refine(abstract[index], abstract[index + 1])
+            index += 1
+        walked.append(leg.pop(0))
+        yield move_to(walked[-1])
+
+    yield done(walked)
+
+
+def junction(view):
+    """走廊收缩图上的A*：走廊整段作为一条边，只展开岔路口和死胡同（展开数记在view.stats['expanded']中）"""
+    return follow_plan(view, junction_path)
+
+
+def markers(view):
+    """多目标路线：按最短的顺序经过所有数字方块和字母圆圈，最后到达终点
+
+    访问顺序和路线总步数记在view.stats['route']、view.stats['route_length']中。
+    墙壁变化或下一步被挡住时，从当前位置对还没经过的标记重新规划。
+    """
+    from planners import marker_route
+
+    maze = view.maze
+    goal = maze.goal
+    remaining = {str(number): pos for number, pos in maze.numbered_squares.items()}
+    remaining.update(maze.lettered_circles)
+    visited = []
+    path = []
+    plan = None
+    plan_version = None
+    index = 0  # 机器人在plan中的位置
+
+    while True:
+        for name, pos in list(remaining.items()):
+            if pos == view.position:
+                visited.append(name)
+                del remaining[name]
+        if not remaining and view.position == goal:
+            break
+
+        if (plan is None or plan_version != maze.version or plan[index] != view.position or index + 1 == len(plan)
+                or not maze.is_valid_move_between(view.position, plan[index + 1])):
+            route = marker_route(maze, view.position, goal, remaining)
+            if route is None:
+                yield done()
+                return
+            order, plan, length = route
+            view.stats['route'] = visited + order
+            view.stats['route_length'] = len(path) + length
+            plan_version = maze.version
+            index = 0
+
+        index += 1
+        path.append(plan[index])
+        yield move_to(plan[index])
+
+    yield done(path)
+
+
+def explore(view):
+    """前沿探索：只知道传感器发现的墙，每次前往用时最近的前沿格子，可达区域探索完后沿已知地图前往终点
+
+    view.stats记录到过的格子数explored、前进的格数travel、每探索一格平均前进的格数travel_per_cell
+    和选择前沿时弹出的状态数expanded。
+    """
+    from planners import FrontierExplorer
+
+    maze = view.maze
+    goal = maze.goal
+    explorer = FrontierExplorer(maze.rows, maze.cols)
+    stats = view.stats
+    stats['travel'] = 0
+    path = []
+    route = deque()  # 前往当前前沿（探索完后是终点）的剩余格子
+    exploring = True
+
+    while exploring or view.position != goal:
+        position = view.position
+        for sensor, turn in (('front', 0), ('left', 3), ('right', 1)):
+            explorer.record(position, (view.direction + turn) % 4, view.sense(sensor) > 0)
+        explorer.visit(position)
+        stats['explored'] = explorer.explored
+        stats['travel_per_cell'] = stats['travel'] / explorer.explored
+        stats['expanded'] = explorer.expanded
+        if not explorer.is_sensed(position):
+            # 只有起点背后没有测过：转过去再测
+            yield TURN_RIGHT
+            continue
+
+        if not route:
+            route = explorer.route(position, view.direction, None if exploring else goal)
+            if route is None and exploring:
+                exploring = False
+                route = explorer.route(position, view.direction, goal) if position != goal else []
+            if route is None:
+                yield done()
+                return
+            route = deque(route)
+            if not route:
+                break
+
+        action = step_towards(view, route[0])
+        yield action
+        if action is MOVE_FORWARD:
+            if view.position == position:
+                route.clear()  # 被挡住（墙壁在运行中变化），重新选择
+                continue
+            route.popleft()
+            path.append(view.position)
+            stats['travel'] += 1
+
+    stats['travel_per_cell'] = stats['travel'] / explorer.explored
+    yield done(path)
+
+
+def dstar_lite(view):
+    """D* Lite：从终点反向搜索，墙壁变化时只修复受影响的部分（增量规划），每次沿最短路径移动一格"""
+    from planners import DStarLite
+
+    maze = view.maze
+    goal = maze.goal
+    planner = DStarLite(maze, view.position, goal)
+    path = []
+    try:
+        while view.position != goal:
+            next_cell = planner.next_cell(view.position)
+            if next_cell is None:
+                view.stats['expanded'] = planner.expanded
+                yield done()
+                return
+            view.stats['expanded'] = planner.expanded
+            path.append(next_cell)
+            yield move_to(next_cell)
+        yield done(path)
+    finally:
+        planner.close()
+
+
+def micromouse(view):
+    """微型鼠洪水填充：从只有边界的墙壁地图出发，用传感器发现墙壁并增量修正步数
+
+    每一格的修正次数记在view.stats['flood_updates']中（每走一格一项）。
+    """
+    from planners import IncrementalFlood
+
+    goal = view.maze.goal
+    flood = IncrementalFlood(view.maze.rows, view.maze.cols, [goal])
+    updates = view.stats.setdefault('flood_updates', [])
+    path = []
+    pending = 0  # 在当前格子里累计的修正次数
+
+    while view.position != goal:
+        # 前方、左侧、右侧传感器读数为0的一侧有墙
+        for sensor, turn in (('front', 0), ('left', 3), ('right', 1)):
+            if view.sense(sensor) == 0:
+                flood.add_wall(view.position, (view.direction + turn) % 4)
+        pending += flood.update()
+        if flood.distance(view.position) is None:
+            yield done()
+            return
+
+        next_cell = flood.next_cell(view.position, view.direction)
+        if next_cell is None:
+            yield done()
+            return
+        action = step_towards(view, next_cell)
+        position = view.position
+        yield action
+        if action is MOVE_FORWARD and view.position != position:
+            path.append(view.position)
+            updates.append(pending)
+            pending = 0
+
+    yield done(path)
+
+
+def micromouse_2phase(view, costs=None):
+    """两阶段微型鼠：先探索到能证明已知的最短路线就是全局最短，回到起点后在学到的地图上冲刺
+
+    第一阶段在起点和终点之间来回用洪水填充前进（两个IncrementalFlood，未知的墙边按可以通行处理），
+    乐观地图上的步数是真实最短步数的下界；只走测过可以通行的边得到的步数是上界，两者相等时
+    最短路线已经确定。一趟没有发现新墙就说明走过的路线长度等于下界，所以最多来回到墙都测完为止。
+    第二阶段在学到的地图（没测过的边按有墙处理）上用fastest_path规划用时最短的路线并执行。
+
+    view.stats记录optimum（最短步数）、exploration_time和exploration_steps（探索加返回起点）、
+    speed_run_time和speed_run_steps（冲刺），以及score = 冲刺用时 + 探索用时 / EXPLORATION_PENALTY，
+    时间单位为毫秒。done()给出的路径是冲刺路线。
+    """
+    from Maze_Simulation_v1 import DIRECTION_DELTAS, Maze
+    from planners import IncrementalFlood, fastest_path
+
+    maze = view.maze
+    goal = maze.goal
+    start = view.position
+    rows, cols = maze.rows, maze.cols
+    to_goal = IncrementalFlood(rows, cols, [goal])
+    to_start = IncrementalFlood(rows, cols, [start])
+    learned = Maze(rows, cols, generate=False)  # 学到的地图：只有测过可以通行的边是通的
+    learned.fill_walls()
+    learned.goal = goal
+    stats = view.stats
+    started = view.clock()
+
+    def neighbor_of(pos, direction):
+        return pos[0] + DIRECTION_DELTAS[direction][0], pos[1] + DIRECTION_DELTAS[direction][1]
+
+    def sense():
+        position = view.position
+        for sensor, turn in (('front', 0), ('left', 3), ('right', 1)):
+            direction = (view.direction + turn) % 4
+            if view.sense(sensor) == 0:
+                to_goal.add_wall(position, direction)
+                to_start.add_wall(position, direction)
+            else:
+                learned.remove_wall(*learned.wall_between(position, neighbor_of(position, direction)))
+        to_goal.update()
+        to_start.update()
+
+    def drive(target, path):
+        """在学到的地图上按用时最短的路线开到target，被挡住时记下墙壁重新规划，到不了时返回False"""
+        while view.position != target:
+            plan = fastest_path(learned, view.position, view.direction, target, costs)
+            if plan is None:
+                return False
+            for name in plan[0]:
+                for action in PLAN_ACTIONS[name]:
+                    position = view.position
+                    yield action
+                    if action is MOVE_FORWARD and view.position != position:
+                        path.append(view.position)
+                if name == 'forward' and view.position == position:
+                    learned.set_wall(*learned.wall_between(position, neighbor_of(position, view.direction)))
+                    break
+        return True
+
+    # 第一阶段：来回探索直到最短路线得到证明
+    explored = []
+    heading_to_goal = True
+    checked = None
+    while True:
+        sense()
+        if to_goal.distance(view.position) is None:
+            yield done()
+            return
+        key = (learned.version, to_goal.updates)
+        if key != checked:
+            # 只有发现新的通路或下界变化时才需要重新比较上下界
+            checked = key
+            optimum = to_goal.distance(start)
+            if learned.distance_map([goal])[learned.to_index(start)] == optimum:
+                break
+
+        flood = to_goal if heading_to_goal else to_start
+        if view.position == (goal if heading_to_goal else start):
+            heading_to_goal = not heading_to_goal
+            continue
+        next_cell = flood.next_cell(view.position, view.direction)
+        if next_cell is None:
+            yield done()
+            return
+        action = step_towards(view, next_cell)
+        position = view.position
+        yield action
+        if action is MOVE_FORWARD and view.position != position:
+            explored.append(view.position)
+
+    stats['optimum'] = optimum
+    if not (yield from drive(start, explored)):
+        yield done()
+        return
+    exploration_end = view.clock()
+    stats['exploration_time'] = exploration_end - started
+    stats['exploration_steps'] = len(explored)
+
+    # 第二阶段：冲刺
+    path = []
+    reached = yield from drive(goal, path)
+    stats['speed_run_time'] = view.clock() - exploration_end
+    stats['speed_run_steps'] = len(path)
+    stats['score'] = stats['speed_run_time'] + stats['exploration_time'] / EXPLORATION_PENALTY
+    yield done(path if reached else None)
+
+
+def fastest(view, costs=None):
+    """用时最短路线：在(格子, 朝向)状态空间上规划（转向比直行慢得多），按计划转向和前进
+
+    costs见planners.DEFAULT_TURN_COSTS；墙壁变化或前进被挡住时从当前位置和朝向重新规划。
+    """
+    from planners import fastest_path
+
+    maze = view.maze
+    goal = maze.goal
+    path = []
+
+    while view.position != goal:
+        plan = fastest_path(maze, view.position, view.direction, goal, costs)
+        if plan is None:
+            yield done()
+            return
+        version = maze.version
+        for name in plan[0]:
+            for action in PLAN_ACTIONS[name]:
+                position = view.position
+                yield action
+                if action is MOVE_FORWARD and view.position != position:
+                    path.append(view.position)
+            if maze.version != version or (name == 'forward' and view.position == position):
+                break
+
+    yield done(path)
+
+
+# 算法名称 -> 步进生成器函数
+ALGORITHMS = {
+    'wall_follow': wall_follow,
+    'pledge': pledge,
+    'tremaux': tremaux,
+    'greedy': greedy,
+    'dfs': dfs,
+    'bfs': bfs,
+    'flood': flood,
+    'astar': astar,
+    'bidirectional_astar': bidirectional_astar,
+    'jps': jps,
+    'hpa': hpa,
+    'junction': junction,
+    'markers': markers,
+    'explore': explore,
+    'dstar_lite': dstar_lite,
+    'micromouse': micromouse,
+    'micromouse_2phase': micromouse_2phase,
+    'fastest': fastest
+}
+
+
+class AlgorithmRun:
+    """一次算法运行：从生成器取出动作并应用到Robot上（界面和无界面引擎共用）
+
+    animate为False时转向不播放动画。
+    """
+
+    def __init__(self, robot, algorithm, animate=True):
+        self.robot = robot
+        self.name = resolve_algorithm(algorithm)
+        self.animate = animate
+        self.wait_for_turns = self.name in WAIT_FOR_TURNS
+        self.view = RobotView(robot)
+        self.actions = ALGORITHMS[self.name](self.view)
+        self.count = 0  # 已经应用的动作数
+        self.finished = False
+
+    @property
+    def stats(self):
+        """算法记录的统计信息"""
+        return self.view.stats
+
+    def step(self):
+        """执行一步，返回应用的动作；转向动画期间需要等待或已经结束时返回None"""
+        if self.finished:
+            return None
+        if self.wait_for_turns and self.robot.turning:
+            return None
+        action = self.advance()
+        if self.wait_for_turns and not self.animate and action.kind in ('turn_left', 'turn_right'):
+            # 没有转向动画时不需要等待，转向和之后的前进在同一步完成
+            self.advance()
+        return action
+
+    def advance(self):
+        """从生成器取出下一个动作并应用"""
+        robot = self.robot
+        if not robot.is_running:
+            robot.start_time = robot.clock()
+            robot.is_running = True
+
+        action = next(self.actions)
+        self.count += 1
+        kind = action.kind
+        if kind == 'move_forward':
+            if robot.move_forward():
+                robot.current_step += 1
+        elif kind == 'turn_right':
+            robot.turn_right(self.animate)
+        elif kind == 'turn_left':
+            robot.turn_left(self.animate)
+        elif kind == 'move_to':
+            robot.position = action.target
+            robot.visited.add(action.target)
+            robot.current_step += 1
+        elif kind == 'done':
+            self.finished = True
+            robot.dfs_complete = True
+            robot.end_time = robot.clock()
+            if action.path is not None:
+                robot.path = list(action.path)
+                robot.dfs_path = deque(action.path)
+        return action
+
+    def run(self, max_actions=None):
+        """快进：不等待转向动画，一直执行到结束（或执行max_actions个动作），返回执行的动作数"""
+        count = 0
+        while not self.finished and (max_actions is None or count < max_actions):
+            self.advance()
+            count += 1
+        return count
+
+    def fork(self, robot=None):
+        """在另一个Robot上重放本次运行的全部动作，得到一个可以独立继续的运行
+
+        算法只依赖机器人的位置、朝向和迷宫，重放结果与当前状态相同（转向动画不复制）。
+        """
+        if robot is None:
+            robot = type(self.robot)(self.robot.maze, clock=self.robot.clock, verbose=False)
+        run = AlgorithmRun(robot, self.name, animate=False)
+        for _ in range(self.count):
+            run.advance()
+        run.animate = self.animate
+        return run
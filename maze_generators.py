@@ -0,0 +1,361 @@
+"""
+迷宫生成器
+Maze Generators
+
+完美迷宫生成算法（任意两个格子之间恰好有一条路径，天然连通，无需修补），
+以及在完美迷宫上打通死胡同、制造回路的braid处理。
+所有算法都按一维格子下标（row * cols + col）工作，时间复杂度接近线性。
+Eller算法逐行输出墙壁，内存只与宽度有关，可以直接流式写入超大迷宫文件。
+"""
+
+import argparse
+import random
+from array import array
+
+
+class DisjointSet:
+    """并查集（按大小合并 + 路径减半）"""
+
+    def __init__(self, size):
+        self.parent = array('i', range(size))
+        self.size = array('i', [1]) * size
+
+    def find(self, x):
+        """查找x所在集合的代表元素"""
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # 路径减半
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        """合并a和b所在的集合，返回是否真的发生了合并"""
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
+
+    def connected(self, a, b):
+        """检查a和b是否在同一个集合中"""
+        return self.find(a) == self.find(b)
+
+
+def grid_neighbors(cell, rows, cols):
+    """网格中相邻的格子（不考虑墙壁），顺序为上、右、下、左"""
+    row, col = divmod(cell, cols)
+    neighbors = []
+    if row > 0:
+        neighbors.append(cell - cols)
+    if col < cols - 1:
+        neighbors.append(cell + 1)
+    if row < rows - 1:
+        neighbors.append(cell + cols)
+    if col > 0:
+        neighbors.append(cell - 1)
+    return neighbors
+
+
+def carve(maze, cell, neighbor, down=None):
+    """直接在墙壁位图上打通两个相邻格子之间的墙（调用方负责更新迷宫版本号）
+
+    down表示两个格子上下相邻（否则左右相邻），为None时按下标差判断。
+    只有一列时右边的格子和下边的格子下标都差1，不能用neighbor == cell + 1判断方向。
+    """
+    if neighbor < cell:
+        cell, neighbor = neighbor, cell
+    if down is None:
+        down = neighbor - cell == maze.cols
+    row, col = divmod(cell, maze.cols)
+    if down:
+        maze.h_walls.set(row + 1, col, False)
+    else:
+        maze.v_walls.set(row, col + 1, False)
+
+
+def recursive_backtracker(maze, rng):
+    """递归回溯算法（显式栈实现，不受递归深度限制）"""
+    rows, cols = maze.rows, maze.cols
+    visited = bytearray(rows * cols)
+    start = rng.randrange(rows * cols)
+    visited[start] = 1
+    stack = [start]
+
+    while stack:
+        cell = stack[-1]
+        options = [n for n in grid_neighbors(cell, rows, cols) if not visited[n]]
+        if not options:
+            # 没有未访问的邻居，回溯
+            stack.pop()
+            continue
+        neighbor = rng.choice(options)
+        visited[neighbor] = 1
+        carve(maze, cell, neighbor)
+        stack.append(neighbor)
+
+
+def kruskal(maze, rng):
+    """Kruskal算法：随机打乱所有内部墙，用并查集只打通连接不同集合的墙
+
+    每条墙都要查一次并查集，2048x2048时有八百多万条，所以并查集（按大小合并 + 路径减半）
+    和carve都展开在循环里，父指针和大小用list（比array少了装箱），墙直接在位图上清除。
+    """
+    rows, cols = maze.rows, maze.cols
+    total = rows * cols
+    # 墙的编码：cell * 2 表示cell右侧的墙，cell * 2 + 1 表示cell下方的墙
+    edges = []
+    for first in range(0, total, cols):
+        edges.extend(range(first * 2, (first + cols - 1) * 2, 2))
+    edges.extend(range(1, (total - cols) * 2, 2))
+    rng.shuffle(edges)
+
+    parent = list(range(total))
+    size = [1] * total
+    h_data, h_stride = maze.h_walls.data, maze.h_walls.stride
+    v_data, v_stride = maze.v_walls.data, maze.v_walls.stride
+    remaining = total - 1  # 生成树恰好有total - 1条通路
+    for edge in edges:
+        cell = edge >> 1
+        root_a = cell
+        root_b = cell + cols if edge & 1 else cell + 1
+        while parent[root_a] != root_a:
+            parent[root_a] = root_a = parent[parent[root_a]]
+        while parent[root_b] != root_b:
+            parent[root_b] = root_b = parent[parent[root_b]]
+        if root_a == root_b:
+            continue
+        if size[root_a] < size[root_b]:
+            root_a, root_b = root_b, root_a
+        parent[root_b] = root_a
+        size[root_a] += size[root_b]
+        row, col = divmod(cell, cols)
+        if edge & 1:
+            h_data[(row + 1) * h_stride + (col >> 3)] &= ~(1 << (col & 7))
+        else:
+            col += 1
+            v_data[row * v_stride + (col >> 3)] &= ~(1 << (col & 7))
+        remaining -= 1
+        if remaining == 0:
+            break
+
+
+def wilson(maze, rng):
+    """Wilson算法：回路擦除随机游走，生成均匀分布的生成树"""
+    rows, cols = maze.rows, maze.cols
+    total = rows * cols
+    in_tree = bytearray(total)
+    in_tree[rng.randrange(total)] = 1
+    # 随机游走时每个格子最后一次离开去往的格子，覆盖写入即完成回路擦除
+    exit_to = array('i', [-1]) * total
+
+    for start in range(total):
+        if in_tree[start]:
+            continue
+        # 从start随机游走，直到碰到已生成的树
+        cell = start
+        while not in_tree[cell]:
+            neighbor = rng.choice(grid_neighbors(cell, rows, cols))
+            exit_to[cell] = neighbor
+            cell = neighbor
+        # 沿最后一次离开的方向把整条（已擦除回路的）路径加入树
+        cell = start
+        while not in_tree[cell]:
+            in_tree[cell] = 1
+            neighbor = exit_to[cell]
+            carve(maze, cell, neighbor, abs(neighbor - cell) == cols)
+            cell = neighbor
+
+
+def prim(maze, rng):
+    """随机Prim算法：从边界集合中随机取格子，连到已生成区域里的随机邻居"""
+    rows, cols = maze.rows, maze.cols
+    total = rows * cols
+    state = bytearray(total)  # 0=未访问，1=在边界集合中，2=已加入迷宫
+    start = rng.randrange(total)
+    state[start] = 2
+    frontier = []
+    for neighbor in grid_neighbors(start, rows, cols):
+        state[neighbor] = 1
+        frontier.append(neighbor)
+
+    while frontier:
+        # 随机取出一个边界格子（与末尾交换后弹出，O(1)）
+        i = rng.randrange(len(frontier))
+        cell = frontier[i]
+        frontier[i] = frontier[-1]
+        frontier.pop()
+
+        neighbors = grid_neighbors(cell, rows, cols)
+        inside = [n for n in neighbors if state[n] == 2]
+        neighbor = rng.choice(inside)
+        carve(maze, cell, neighbor, abs(neighbor - cell) == cols)
+        state[cell] = 2
+        for neighbor in neighbors:
+            if state[neighbor] == 0:
+                state[neighbor] = 1
+                frontier.append(neighbor)
+
+
+def eller_lines(rows, cols, rng):
+    """Eller算法：逐行生成完美迷宫，依次产出(墙类型, 行号, 每条墙边一个0/1值)
+
+    只保存当前一行的集合编号，内存为O(cols)，与行数无关。
+    产出顺序：顶部边界水平墙，然后每一行先产出该行的垂直墙，再产出该行下方的水平墙。
+    """
+    yield 'horizontal', 0, b'\x01' * cols
+    # 当前行每个格子所属的集合编号（始终在0..cols-1之间）
+    labels = list(range(cols))
+
+    for row in range(rows):
+        last_row = row == rows - 1
+        # 行内并查集（按集合编号）
+        parent = list(range(cols))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        # 第一步：随机合并相邻的不同集合（打通垂直墙），最后一行必须全部合并
+        vertical = bytearray(cols + 1)
+        vertical[0] = vertical[cols] = 1
+        for col in range(cols - 1):
+            a = find(labels[col])
+            b = find(labels[col + 1])
+            if a != b and (last_row or rng.random() < 0.5):
+                parent[b] = a
+            else:
+                vertical[col + 1] = 1
+        roots = [find(label) for label in labels]
+        yield 'vertical', row, bytes(vertical)
+
+        if last_row:
+            yield 'horizontal', rows, b'\x01' * cols
+            break
+
+        # 第二步：每个集合至少向下打通一次
+        below = bytearray(b'\x01' * cols)
+        members = {}
+        for col, root in enumerate(roots):
+            members.setdefault(root, []).append(col)
+        for cells in members.values():
+            opened = [col for col in cells if rng.random() < 0.5]
+            if not opened:
+                opened = [rng.choice(cells)]
+            for col in opened:
+                below[col] = 0
+        yield 'horizontal', row + 1, bytes(below)
+
+        # 第三步：下一行中向下连通的格子继承集合，其余格子分配新集合，并重新编号到0..cols-1
+        renumber = {}
+        next_labels = []
+        for col in range(cols):
+            if below[col] == 0:
+                label = renumber.setdefault(roots[col], len(renumber))
+            else:
+                label = None
+            next_labels.append(label)
+        fresh = len(renumber)
+        for col in range(cols):
+            if next_labels[col] is None:
+                next_labels[col] = fresh
+                fresh += 1
+        labels = next_labels
+
+
+def eller(maze, rng):
+    """Eller算法生成到内存中的迷宫（逐行写入墙壁位图）"""
+    for kind, line, bits in eller_lines(maze.rows, maze.cols, rng):
+        maze.wall_bits(kind).store_line(line, bits)
+
+
+def generate_eller_file(path, rows, cols, seed=None):
+    """用Eller算法把rows x cols的迷宫逐行流式写入二进制迷宫文件，返回(起点, 终点)
+
+    整个过程只保存一行的数据，可以生成比内存还大的迷宫；相同的seed得到相同的文件。
+    """
+    from maze_io import write_line_stream
+
+    if rows < 1 or cols < 1 or rows * cols < 2:
+        raise ValueError("迷宫至少需要两个格子（起点和终点不能重合）")
+    rng = random.Random(seed)
+    # 起点和终点与Maze在非8x8尺寸下的默认位置一致
+    castle = (rows - 1, cols // 2)
+    goal = (0, (cols - 1) // 2)
+    if goal == castle:
+        # 只有一行且列数为奇数时两个位置重合，终点改放在最左边
+        goal = (0, 0)
+    write_line_stream(path, rows, cols, eller_lines(rows, cols, rng), castle, goal)
+    return castle, goal
+
+
+# 可用的完美迷宫生成算法
+GENERATORS = {
+    'backtracker': recursive_backtracker,
+    'kruskal': kruskal,
+    'wilson': wilson,
+    'prim': prim,
+    'eller': eller,
+}
+
+# 只有一个方向可以通行的通路掩码（死胡同）
+DEAD_END_MASKS = (1, 2, 4, 8)
+
+
+def braid(maze, density, rng):
+    """按density的概率打通死胡同，制造回路（density=1时不再有死胡同）"""
+    if density <= 0:
+        return
+    rows, cols = maze.rows, maze.cols
+    masks = maze.get_adjacency()
+    dead_ends = [cell for cell in range(rows * cols) if masks[cell] in DEAD_END_MASKS]
+    rng.shuffle(dead_ends)
+
+    for cell in dead_ends:
+        # 之前的打通操作可能已经让它不再是死胡同（索引会原地修补）
+        if masks[cell] not in DEAD_END_MASKS or rng.random() >= density:
+            continue
+        pos = divmod(cell, cols)
+        closed = [n for n in grid_neighbors(cell, rows, cols)
+                  if not maze.is_valid_move_between(pos, divmod(n, cols))]
+        if not closed:
+            continue  # 只有一行或一列时走廊尽头没有可以打通的内部墙
+        # 优先打通到另一个死胡同，一次消除两个
+        preferred = [n for n in closed if masks[n] in DEAD_END_MASKS]
+        neighbor = rng.choice(preferred or closed)
+        kind, wall = maze.wall_between(pos, divmod(neighbor, cols))
+        maze.remove_wall(kind, wall)
+
+
+def generate_perfect_maze(maze, algorithm='backtracker', braid_density=0.0, rng=random):
+    """在maze上用指定算法生成完美迷宫，braid_density>0时再打通部分死胡同形成回路"""
+    if algorithm not in GENERATORS:
+        raise ValueError(f"未知的迷宫生成算法: {algorithm}（可选: {', '.join(GENERATORS)}）")
+    maze.fill_walls()
+    GENERATORS[algorithm](maze, rng)
+    # 位图被直接改写，让邻接索引失效
+    maze.version += 1
+    braid(maze, braid_density, rng)
+
+
+def main():
+    """命令行：用Eller算法流式生成超大迷宫文件"""
+    parser = argparse.ArgumentParser(description="用Eller算法逐行生成迷宫文件（内存只与列数有关）")
+    parser.add_argument('path', help="输出的二进制迷宫文件")
+    parser.add_argument('rows', type=int, help="行数")
+    parser.add_argument('cols', type=int, help="列数")
+    parser.add_argument('--seed', type=int, default=None, help="随机种子（相同种子生成相同迷宫）")
+    args = parser.parse_args()
+    if args.rows < 1 or args.cols < 1 or args.rows * args.cols < 2:
+        parser.error("迷宫至少需要两个格子（起点和终点不能重合）")
+    castle, goal = generate_eller_file(args.path, args.rows, args.cols, args.seed)
+    print(f"已生成 {args.rows}x{args.cols} 迷宫: {args.path}（起点{castle}，终点{goal}）")
+
+
+if __name__ == "__main__":
+    main()
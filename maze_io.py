@@ -0,0 +1,417 @@
+"""
+迷宫文件读写
+Maze File I/O
+
+支持本项目的二进制格式（.mazb）、经典电脑鼠.maz格式和文本格式（.txt），
+并可以惰性地批量读取整个目录。
+
+二进制迷宫格式（.mazb，版本1，全部为小端序）：
+  文件头  魔数b'MAZB'、格式版本、标记数量、行数、列数、起点(城堡)、终点、墙壁数据偏移
+  标记    每个16字节：类型(0=数字方块，1=字母圆圈)、名称(7字节)、行、列
+  墙壁    先是水平墙位图(rows+1行)，再是垂直墙位图(rows行)，
+          每行按字节对齐，与内存中WallBits的布局完全相同
+
+因为墙壁数据与内存布局相同，读取时可以用mmap把文件直接映射成迷宫的位图，
+不需要逐条解析或复制墙壁，几百万格的迷宫也能立即打开。
+"""
+
+import math
+import mmap
+import os
+import struct
+
+MAGIC = b'MAZB'
+FORMAT_VERSION = 1
+
+# 魔数、版本、标记数量、行数、列数、城堡行、城堡列、终点行、终点列、墙壁数据偏移
+HEADER = struct.Struct('<4sHHIIIIIII')
+# 标记类型、名称、行、列
+MARKER = struct.Struct('<B7sII')
+MARKER_NUMBERED = 0
+MARKER_LETTERED = 1
+
+# 墙壁数据按8字节对齐
+PAYLOAD_ALIGN = 8
+
+# 8个0/1值 -> 一个字节（低位在前）
+_PACK_TABLE = {bytes((byte >> i) & 1 for i in range(8)): byte for byte in range(256)}
+
+
+def line_stride(width):
+    """一行位图占用的字节数"""
+    return (width + 7) // 8
+
+
+def pack_line(bits, width):
+    """把一行0/1值打包成按字节对齐的位图"""
+    padded = bytes(bits) + bytes(line_stride(width) * 8 - width)
+    return bytes([_PACK_TABLE[padded[i:i + 8]] for i in range(0, len(padded), 8)])
+
+
+def payload_layout(rows, cols):
+    """返回(水平墙位图字节数, 垂直墙位图字节数)"""
+    return (rows + 1) * line_stride(cols), rows * line_stride(cols + 1)
+
+
+def payload_offset(marker_count):
+    """墙壁数据在文件中的起始位置"""
+    size = HEADER.size + marker_count * MARKER.size
+    return (size + PAYLOAD_ALIGN - 1) // PAYLOAD_ALIGN * PAYLOAD_ALIGN
+
+
+def pack_header(rows, cols, castle, goal, markers=()):
+    """打包文件头和标记，markers为(类型, 名称, (行, 列))列表"""
+    markers = list(markers)
+    offset = payload_offset(len(markers))
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(markers), rows, cols,
+                         castle[0], castle[1], goal[0], goal[1], offset)
+    for kind, name, (row, col) in markers:
+        header += MARKER.pack(kind, str(name).encode('utf-8')[:7], row, col)
+    return header + bytes(offset - len(header))
+
+
+class MazeFileWriter:
+    """按行写入墙壁位图的二进制迷宫文件写入器，内存占用只有一行
+
+    文件先按完整大小预分配，每一行直接写到它在文件中的位置，
+    所以水平墙和垂直墙可以交替写入（流式生成器就是这样逐行输出的）。
+    """
+
+    def __init__(self, path, rows, cols, castle, goal, markers=()):
+        self.rows = rows
+        self.cols = cols
+        header = pack_header(rows, cols, castle, goal, markers)
+        self.h_offset = len(header)
+        h_size, v_size = payload_layout(rows, cols)
+        self.v_offset = self.h_offset + h_size
+        self.file = open(path, 'wb')
+        self.file.write(header)
+        self.file.truncate(self.v_offset + v_size)
+
+    def write_line(self, kind, line, bits):
+        """写入一行墙壁（bits为每条墙边一个0/1值）"""
+        if kind == 'horizontal':
+            width, base = self.cols, self.h_offset
+        else:
+            width, base = self.cols + 1, self.v_offset
+        self.file.seek(base + line * line_stride(width))
+        self.file.write(pack_line(bits, width))
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+def write_line_stream(path, rows, cols, lines, castle, goal, markers=()):
+    """把(类型, 行号, 0/1值)组成的行流写入二进制迷宫文件"""
+    with MazeFileWriter(path, rows, cols, castle, goal, markers) as writer:
+        for kind, line, bits in lines:
+            writer.write_line(kind, line, bits)
+
+
+def maze_markers(maze):
+    """把迷宫中的数字方块和字母圆圈转换成(类型, 名称, (行, 列))列表"""
+    markers = [(MARKER_NUMBERED, number, pos) for number, pos in maze.numbered_squares.items()]
+    markers += [(MARKER_LETTERED, letter, pos) for letter, pos in maze.lettered_circles.items()]
+    return markers
+
+
+def save_maze(maze, path):
+    """把迷宫保存为二进制迷宫文件，墙壁位图原样写出"""
+    header = pack_header(maze.rows, maze.cols, maze.castle, maze.goal, maze_markers(maze))
+    with open(path, 'wb') as file:
+        file.write(header)
+        file.write(maze.h_walls.data)
+        file.write(maze.v_walls.data)
+
+
+def read_header(buffer):
+    """解析文件头，返回包含尺寸、起点、终点、标记和墙壁数据偏移的字典"""
+    if len(buffer) < HEADER.size:
+        raise ValueError("迷宫文件太短，缺少文件头")
+    magic, version, marker_count, rows, cols, castle_row, castle_col, goal_row, goal_col, offset = \
+        HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError("不是二进制迷宫文件（魔数不匹配）")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"不支持的迷宫文件版本: {version}")
+    
+    markers = []
+    for i in range(marker_count):
+        kind, name, row, col = MARKER.unpack_from(buffer, HEADER.size + i * MARKER.size)
+        name = name.rstrip(b'\0').decode('utf-8')
+        markers.append((kind, int(name) if kind == MARKER_NUMBERED else name, (row, col)))
+    
+    h_size, v_size = payload_layout(rows, cols)
+    if len(buffer) < offset + h_size + v_size:
+        raise ValueError("迷宫文件不完整，墙壁数据长度不足")
+    return {
+        'rows': rows,
+        'cols': cols,
+        'castle': (castle_row, castle_col),
+        'goal': (goal_row, goal_col),
+        'markers': markers,
+        'payload_offset': offset
+    }
+
+
+def new_maze(rows, cols, maze_class=None):
+    """创建不含墙壁的空迷宫，供各种文件格式的读取函数填充"""
+    if maze_class is None:
+        from Maze_Simulation_v1 import Maze as maze_class
+    return maze_class(rows, cols, generate=False)
+
+
+def finish_maze(maze, castle, goal, markers=()):
+    """设置读取到的起点、终点和标记，并把墙壁保存为原始迷宫"""
+    maze.castle = castle
+    maze.goal = goal
+    maze.robot_pos = castle
+    maze.numbered_squares = {}
+    maze.lettered_circles = {}
+    for kind, name, pos in markers:
+        if kind == MARKER_NUMBERED:
+            maze.numbered_squares[name] = pos
+        else:
+            maze.lettered_circles[name] = pos
+    maze.show_special_markers = bool(markers)
+    maze.save_as_original()
+    return maze
+
+
+def load_maze(path, maze_class=None, use_mmap=True):
+    """读取二进制迷宫文件并构造迷宫
+
+    use_mmap为True时文件以写时复制方式映射到内存，迷宫的墙壁位图直接指向映射区，
+    不复制数据；之后修改墙壁只影响内存中的副本，不会写回文件。
+    """
+    with open(path, 'rb') as file:
+        if use_mmap:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        else:
+            buffer = bytearray(file.read())
+    info = read_header(buffer)
+    rows, cols = info['rows'], info['cols']
+    
+    maze = new_maze(rows, cols, maze_class)
+    h_size, v_size = payload_layout(rows, cols)
+    view = memoryview(buffer)
+    h_start = info['payload_offset']
+    maze.h_walls = type(maze.h_walls)(rows + 1, cols, view[h_start:h_start + h_size])
+    maze.v_walls = type(maze.v_walls)(rows, cols + 1, view[h_start + h_size:h_start + h_size + v_size])
+    # 保持映射对象存活（位图引用的是它的内存）
+    maze.mapped_buffer = buffer
+    maze.version += 1
+    return finish_maze(maze, info['castle'], info['goal'], info['markers'])
+
+
+# ---------------------------------------------------------------------------
+# 经典电脑鼠.maz格式：每个格子一个字节的墙壁掩码，
+# 从左下角开始按列存放（下标 = x * 边长 + y，y从下往上数）
+# ---------------------------------------------------------------------------
+
+MAZ_NORTH = 1
+MAZ_EAST = 2
+MAZ_SOUTH = 4
+MAZ_WEST = 8
+
+
+def parse_maz(data, maze_class=None):
+    """从.maz字节数据构造迷宫（边长由数据长度决定，标准为16x16）"""
+    size = math.isqrt(len(data))
+    if size == 0 or size * size != len(data):
+        raise ValueError(f".maz数据长度{len(data)}不是正方形迷宫")
+    
+    maze = new_maze(size, size, maze_class)
+    h_walls, v_walls = maze.h_walls, maze.v_walls
+    for x in range(size):
+        column = data[x * size:(x + 1) * size]
+        for y, mask in enumerate(column):
+            if not mask:
+                continue
+            row = size - 1 - y
+            if mask & MAZ_NORTH:
+                h_walls.set(row, x)
+            if mask & MAZ_EAST:
+                v_walls.set(row, x + 1)
+            if mask & MAZ_SOUTH:
+                h_walls.set(row + 1, x)
+            if mask & MAZ_WEST:
+                v_walls.set(row, x)
+    maze.version += 1
+    # 电脑鼠比赛的起点在左下角，终点在中心
+    return finish_maze(maze, (size - 1, 0), (size // 2, size // 2))
+
+
+def format_maz(maze):
+    """把正方形迷宫转换成.maz字节数据"""
+    if maze.rows != maze.cols:
+        raise ValueError(".maz格式只支持正方形迷宫")
+    size = maze.rows
+    h_walls, v_walls = maze.h_walls, maze.v_walls
+    data = bytearray(size * size)
+    for x in range(size):
+        for y in range(size):
+            row = size - 1 - y
+            data[x * size + y] = (MAZ_NORTH * h_walls.get(row, x) |
+                                  MAZ_EAST * v_walls.get(row, x + 1) |
+                                  MAZ_SOUTH * h_walls.get(row + 1, x) |
+                                  MAZ_WEST * v_walls.get(row, x))
+    return bytes(data)
+
+
+def read_maz(path, maze_class=None):
+    """读取.maz文件"""
+    with open(path, 'rb') as file:
+        return parse_maz(file.read(), maze_class)
+
+
+def write_maz(maze, path):
+    """保存为.maz文件"""
+    with open(path, 'wb') as file:
+        file.write(format_maz(maze))
+
+
+# ---------------------------------------------------------------------------
+# 文本格式：角点用o（也接受+和.），水平墙为---，垂直墙为|，
+# 格子中的S为起点、G为终点、数字为数字方块、其他字母为字母圆圈，
+# 同一个格子里有多个标记时用逗号分隔（例如S,G或G,1,A），格子按最长的标记加宽
+#
+#   o---o---o
+#   | S     |
+#   o---o   o
+#   | G     |
+#   o---o---o
+# ---------------------------------------------------------------------------
+
+def parse_text(text, maze_class=None):
+    """从文本布局构造迷宫，格子宽度由第一行角点的间距决定"""
+    lines = [line.rstrip() for line in text.splitlines()]
+    while lines and not lines[-1]:
+        lines.pop()
+    if len(lines) < 3 or not lines[0]:
+        raise ValueError("文本迷宫至少需要一行格子")
+    
+    corner = lines[0][0]
+    corners = [i for i, char in enumerate(lines[0]) if char == corner]
+    if len(corners) < 2:
+        raise ValueError("文本迷宫第一行缺少角点")
+    step = corners[1] - corners[0]
+    rows = (len(lines) - 1) // 2
+    cols = (len(lines[0]) - 1) // step
+    
+    def char_at(line, index):
+        return line[index] if index < len(line) else ' '
+    
+    maze = new_maze(rows, cols, maze_class)
+    castle = goal = None
+    markers = []
+    for line_no in range(2 * rows + 1):
+        line = lines[line_no] if line_no < len(lines) else ''
+        row = line_no // 2
+        if line_no % 2 == 0:
+            # 角点行：两个角点中间不是空格表示有水平墙
+            for col in range(cols):
+                if char_at(line, col * step + step // 2) != ' ':
+                    maze.h_walls.set(row, col)
+            continue
+        for col in range(cols + 1):
+            if char_at(line, col * step) != ' ':
+                maze.v_walls.set(row, col)
+        for col in range(cols):
+            for label in line[col * step + 1:(col + 1) * step].split(','):
+                label = label.strip()
+                if not label:
+                    continue
+                if label == 'S':
+                    castle = (row, col)
+                elif label == 'G':
+                    goal = goal or (row, col)
+                elif label.isdigit():
+                    markers.append((MARKER_NUMBERED, int(label), (row, col)))
+                else:
+                    markers.append((MARKER_LETTERED, label, (row, col)))
+    maze.version += 1
+    
+    castle = castle or (rows - 1, 0)
+    goal = goal or (rows // 2, cols // 2)
+    return finish_maze(maze, castle, goal, markers)
+
+
+def format_text(maze):
+    """把迷宫转换成文本布局（同一个格子里的多个标记用逗号连接，格子宽度至少为3）"""
+    labels = {}
+    labels.setdefault(maze.castle, []).append('S')
+    labels.setdefault(maze.goal, []).append('G')
+    for number, pos in maze.numbered_squares.items():
+        labels.setdefault(pos, []).append(str(number))
+    for letter, pos in maze.lettered_circles.items():
+        if letter in ('S', 'G') or ',' in letter:
+            raise ValueError(f"字母圆圈的名称{letter!r}无法写入文本迷宫")
+        labels.setdefault(pos, []).append(letter)
+    labels = {pos: ','.join(names) for pos, names in labels.items()}
+    width = max(3, max(map(len, labels.values())))
+    
+    lines = []
+    for row in range(maze.rows + 1):
+        lines.append('o' + ''.join(('-' * width if maze.h_walls.get(row, col) else ' ' * width) + 'o'
+                                   for col in range(maze.cols)))
+        if row == maze.rows:
+            break
+        cells = []
+        for col in range(maze.cols):
+            cells.append('|' if maze.v_walls.get(row, col) else ' ')
+            cells.append(labels.get((row, col), '').center(width))
+        cells.append('|' if maze.v_walls.get(row, maze.cols) else ' ')
+        lines.append(''.join(cells))
+    return '\n'.join(lines) + '\n'
+
+
+def read_text(path, maze_class=None):
+    """读取文本迷宫文件"""
+    with open(path, encoding='utf-8') as file:
+        return parse_text(file.read(), maze_class)
+
+
+def write_text(maze, path):
+    """保存为文本迷宫文件"""
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(format_text(maze))
+
+
+# ---------------------------------------------------------------------------
+# 按扩展名读取，以及整个目录的批量读取
+# ---------------------------------------------------------------------------
+
+READERS = {
+    '.mazb': load_maze,
+    '.maz': read_maz,
+    '.txt': read_text
+}
+
+
+def read_any(path, maze_class=None):
+    """根据扩展名选择读取函数"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"不支持的迷宫文件类型: {path}")
+    return READERS[extension](path, maze_class)
+
+
+def iter_maze_directory(directory, maze_class=None):
+    """按文件名顺序逐个读取目录中的迷宫文件，产生(路径, 迷宫)
+
+    这是一个惰性迭代器：每次只读取一个文件，跳过不认识的扩展名，
+    遍历几千个迷宫文件也不需要先把它们全部读入内存。
+    """
+    names = sorted(name for name in os.listdir(directory)
+                   if os.path.splitext(name)[1].lower() in READERS)
+    for name in names:
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            yield path, read_any(path, maze_class)
@@ -0,0 +1,323 @@
+"""
+NumPy向量化的随机迷宫生成
+Vectorized Random Maze Generation
+
+与Maze.generate_random_maze（40%概率随机墙壁 + 连通修补 + 防止四面封死）的结果逐位相同：
+NumPy的RandomState和Python的random都是MT19937，把Python随机数生成器的状态
+复制过来后，两边产生完全相同的32位随机数序列。这里一次性抽取一批32位随机数，
+按照random.random()、random.randrange()、random.randint()和random.choice()在CPython中的实现消费它们，
+用完后再把状态写回Python的随机数生成器，所以之后的随机数也与纯Python版本一致。
+
+numpy是可选依赖：没有安装时Maze自动使用纯Python版本。
+"""
+
+import random
+
+import numpy as np
+
+# 随机墙壁的概率（与Maze.add_random_internal_walls相同）
+WALL_PROBABILITY = 0.4
+
+# 不超过这个格子数时用位并行检查连通性（大迷宫的整数位运算太慢，直接搜索）
+BITBOARD_CELLS = 1 << 12
+
+# 波前不少于这么多格子时用数组运算批量扩展
+WAVEFRONT_BULK = 64
+
+# random.random()：两个32位随机数拼成53位精度的浮点数
+_RANDOM_SCALE = 1.0 / 9007199254740992.0
+
+
+class WordStream:
+    """与Python随机数生成器共享MT19937状态的32位随机数流
+
+    按块批量抽取，按需消费；sync()把恰好消费过的随机数对应的状态写回Python。
+    """
+
+    def __init__(self, rng=random, chunk=4096):
+        self.rng = rng
+        self.chunk = chunk
+        version, internal, self.gauss_next = rng.getstate()
+        self.initial_state = ('MT19937', np.array(internal[:-1], dtype=np.uint32), internal[-1])
+        self.state = np.random.RandomState()
+        self.state.set_state(self.initial_state)
+        self.words = np.empty(0, dtype=np.uint32)
+        self.word_list = []  # 缓冲区从list_base开始的一小段Python整数（逐个取用时更快）
+        self.list_base = 0
+        self.pos = 0
+        self.consumed = 0  # 当前缓冲块之前已经消费的随机数个数
+
+    def fill(self, count):
+        """保证缓冲区里至少还有count个未消费的随机数"""
+        if self.pos + count > len(self.words):
+            fresh = self.state.randint(0, 1 << 32, size=max(self.chunk, count), dtype=np.uint32)
+            self.consumed += self.pos
+            self.words = np.concatenate((self.words[self.pos:], fresh))
+            self.word_list = []
+            self.list_base = self.pos = 0
+
+    def take(self, count):
+        """取出接下来的count个32位随机数（numpy数组）"""
+        self.fill(count)
+        words = self.words[self.pos:self.pos + count]
+        self.pos += count
+        return words
+
+    def getrandbits(self, bits):
+        """与random.getrandbits(bits)相同（bits <= 32）"""
+        index = self.pos - self.list_base
+        if not 0 <= index < len(self.word_list):
+            self.fill(1)
+            self.list_base = self.pos
+            self.word_list = self.words[self.pos:self.pos + 64].tolist()
+            index = 0
+        word = self.word_list[index]
+        self.pos += 1
+        return word >> (32 - bits)
+
+    def randbelow(self, n):
+        """与random._randbelow(n)相同：按位数抽取，超出范围就重抽"""
+        bits = n.bit_length()
+        value = self.getrandbits(bits)
+        while value >= n:
+            value = self.getrandbits(bits)
+        return value
+
+    def randrange(self, stop):
+        """与random.randrange(stop)相同"""
+        return self.randbelow(stop)
+    
+    def randint(self, a, b):
+        """与random.randint(a, b)相同"""
+        return a + self.randbelow(b - a + 1)
+
+    def choice(self, seq):
+        """与random.choice(seq)相同"""
+        return seq[self.randbelow(len(seq))]
+
+    def random(self, count):
+        """与连续调用count次random.random()相同，返回float64数组"""
+        words = self.take(2 * count)
+        high = (words[0::2] >> 5).astype(np.float64)
+        low = (words[1::2] >> 6).astype(np.float64)
+        return (high * 67108864.0 + low) * _RANDOM_SCALE
+
+    def sync(self):
+        """把已经消费的随机数对应的状态写回Python随机数生成器"""
+        state = np.random.RandomState()
+        state.set_state(self.initial_state)
+        remaining = self.consumed + self.pos
+        while remaining:
+            size = min(remaining, 1 << 20)
+            state.randint(0, 1 << 32, size=size, dtype=np.uint32)
+            remaining -= size
+        key, pos = state.get_state()[1:3]
+        self.rng.setstate((3, tuple(int(word) for word in key) + (int(pos),), self.gauss_next))
+
+
+def wall_grids(maze):
+    """把两张墙壁位图解包成(rows + 1, cols)和(rows, cols + 1)的布尔数组"""
+    grids = []
+    for bits, width in ((maze.h_walls, maze.cols), (maze.v_walls, maze.cols + 1)):
+        data = np.frombuffer(bits.data, dtype=np.uint8).reshape(bits.lines, bits.stride)
+        grids.append(np.unpackbits(data, axis=1, bitorder='little')[:, :width].astype(bool))
+    return grids
+
+
+def store_walls(maze, horizontal, vertical):
+    """把布尔墙壁数组打包写回位图，并直接算出新的邻接索引"""
+    for bits, grid in ((maze.h_walls, horizontal), (maze.v_walls, vertical)):
+        padded = np.zeros((bits.lines, bits.stride * 8), dtype=bool)
+        padded[:, :bits.width] = grid
+        bits.data[:] = np.packbits(padded, axis=1, bitorder='little').tobytes()
+    maze.version += 1
+    
+    # 每个格子的通路掩码（第d位为1表示可以向方向d移动）
+    opened = (~horizontal[:-1]).astype(np.uint8)
+    opened |= (~vertical[:, 1:]).astype(np.uint8) << 1
+    opened |= (~horizontal[1:]).astype(np.uint8) << 2
+    opened |= (~vertical[:, :-1]).astype(np.uint8) << 3
+    # 边界在索引中始终不可通行
+    opened[0] &= 15 ^ 1
+    opened[:, -1] &= 15 ^ 2
+    opened[-1] &= 15 ^ 4
+    opened[:, 0] &= 15 ^ 8
+    maze.open_masks[:] = opened.tobytes()
+    maze.index_version = maze.version
+
+
+def add_random_internal_walls(maze, stream):
+    """随机内部墙壁：一次抽取所有随机数，按与纯Python版本相同的顺序使用"""
+    rows, cols = maze.rows, maze.cols
+    h_count = (rows - 1) * cols
+    v_count = rows * (cols - 1)
+    walls = stream.random(h_count + v_count) < WALL_PROBABILITY
+    
+    # 水平墙：上下边界保留，内部行随机
+    horizontal = np.ones((rows + 1, cols), dtype=bool)
+    horizontal[1:rows] = walls[:h_count].reshape(rows - 1, cols)
+    # 垂直墙：左右边界保留，内部列随机
+    vertical = np.ones((rows, cols + 1), dtype=bool)
+    vertical[:, 1:cols] = walls[h_count:].reshape(rows, cols - 1)
+    store_walls(maze, horizontal, vertical)
+
+
+def is_reachable(maze, start, goal):
+    """位并行连通性检查：把所有格子放进一个大整数，每轮同时向四个方向扩展一步"""
+    masks = np.frombuffer(maze.get_adjacency(), dtype=np.uint8)
+    up, right, down, left = [
+        int.from_bytes(np.packbits((masks & bit) != 0, bitorder='little').tobytes(), 'little')
+        for bit in (1, 2, 4, 8)]
+    cols = maze.cols
+    reached = 1 << maze.to_index(start)
+    target = 1 << maze.to_index(goal)
+    while not reached & target:
+        grown = (reached | (reached & right) << 1 | (reached & left) >> 1 |
+                 (reached & down) << cols | (reached & up) >> cols)
+        if grown == reached:
+            return False
+        reached = grown
+    return True
+
+
+def ensure_connectivity(maze):
+    """与Maze.ensure_connectivity结果相同：小迷宫先做位并行检查，已经连通时不再搜索"""
+    if maze.rows * maze.cols > BITBOARD_CELLS or not is_reachable(maze, maze.castle, maze.goal):
+        maze.ensure_connectivity()
+
+
+def enclosed_cells(horizontal, vertical):
+    """用数组运算统计每个格子的墙壁数，返回四面封死的内部格子下标（行优先顺序）"""
+    counts = (horizontal[:-1].astype(np.uint8) + horizontal[1:] + vertical[:, :-1] + vertical[:, 1:])
+    enclosed = counts == 4
+    # 只处理内部格子
+    enclosed[0, :] = enclosed[-1, :] = False
+    enclosed[:, 0] = enclosed[:, -1] = False
+    return np.flatnonzero(enclosed)
+
+
+def prevent_dead_ends(maze, stream):
+    """批量找出四面封死的格子，随机拆掉每个格子的一面墙，最后一次性写回
+
+    拆掉右墙或下墙会顺带打通右边或下边的格子，如果那个格子也是封死的就跳过它，
+    与纯Python版本按顺序逐个处理的结果相同。
+    """
+    horizontal, vertical = wall_grids(maze)
+    cells = enclosed_cells(horizontal, vertical).tolist()
+    if not cells:
+        return
+    
+    cols = maze.cols
+    opened = set()
+    h_rows, h_cols, v_rows, v_cols = [], [], [], []
+    for index in cells:
+        if index in opened:
+            continue
+        row, col = divmod(index, cols)
+        # 与Maze.remove_random_wall的候选顺序相同：上、下、左、右
+        choice = stream.randbelow(4)
+        if choice == 0:
+            h_rows.append(row)
+            h_cols.append(col)
+        elif choice == 1:
+            h_rows.append(row + 1)
+            h_cols.append(col)
+            opened.add(index + cols)
+        elif choice == 2:
+            v_rows.append(row)
+            v_cols.append(col)
+        else:
+            v_rows.append(row)
+            v_cols.append(col + 1)
+            opened.add(index + 1)
+    
+    horizontal[h_rows, h_cols] = False
+    vertical[v_rows, v_cols] = False
+    store_walls(maze, horizontal, vertical)
+
+
+def fill_random_maze(maze, stream):
+    """与Maze.generate_random_maze相同的随机迷宫，随机数取自stream"""
+    maze.generate_random_goal(stream)
+    add_random_internal_walls(maze, stream)
+    ensure_connectivity(maze)
+    prevent_dead_ends(maze, stream)
+    maze.show_special_markers = False
+
+
+def generate_random_mazes(count, rows, cols=None, seed=None, maze_class=None):
+    """批量生成随机迷宫（迭代器）
+
+    结果与random.seed(seed)后依次对count个新迷宫调用generate_random_maze()逐位相同，
+    但随机数只在开始时同步一次，适合一次生成大量基准测试迷宫。
+    """
+    if maze_class is None:
+        from Maze_Simulation_v1 import Maze as maze_class
+    cols = rows if cols is None else cols
+    stream = WordStream(random.Random(seed), chunk=max(4096, 4 * rows * cols))
+    for _ in range(count):
+        maze = maze_class(rows, cols, generate=False)
+        fill_random_maze(maze, stream)
+        maze.save_as_original()
+        yield maze
+
+
+def wavefront_distances(maze, sources):
+    """多源波前距离变换：每一轮把整条波前同时向四个方向扩展一步
+
+    波前按格子下标保存（不是整张网格），每轮的代价与波前大小成正比。波前较宽时用数组运算
+    批量扩展；长走廊里波前只有几个格子，数组运算的固定开销不划算，改为逐格扩展。
+    返回uint16（格子数不超过65535时）或uint32数组，不可达的格子为该类型的最大值。
+    """
+    adjacency = maze.get_adjacency()
+    masks = np.frombuffer(adjacency, dtype=np.uint8)
+    total = masks.size
+    dtype = np.uint16 if total < 0xFFFF else np.uint32
+    unreached = np.iinfo(dtype).max
+    distances = np.full(total, unreached, dtype=dtype)
+    cells = memoryview(distances)  # 逐格读写时比数组下标快
+    frontier = sorted({maze.to_index(pos) for pos in sources})
+    for index in frontier:
+        cells[index] = 0
+    
+    # 通路掩码的第d位 -> 一维下标偏移（上、右、下、左）
+    offsets = (-maze.cols, 1, maze.cols, -1)
+    steps = maze.mask_steps
+    slots = np.empty(total, dtype=np.int64)  # 去重用：同一格子只保留最后写入的那一项
+    level = 0
+    while len(frontier):
+        level += 1
+        if len(frontier) < WAVEFRONT_BULK:
+            if not isinstance(frontier, list):
+                frontier = frontier.tolist()
+            reached = []
+            for current in frontier:
+                for step in steps[adjacency[current]]:
+                    neighbor = current + step
+                    if cells[neighbor] == unreached:
+                        cells[neighbor] = level
+                        reached.append(neighbor)
+            frontier = reached
+        else:
+            if isinstance(frontier, list):
+                frontier = np.array(frontier, dtype=np.int64)
+            frontier_masks = masks[frontier]
+            reached = np.concatenate([frontier[(frontier_masks & (1 << d)) != 0] + offsets[d] for d in range(4)])
+            reached = reached[distances[reached] == unreached]
+            order = np.arange(reached.size)
+            slots[reached] = order
+            frontier = reached[slots[reached] == order]
+            distances[frontier] = level
+    return distances
+
+
+def distance_array(maze, sources):
+    """与Maze.bfs_distances相同格式的多源距离表（array('i')，-1表示不可达），用波前距离变换计算"""
+    from array import array
+    
+    distances = wavefront_distances(maze, sources)
+    result = distances.astype(np.int32)
+    result[distances == np.iinfo(distances.dtype).max] = -1
+    table = array('i')
+    table.frombytes(result.tobytes())
+    return table
@@ -0,0 +1,1101 @@
+"""
+路径规划器
+Path Planners
+
+需要在多次查询之间保存搜索状态的规划器。规划器只读取迷宫（Maze或algorithms.MazeView），
+按一维格子下标row * cols + col工作，邻居从邻接索引读取。
+"""
+
+import heapq
+
+INF = float('inf')
+
+
+class DStarLite:
+    """D* Lite增量规划器（Koenig & Likhachev）
+
+    从终点反向搜索，g/rhs记录每个格子到终点的距离。通过Maze的墙壁监听器收到
+    单条墙边的变化，只更新墙两侧的格子并修复受影响的那部分搜索树，重新规划的
+    工作量与变化影响的范围成正比，而不是与迷宫大小成正比。整体替换墙壁
+    （版本号跳变）或终点改变时从头规划。
+    """
+
+    def __init__(self, maze, start, goal):
+        self.maze = maze
+        self.cols = maze.cols
+        self.goal = goal
+        self.start_index = maze.to_index(start)
+        self.pending = []  # 收到的墙边变化（墙两侧的格子下标）
+        self.expanded = 0  # 累计展开的格子数
+        self.last_expanded = 0  # 最近一次规划展开的格子数
+        self.reset()
+        maze.add_wall_listener(self.wall_changed)
+
+    def close(self):
+        """注销墙壁监听器"""
+        self.maze.remove_wall_listener(self.wall_changed)
+
+    def reset(self):
+        """从当前起点重新开始规划"""
+        total = self.maze.rows * self.maze.cols
+        self.goal = self.maze.goal
+        self.goal_index = self.maze.to_index(self.goal)
+        self.g = [INF] * total
+        self.rhs = [INF] * total
+        self.rhs[self.goal_index] = 0
+        self.km = 0
+        self.last_index = self.start_index
+        self.queue = []
+        self.queued = {}  # 格子下标 -> 当前键值（堆中键值不同的项已经过期）
+        self.push(self.goal_index)
+        self.pending.clear()
+        self.synced_version = self.maze.version
+        self.planned = False
+
+    def wall_changed(self, kind, pos, present):
+        """墙壁监听器：记录墙两侧的格子，等下次规划时一起处理"""
+        if self.synced_version != self.maze.version - 1:
+            # 之前有未通知的整体变化，只能从头规划
+            self.synced_version = None
+            return
+        self.synced_version = self.maze.version
+        cells = self.maze.wall_cells(kind, pos[0], pos[1])
+        if cells is not None:
+            self.pending.append(cells[0])
+            self.pending.append(cells[2])
+
+    def heuristic(self, index):
+        """起点到格子的曼哈顿距离"""
+        row, col = divmod(index, self.cols)
+        start_row, start_col = divmod(self.start_index, self.cols)
+        return abs(row - start_row) + abs(col - start_col)
+
+    def key(self, index):
+        best = min(self.g[index], self.rhs[index])
+        return (best + self.heuristic(index) + self.km, best)
+
+    def push(self, index):
+        key = self.key(index)
+        self.queued[index] = key
+        heapq.heappush(self.queue, (key[0], key[1], index))
+
+    def update_vertex(self, index, masks, steps):
+        """重新计算格子的rhs，并按是否局部一致更新队列"""
+        g = self.g
+        if index != self.goal_index:
+            best = INF
+            for step in steps[masks[index]]:
+                if g[index + step] < best:
+                    best = g[index + step]
+            self.rhs[index] = best + 1
+        if g[index] != self.rhs[index]:
+            self.push(index)
+        else:
+            self.queued.pop(index, None)
+
+    def compute_shortest_path(self):
+        """展开不一致的格子，直到起点的距离确定"""
+        masks = self.maze.get_adjacency()
+        steps = self.maze.mask_steps
+        g, rhs, queue, queued = self.g, self.rhs, self.queue, self.queued
+        start = self.start_index
+        expanded = 0
+
+        while queue:
+            k1, k2, index = queue[0]
+            if queued.get(index) != (k1, k2):
+                heapq.heappop(queue)  # 过期的堆项
+                continue
+            if (k1, k2) >= self.key(start) and rhs[start] == g[start]:
+                break
+            heapq.heappop(queue)
+
+            new_key = self.key(index)
+            if (k1, k2) < new_key:
+                self.push(index)
+                continue
+            del queued[index]
+            expanded += 1
+
+            if g[index] > rhs[index]:
+                g[index] = rhs[index]
+            else:
+                g[index] = INF
+                self.update_vertex(index, masks, steps)
+            for step in steps[masks[index]]:
+                self.update_vertex(index + step, masks, steps)
+
+        self.last_expanded = expanded
+        self.expanded += expanded
+
+    def plan(self, start):
+        """把起点移动到start，处理收到的墙壁变化并修复最短路径"""
+        start_index = self.maze.to_index(start)
+        if self.synced_version != self.maze.version or self.goal != self.maze.goal:
+            self.start_index = start_index
+            self.reset()
+        elif self.pending or not self.planned:
+            # 起点移动后用km补偿堆中旧键值，不需要重排整个队列
+            self.start_index = start_index
+            self.km += self.heuristic(self.last_index)
+            self.last_index = start_index
+            masks = self.maze.get_adjacency()
+            steps = self.maze.mask_steps
+            for index in self.pending:
+                self.update_vertex(index, masks, steps)
+            self.pending.clear()
+        else:
+            self.start_index = start_index
+            return
+        self.compute_shortest_path()
+        self.planned = True
+
+    def next_cell(self, start):
+        """从start出发沿最短路径的下一个格子，到不了终点时返回None"""
+        self.plan(start)
+        index = self.maze.to_index(start)
+        if self.rhs[index] == INF:
+            return None
+        masks = self.maze.get_adjacency()
+        best, best_cost = None, INF
+        for step in self.maze.mask_steps[masks[index]]:
+            cost = self.g[index + step]
+            if cost < best_cost:
+                best, best_cost = index + step, cost
+        return None if best is None else self.maze.to_pos(best)
+
+
+class IncrementalFlood:
+    """微型鼠洪水填充：在已知墙壁地图上维护每个格子到终点的步数
+
+    已知地图一开始只有边界，未知的墙边按可以通行处理。每发现一条墙就把墙两侧的格子
+    压栈，用标准的栈式修正（格子的值应为可达邻居的最小值 + 1，不满足就改写并把邻居压栈）
+    只更新受影响的格子，不重新做整张图的BFS。
+    """
+
+    def __init__(self, rows, cols, goals):
+        from Maze_Simulation_v1 import Maze
+
+        self.known = Maze(rows, cols, generate=False)  # 已知墙壁地图（不生成墙壁）
+        self.known.goal = goals[0]
+        self.goals = {self.known.to_index(goal) for goal in goals}
+        self.distances = self.known.distance_map(goals)
+        # 与终点不连通的格子的值会不断增大，到这个上限为止
+        self.limit = rows * cols
+        self.stack = []
+        self.updates = 0  # 累计改写的格子数
+
+    def add_wall(self, pos, direction):
+        """记录pos在direction一侧的墙，返回是否是新发现的墙"""
+        from Maze_Simulation_v1 import DIRECTION_DELTAS
+
+        known = self.known
+        neighbor = (pos[0] + DIRECTION_DELTAS[direction][0], pos[1] + DIRECTION_DELTAS[direction][1])
+        if not known.in_bounds(neighbor):
+            return False  # 边界墙一开始就已知
+        kind, wall = known.wall_between(pos, neighbor)
+        if not known.set_wall(kind, wall):
+            return False
+        self.stack.append(known.to_index(pos))
+        self.stack.append(known.to_index(neighbor))
+        return True
+
+    def update(self):
+        """处理栈中的格子直到所有值一致，返回本次改写的格子数"""
+        masks = self.known.get_adjacency()
+        steps = self.known.mask_steps
+        distances, goals, limit, stack = self.distances, self.goals, self.limit, self.stack
+        count = 0
+
+        while stack:
+            index = stack.pop()
+            if index in goals:
+                continue
+            if masks[index]:
+                value = min(distances[index + step] for step in steps[masks[index]]) + 1
+                if value > limit:
+                    value = limit
+            else:
+                # 四面都是墙的格子到不了终点（它的邻居在add_wall时已经压栈）
+                value = limit
+            if distances[index] != value:
+                distances[index] = value
+                count += 1
+                for step in steps[masks[index]]:
+                    stack.append(index + step)
+
+        self.updates += count
+        return count
+
+    def distance(self, pos):
+        """已知地图上到终点的步数，与终点不连通时返回None"""
+        value = self.distances[self.known.to_index(pos)]
+        return None if value >= self.limit else value
+
+    def next_cell(self, pos, direction):
+        """下一步走向的邻居：步数最小，相同时优先直行（少转向），再按右、下、左、上的顺序"""
+        from Maze_Simulation_v1 import DIRECTION_DELTAS, ORDER_RDLU
+
+        known = self.known
+        mask = known.get_open_mask(pos)
+        best, best_value = None, None
+        for d in (direction,) + ORDER_RDLU:
+            if (mask >> d) & 1:
+                neighbor = (pos[0] + DIRECTION_DELTAS[d][0], pos[1] + DIRECTION_DELTAS[d][1])
+                value = self.distances[known.to_index(neighbor)]
+                if best_value is None or value < best_value:
+                    best, best_value = neighbor, value
+        return best
+
+
+# ALT启发默认的地标数量：地标越多下界越紧，但每次估价要多查几张表
+DEFAULT_LANDMARKS = 6
+
+# 同一个墙壁版本上的启发式查询达到这个次数才建立地标。1024x1024时建立地标约6.7秒，
+# 每次A*用ALT约2秒、用曼哈顿距离约3秒：先用曼哈顿距离查询，多花的时间与建立地标相当时再建立，
+# 无论之后还有多少次查询，总用时都不超过事先知道查询次数时最优选择的两倍
+LANDMARK_QUERIES = 8
+
+
+def manhattan_heuristic(cols, target):
+    """到target的曼哈顿距离（一维下标 -> 步数下界），没有地标时的启发函数"""
+    target_row, target_col = target
+
+    def estimate(index):
+        row, col = divmod(index, cols)
+        return abs(row - target_row) + abs(col - target_col)
+
+    return estimate
+
+
+class Landmarks:
+    """ALT启发（A*、地标、三角不等式）的预处理结果
+
+    用最远点法选出count个地标（每个新地标离已选地标最远），保存每个地标到所有格子的
+    精确步数。迷宫是无向图，对任意地标L有|d(L, v) - d(L, t)| <= d(v, t)，取各地标下界和
+    曼哈顿距离中的最大值作为启发，仍然可采纳且一致。格子数小于65535时每个距离占2字节，
+    否则占4字节，不可达记为该类型的最大值。结果只对建立时的墙壁版本有效，由
+    Maze.get_landmarks按版本缓存，同一个迷宫上的多次查询共用；启发式搜索通过
+    Maze.get_heuristic取启发函数，只有地标已经是最新的或查询足够多时才用ALT。
+    """
+
+    def __init__(self, maze, count=DEFAULT_LANDMARKS):
+        from array import array
+
+        self.version = maze.version
+        self.count = count
+        self.cols = maze.cols
+        total = maze.rows * maze.cols
+        if total < 0xFFFF:
+            typecode, self.unreached = 'H', 0xFFFF
+        else:
+            typecode, self.unreached = 'I', 0xFFFFFFFF
+        self.landmarks = []  # 地标的一维下标
+        self.distances = []  # 每个地标一张步数表
+
+        # 第一个地标离格子0最远，之后每个地标离已选地标的最近距离最大
+        nearest = maze.distance_map([(0, 0)])
+        for _ in range(count):
+            landmark = max(range(total), key=nearest.__getitem__)
+            if nearest[landmark] <= 0:
+                break  # 剩下的格子都已是地标
+            table = maze.distance_map([maze.to_pos(landmark)])
+            nearest = table if not self.landmarks else array('i', map(min, nearest, table))
+            self.landmarks.append(landmark)
+            if typecode == 'H':
+                self.distances.append(array('H', [distance & 0xFFFF for distance in table]))
+            else:
+                # -1按无符号解释正好是0xFFFFFFFF
+                compact = array('I')
+                compact.frombytes(table.tobytes())
+                self.distances.append(compact)
+
+    def heuristic(self, target):
+        """到target的启发函数（一维下标 -> 步数下界）"""
+        cols = self.cols
+        unreached = self.unreached
+        target_row, target_col = target
+        target_index = target_row * cols + target_col
+        tables = [(table, table[target_index]) for table in self.distances if table[target_index] != unreached]
+
+        def estimate(index):
+            row, col = divmod(index, cols)
+            best = abs(row - target_row) + abs(col - target_col)
+            for table, target_distance in tables:
+                distance = table[index]
+                if distance != unreached:
+                    if distance - target_distance > best:
+                        best = distance - target_distance
+                    elif target_distance - distance > best:
+                        best = target_distance - distance
+            return best
+
+        return estimate
+
+
+class JunctionGraph:
+    """走廊收缩图：把只有两个通路的走廊格子收缩成带权边
+
+    节点是岔路口（三个以上通路）、死胡同（一个以下通路）、起点、终点和特殊标记所在的格子。
+    两个节点之间的一条走廊是一条边(相邻节点, 边长, 格子, 是否正向)：格子是从一端走向另一端经过的
+    格子（array('i')，含另一端的节点），反向使用同一个数组。建立时不扫描迷宫：节点第一次被展开时
+    才沿它的每个通路追踪走廊，同时把反方向记给另一端的节点，每次查询只接触搜索经过的区域。查询的起点、终点
+    落在走廊中间时临时沿走廊走到两端节点；没有节点的环路只在起点和终点都在环上时用到。
+    结果只对建立时的墙壁版本有效，由Maze.get_junction_graph按版本缓存。
+    """
+
+    def __init__(self, maze):
+        self.maze = maze
+        self.version = maze.version
+        self.masks = maze.get_adjacency()
+        self.steps = maze.mask_steps
+        self.branching = [len(steps) != 2 for steps in self.steps]  # 通路掩码 -> 是否不是走廊
+        self.specials = {maze.to_index(pos)
+                         for pos in [maze.castle, maze.goal, *maze.numbered_squares.values(), *maze.lettered_circles.values()]
+                         if maze.in_bounds(pos)}
+        self.adjacency = {}  # 已展开的节点 -> [(相邻节点, 边长, 格子, 是否正向), ...]
+        self.reverse = {}  # (未展开的节点, 出发的一步) -> 反向的边，从另一端追踪时记下
+
+    def is_node(self, index):
+        """格子是否是图的节点"""
+        return self.branching[self.masks[index]] or index in self.specials
+
+    def trace(self, origin, step):
+        """从origin沿step走到下一个节点（或绕回origin），返回(到达的格子, 经过的格子, 最后一步)"""
+        from array import array
+
+        masks, steps, branching, specials = self.masks, self.steps, self.branching, self.specials
+        cells = array('i')
+        previous, cell = origin, origin + step
+        while cell != origin and not branching[masks[cell]] and cell not in specials:
+            cells.append(cell)
+            first, second = steps[masks[cell]]
+            previous, cell = cell, (cell + first if cell + first != previous else cell + second)
+        cells.append(cell)
+        return cell, cells, cell - previous
+
+    def corridors(self, node):
+        """节点出发的每条边[(相邻节点, 边长, 格子, 是否正向), ...]，第一次用到时追踪并缓存"""
+        links = self.adjacency.get(node)
+        if links is None:
+            links = self.adjacency[node] = []
+            for step in self.steps[self.masks[node]]:
+                link = self.reverse.pop((node, step), None)
+                if link is None:
+                    end, cells, last = self.trace(node, step)
+                    link = (end, len(cells), cells, True)
+                    if end not in self.adjacency:
+                        # 另一端的节点以后展开时直接使用反方向，不再重新追踪
+                        self.reverse[(end, -last)] = (node, len(cells), cells, False)
+                links.append(link)
+        return links
+
+    def walk(self, neighbor, cells, forward):
+        """边经过的格子下标（不含出发的节点，含到达的neighbor）"""
+        if forward:
+            return cells
+        return [*cells[-2::-1], neighbor]
+
+    def find_path(self, start, goal, stats=None):
+        """在收缩图上做A*，展开成包含起点和终点的位置列表，不可达时返回None
+
+        给出stats字典时把展开的图节点数累加到stats['expanded']。
+        """
+        maze = self.maze
+        start_index = maze.to_index(start)
+        goal_index = maze.to_index(goal)
+        if start_index == goal_index:
+            return [start]
+
+        # 起点在走廊中间时只能走向两端节点，或者直接沿走廊走到同一条走廊上的终点；
+        # 终点在走廊中间时从终点沿走廊走到两端节点，反向作为两端节点到终点的边（绕回自己的环路除外）
+        start_links = None
+        if not self.is_node(start_index):
+            start_links = []
+            for step in self.steps[self.masks[start_index]]:
+                end, cells, last = self.trace(start_index, step)
+                if goal_index in cells:
+                    cells = cells[:cells.index(goal_index) + 1]
+                    start_links.append((goal_index, len(cells), cells, True))
+                elif end != start_index:
+                    start_links.append((end, len(cells), cells, True))
+        to_goal = {}
+        if not self.is_node(goal_index):
+            for step in self.steps[self.masks[goal_index]]:
+                end, cells, last = self.trace(goal_index, step)
+                if end != goal_index:
+                    to_goal.setdefault(end, []).append((goal_index, len(cells), cells, False))
+        heuristic = maze.get_heuristic(goal)
+        adjacency = self.adjacency
+
+        # 优先队列：(f_score, g_score, 节点)，父指针记录(上一个节点, 格子, 是否正向)
+        open_set = [(heuristic(start_index), 0, start_index)]
+        g_scores = {start_index: 0}
+        parent = {}
+        closed_set = set()
+
+        while open_set:
+            f_score, g_score, current = heapq.heappop(open_set)
+            if current in closed_set:
+                continue
+            closed_set.add(current)
+            if current == goal_index:
+                break
+
+            if current == start_index and start_links is not None:
+                links = start_links
+            else:
+                links = adjacency.get(current) or self.corridors(current)
+            if current in to_goal:
+                links = links + to_goal[current]
+            for neighbor, length, cells, forward in links:
+                new_g_score = g_score + length
+                if neighbor not in closed_set and new_g_score < g_scores.get(neighbor, new_g_score + 1):
+                    g_scores[neighbor] = new_g_score
+                    parent[neighbor] = (current, cells, forward)
+                    heapq.heappush(open_set, (new_g_score + heuristic(neighbor), new_g_score, neighbor))
+
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + len(closed_set)
+        if goal_index not in closed_set:
+            return None
+
+        hops = []
+        current = goal_index
+        while current != start_index:
+            previous, cells, forward = parent[current]
+            hops.append((current, cells, forward))
+            current = previous
+        path = [start]
+        for neighbor, cells, forward in reversed(hops):
+            path.extend(maze.to_pos(index) for index in self.walk(neighbor, cells, forward))
+        return path
+
+
+DEFAULT_CLUSTER_SIZE = 32
+DEFAULT_ENTRANCE_SPACING = 16
+DEFAULT_HIERARCHY_WEIGHT = 1.0
+
+
+class HierarchicalPlanner:
+    """分层A*（HPA*，Botea等）：把迷宫切成cluster_size见方的簇，在簇之间的抽象图上搜索
+
+    相邻两簇边界上每一段连续的通路是一个入口：长度不超过spacing的入口在中间放一对过渡格子，
+    更长的入口在两端和每隔spacing格各放一对。抽象图的节点是过渡格子，跨边界的一对之间
+    代价为1，同一簇内的节点之间是簇内BFS步数（第一次展开这个节点时才计算并缓存）。
+    查询时把起点和终点接入各自所在的簇，在抽象图上做A*，再在经过的每个簇内
+    用BFS还原逐格路径，每次查询只接触路径附近的簇。
+
+    最优性差距可调：spacing越大抽象图越小，但入口之间的绕行会让路径变长；抽象图上的A*
+    把启发乘以weight（加权A*），weight越大展开越少，路径不超过抽象图最短路径的weight倍。
+    spacing和weight都为1时路径最短。通过墙壁监听器只重建墙边所在簇的边界和簇内距离，
+    整体替换墙壁（版本号跳变）时全部重建。
+    """
+
+    def __init__(self, maze, cluster_size=DEFAULT_CLUSTER_SIZE, spacing=DEFAULT_ENTRANCE_SPACING,
+                 weight=DEFAULT_HIERARCHY_WEIGHT):
+        self.maze = maze
+        self.cluster_size = cluster_size
+        self.spacing = spacing
+        self.weight = weight
+        self.cluster_rows = -(-maze.rows // cluster_size)
+        self.cluster_cols = -(-maze.cols // cluster_size)
+        self.clusters = []  # 格子一维下标 -> 簇编号
+        columns = [col // cluster_size for col in range(maze.cols)]
+        for first_row in range(0, maze.rows, cluster_size):
+            base = first_row // cluster_size * self.cluster_cols
+            self.clusters.extend([base + column for column in columns] * min(cluster_size, maze.rows - first_row))
+        self.pending = set()  # 收到的墙边变化所在的(簇编号, 簇编号)，簇内的墙两个编号相同
+        self.expanded = 0  # 累计展开的抽象节点数
+        self.rebuild()
+        maze.add_wall_listener(self.wall_changed)
+
+    def close(self):
+        """注销墙壁监听器"""
+        self.maze.remove_wall_listener(self.wall_changed)
+
+    def rebuild(self):
+        """重建全部簇边界，清空簇内距离缓存"""
+        self.transitions = {}  # (簇编号, 右侧或下方的相邻簇编号) -> [(本簇格子, 相邻簇格子), ...]
+        self.crossings = {}  # 过渡格子 -> 边界另一侧的过渡格子列表
+        self.nodes = [set() for _ in range(self.cluster_rows * self.cluster_cols)]
+        self.intra = {}  # 簇编号 -> {节点: [(同簇节点, 步数), ...]}
+        for cluster in range(len(self.nodes)):
+            for neighbor in self.border_neighbors(cluster):
+                self.build_border(cluster, neighbor)
+        self.pending.clear()
+        self.synced_version = self.maze.version
+
+    def wall_changed(self, kind, pos, present):
+        """墙壁监听器：记录墙边所在的簇，等下次查询时一起处理"""
+        if self.synced_version != self.maze.version - 1:
+            # 之前有未通知的整体变化，只能全部重建
+            self.synced_version = None
+            return
+        self.synced_version = self.maze.version
+        cells = self.maze.wall_cells(kind, pos[0], pos[1])
+        if cells is not None:
+            self.pending.add((self.cluster_of(cells[0]), self.cluster_of(cells[2])))
+
+    def sync(self):
+        """处理收到的墙壁变化：跨簇的墙重建那条边界，簇内的墙重建该簇的四条边界
+
+        簇内沿边界方向的墙会把一段入口断开，所以簇内的墙也要重建边界（每条边界只有cluster_size个格子）。
+        """
+        if self.synced_version != self.maze.version:
+            self.rebuild()
+            return
+        for cluster, neighbor in self.pending:
+            if cluster != neighbor:
+                self.build_border(cluster, neighbor)
+                continue
+            cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+            if cluster_col > 0:
+                self.build_border(cluster - 1, cluster)
+            if cluster_row > 0:
+                self.build_border(cluster - self.cluster_cols, cluster)
+            for neighbor in self.border_neighbors(cluster):
+                self.build_border(cluster, neighbor)
+            self.intra.pop(cluster, None)
+        self.pending.clear()
+
+    def cluster_of(self, index):
+        """格子所在的簇编号"""
+        row, col = divmod(index, self.maze.cols)
+        return (row // self.cluster_size) * self.cluster_cols + col // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        """簇覆盖的范围(首行, 末行 + 1, 首列, 末列 + 1)"""
+        size = self.cluster_size
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        return (cluster_row * size, min(self.maze.rows, (cluster_row + 1) * size),
+                cluster_col * size, min(self.maze.cols, (cluster_col + 1) * size))
+
+    def border_neighbors(self, cluster):
+        """右侧和下方的相邻簇（每条边界只记在编号较小的簇上）"""
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        neighbors = []
+        if cluster_col + 1 < self.cluster_cols:
+            neighbors.append(cluster + 1)
+        if cluster_row + 1 < self.cluster_rows:
+            neighbors.append(cluster + self.cluster_cols)
+        return neighbors
+
+    def collect_nodes(self, cluster):
+        """簇四条边界上属于本簇的过渡格子"""
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        nodes = set()
+        for neighbor in self.border_neighbors(cluster):
+            nodes.update(inside for inside, outside in self.transitions.get((cluster, neighbor), ()))
+        if cluster_col > 0:
+            nodes.update(outside for inside, outside in self.transitions.get((cluster - 1, cluster), ()))
+        if cluster_row > 0:
+            nodes.update(outside for inside, outside in self.transitions.get((cluster - self.cluster_cols, cluster), ()))
+        return nodes
+
+    def build_border(self, cluster, neighbor):
+        """重建cluster与右侧或下方相邻簇之间的入口"""
+        if cluster > neighbor:
+            cluster, neighbor = neighbor, cluster
+        masks = self.maze.get_adjacency()
+        cols = self.maze.cols
+        first_row, last_row, first_col, last_col = self.cluster_bounds(cluster)
+        if neighbor == cluster + self.cluster_cols:
+            # 水平边界：本簇最下一行中向下可以通行的格子，沿边界向右排列
+            cells = [(last_row - 1) * cols + col for col in range(first_col, last_col)]
+            bit, step, along = 4, cols, 2
+        else:
+            # 竖直边界：本簇最右一列中向右可以通行的格子，沿边界向下排列
+            cells = [row * cols + last_col - 1 for row in range(first_row, last_row)]
+            bit, step, along = 2, 1, 4
+
+        for inside, outside in self.transitions.pop((cluster, neighbor), ()):
+            self.crossings[inside].remove(outside)
+            self.crossings[outside].remove(inside)
+        transitions = []
+        run = []  # 当前这一段连续通路
+        for cell in cells + [None]:
+            if cell is not None and masks[cell] & bit:
+                # 墙在格子边上：边界两侧都能沿边界走到上一格时才算同一个入口
+                previous = run[-1] if run else None
+                if previous is None or (masks[previous] & along and masks[previous + step] & along):
+                    run.append(cell)
+                    continue
+            if run:
+                if len(run) <= self.spacing:
+                    chosen = [run[len(run) // 2]]
+                else:
+                    chosen = run[::self.spacing]
+                    if chosen[-1] != run[-1]:
+                        chosen.append(run[-1])
+                transitions.extend((inside, inside + step) for inside in chosen)
+                run = [cell] if cell is not None and masks[cell] & bit else []
+        self.transitions[(cluster, neighbor)] = transitions
+        for inside, outside in transitions:
+            self.crossings.setdefault(inside, []).append(outside)
+            self.crossings.setdefault(outside, []).append(inside)
+
+        # 两个簇的节点可能变了，簇内距离下次用到时重新计算
+        for changed in (cluster, neighbor):
+            self.nodes[changed] = self.collect_nodes(changed)
+            self.intra.pop(changed, None)
+
+    def cluster_search(self, cluster, source, target=None):
+        """只在簇内做BFS，返回(步数字典, 父指针字典)；给出target时到达即停"""
+        masks = self.maze.get_adjacency()
+        steps = self.maze.mask_steps
+        clusters = self.clusters
+        distances = {source: 0}
+        parent = {source: source}
+        frontier = [source]
+        distance = 0
+
+        # 逐层BFS，用clusters表判断邻格是否还在簇内
+        while frontier and target not in parent:
+            distance += 1
+            next_frontier = []
+            for current in frontier:
+                for step in steps[masks[current]]:
+                    neighbor = current + step
+                    if neighbor not in parent and clusters[neighbor] == cluster:
+                        distances[neighbor] = distance
+                        parent[neighbor] = current
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+
+        return distances, parent
+
+    def intra_edges(self, cluster, node):
+        """node到同簇其他节点的步数（第一次展开这个节点时计算并缓存，没展开过的节点不做BFS）
+
+        簇内只有两个节点连通时（穿过簇的一段走廊，迷宫里最常见），另一个节点的边一并记下。
+        """
+        edges = self.intra.setdefault(cluster, {})
+        result = edges.get(node)
+        if result is None:
+            distances = self.cluster_search(cluster, node)[0]
+            result = edges[node] = [(other, distances[other]) for other in self.nodes[cluster]
+                                    if other != node and other in distances]
+            if len(result) == 1:
+                other, steps = result[0]
+                edges[other] = [(node, steps)]
+        return result
+
+    def find_path(self, start, goal, stats=None):
+        """抽象图上的A*加簇内细化，返回包含起点和终点的位置列表，不可达时返回None
+
+        给出stats字典时把展开的抽象节点数累加到stats['expanded']。
+        """
+        abstract = self.plan(start, goal, stats)
+        if abstract is None:
+            return None
+        path = [start]
+        for current, following in zip(abstract, abstract[1:]):
+            path.extend(self.refine(current, following))
+        return path
+
+    def plan(self, start, goal, stats=None):
+        """只在抽象图上做A*，返回从起点到终点经过的抽象节点（一维下标）列表，不可达时返回None
+
+        相邻两个节点之间用refine还原成逐格路径；沿路径移动时只需还原眼前这一段，
+        中途墙壁变化要重新规划时，后面没走到的段就不用还原了。
+        """
+        self.sync()
+        maze = self.maze
+        start_index = maze.to_index(start)
+        goal_index = maze.to_index(goal)
+        if start_index == goal_index:
+            return [start_index]
+        start_cluster = self.cluster_of(start_index)
+        goal_cluster = self.cluster_of(goal_index)
+
+        # 起点接入所在簇的节点；终点反过来记录所在簇的每个节点到终点的步数
+        start_distances = self.cluster_search(start_cluster, start_index)[0]
+        start_edges = [(node, start_distances[node]) for node in self.nodes[start_cluster] if node in start_distances]
+        if goal_index in start_distances:
+            start_edges.append((goal_index, start_distances[goal_index]))
+        goal_distances = self.cluster_search(goal_cluster, goal_index)[0]
+        to_goal = {node: goal_distances[node] for node in self.nodes[goal_cluster] if node in goal_distances}
+
+        # 抽象节点就是格子，格子上的地标下界对抽象图同样可采纳
+        steps_to_goal = maze.get_heuristic(goal)
+        weight = self.weight
+
+        def heuristic(index):
+            return steps_to_goal(index) * weight
+
+        open_set = [(heuristic(start_index), 0, start_index)]
+        g_scores = {start_index: 0}
+        parent = {start_index: start_index}
+        closed_set = set()
+
+        while open_set:
+            f_score, g_score, current = heapq.heappop(open_set)
+            if current in closed_set:
+                continue
+            closed_set.add(current)
+            if current == goal_index:
+                break
+
+            if current == start_index:
+                edges = list(start_edges)
+            else:
+                edges = list(self.intra_edges(self.cluster_of(current), current))
+                if current in to_goal:
+                    edges.append((goal_index, to_goal[current]))
+            edges.extend((across, 1) for across in self.crossings.get(current, ()))
+            for neighbor, cost in edges:
+                new_g_score = g_score + cost
+                if neighbor not in closed_set and new_g_score < g_scores.get(neighbor, new_g_score + 1):
+                    g_scores[neighbor] = new_g_score
+                    parent[neighbor] = current
+                    heapq.heappush(open_set, (new_g_score + heuristic(neighbor), new_g_score, neighbor))
+
+        self.expanded += len(closed_set)
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + len(closed_set)
+        if goal_index not in closed_set:
+            return None
+        abstract = [goal_index]
+        while abstract[-1] != start_index:
+            abstract.append(parent[abstract[-1]])
+        abstract.reverse()
+        return abstract
+
+    def refine(self, current, following):
+        """把抽象路径上相邻的两个节点还原成逐格路径，返回current之后到following为止的位置列表
+
+        跨边界的一步直接走，同一簇内的两个节点之间用簇内BFS还原。
+        """
+        maze = self.maze
+        cluster = self.cluster_of(current)
+        if cluster != self.cluster_of(following):
+            return [maze.to_pos(following)]
+        tree = self.cluster_search(cluster, current, following)[1]
+        segment = []
+        cell = following
+        while cell != current:
+            segment.append(maze.to_pos(cell))
+            cell = tree[cell]
+        segment.reverse()
+        return segment
+
+
+# 转向感知规划的默认代价（单位：前进一格的时间）。界面每5帧执行一步，
+# 转向动画持续30帧，所以转90度相当于前进6格，掉头按两次90度转向计算
+DEFAULT_TURN_COSTS = {'forward': 1.0, 'turn': 6.0, 'u_turn': 12.0}
+
+
+def fastest_path(maze, start, direction, goal, costs=None):
+    """在(格子, 朝向)状态空间上用A*求用时最短的路线
+
+    每个状态可以前进一格（forward代价）、原地左转或右转90度（turn代价）、原地掉头（u_turn代价），
+    到达终点格子时朝向任意。返回(动作列表, 经过的格子列表, 总代价)，动作为'forward'、'left'、
+    'right'、'u_turn'，格子列表包含起点和终点；到不了终点时返回None。
+    """
+    from Maze_Simulation_v1 import DIRECTION_DELTAS
+
+    costs = dict(DEFAULT_TURN_COSTS, **(costs or {}))
+    forward_cost, turn_cost, u_turn_cost = costs['forward'], costs['turn'], costs['u_turn']
+    masks = maze.get_adjacency()
+    cols = maze.cols
+    goal_index = maze.to_index(goal)
+    offsets = [dr * cols + dc for dr, dc in DIRECTION_DELTAS]
+    # 旋转动作：(方向变化, 代价, 动作名称)
+    rotations = ((1, turn_cost, 'right'), (3, turn_cost, 'left'), (2, u_turn_cost, 'u_turn'))
+    steps_to_goal = maze.get_heuristic(goal)
+
+    def heuristic(index):
+        return steps_to_goal(index) * forward_cost
+
+    start_state = maze.to_index(start) * 4 + direction
+    best = {start_state: 0}
+    parent = {start_state: (None, None)}  # 状态 -> (上一个状态, 动作)
+    open_set = [(heuristic(start_state >> 2), 0, start_state)]
+
+    while open_set:
+        f_score, cost, state = heapq.heappop(open_set)
+        if cost > best[state]:
+            continue
+        index, heading = state >> 2, state & 3
+        if index == goal_index:
+            actions = []
+            cells = [divmod(index, cols)]
+            while parent[state][0] is not None:
+                state, action = parent[state]
+                actions.append(action)
+                if action == 'forward':
+                    cells.append(divmod(state >> 2, cols))
+            actions.reverse()
+            cells.reverse()
+            return actions, cells, cost
+
+        moves = [((index + offsets[heading]) * 4 + heading, forward_cost, 'forward')] if (masks[index] >> heading) & 1 else []
+        moves.extend((index * 4 + (heading + turn) % 4, turn_price, name) for turn, turn_price, name in rotations)
+        for next_state, price, action in moves:
+            next_cost = cost + price
+            if next_cost < best.get(next_state, INF):
+                best[next_state] = next_cost
+                parent[next_state] = (state, action)
+                heapq.heappush(open_set, (next_cost + heuristic(next_state >> 2), next_cost, next_state))
+
+    return None
+
+
+class FrontierExplorer:
+    """前沿探索：只根据传感器读数建立地图，维护前沿格子的索引
+
+    每个格子记录已经测过的边（sensed）和其中可以通行的边（open_sides），按方向d的第d位存放，
+    迷宫边界一开始就已知。前沿是经过已知可通行的边与到过的格子相邻、但自己还没到过的格子，
+    用集合保存并由每个格子的状态字节索引，加入和移除都是O(1)。
+
+    下一个前沿按用时最近选择：在(格子, 朝向)状态上用桶队列（Dial算法）做最短路搜索，前进、转向、
+    掉头的代价取整后作为桶编号的增量，从队列中弹出的第一个前沿格子就是用时最近的。搜索只经过
+    到过的格子，旁边就有前沿时几乎立即结束。
+    """
+
+    UNKNOWN, FRONTIER, VISITED = 0, 1, 2
+
+    def __init__(self, rows, cols, costs=None):
+        from Maze_Simulation_v1 import DIRECTION_DELTAS
+
+        self.rows = rows
+        self.cols = cols
+        total = rows * cols
+        self.offsets = [dr * cols + dc for dr, dc in DIRECTION_DELTAS]
+        costs = dict(DEFAULT_TURN_COSTS, **(costs or {}))
+        self.costs = (max(1, round(costs['forward'])), max(1, round(costs['turn'])), max(1, round(costs['u_turn'])))
+        self.open_sides = bytearray(total)  # 已知可以通行的方向
+        self.sensed = bytearray(total)  # 已知的方向（可通行或有墙）
+        for index in range(total):
+            row, col = divmod(index, cols)
+            self.sensed[index] = (row == 0) | (col == cols - 1) << 1 | (row == rows - 1) << 2 | (col == 0) << 3
+        self.state = bytearray(total)  # UNKNOWN、FRONTIER或VISITED
+        self.frontier = set()
+        self.explored = 0  # 到过的格子数
+        self.expanded = 0  # 选择前沿时累计弹出的状态数
+
+    def record(self, pos, direction, is_open):
+        """记录一次传感器读数：pos在direction一侧是否可以通行（同时记录到邻居的对侧）"""
+        index = pos[0] * self.cols + pos[1]
+        bit = 1 << direction
+        if self.sensed[index] & bit and not self.open_sides[index] & bit:
+            return  # 边界或已知的墙
+        neighbor = index + self.offsets[direction]
+        opposite = 1 << ((direction + 2) % 4)
+        self.sensed[index] |= bit
+        self.sensed[neighbor] |= opposite
+        if is_open:
+            self.open_sides[index] |= bit
+            self.open_sides[neighbor] |= opposite
+            if self.state[index] == self.VISITED and self.state[neighbor] == self.UNKNOWN:
+                self.state[neighbor] = self.FRONTIER
+                self.frontier.add(neighbor)
+        else:
+            self.open_sides[index] &= ~bit
+            self.open_sides[neighbor] &= ~opposite
+
+    def is_sensed(self, pos):
+        """格子四周是否都已经测过"""
+        return self.sensed[pos[0] * self.cols + pos[1]] == 15
+
+    def visit(self, pos):
+        """记录到达pos：从前沿移除，经过已知可通行的边相邻的未知格子成为前沿"""
+        index = pos[0] * self.cols + pos[1]
+        if self.state[index] == self.VISITED:
+            return
+        if self.state[index] == self.FRONTIER:
+            self.frontier.discard(index)
+        self.state[index] = self.VISITED
+        self.explored += 1
+        sides = self.open_sides[index]
+        for direction in range(4):
+            if (sides >> direction) & 1:
+                neighbor = index + self.offsets[direction]
+                if self.state[neighbor] == self.UNKNOWN:
+                    self.state[neighbor] = self.FRONTIER
+                    self.frontier.add(neighbor)
+
+    def route(self, pos, direction, target=None):
+        """从(pos, direction)出发用时最短地到达最近的前沿格子（给出target时到达target）
+
+        只经过到过的格子和已知可以通行的边，返回不含起点的格子列表；到不了时返回None。
+        """
+        forward_cost, turn_cost, u_turn_cost = self.costs
+        offsets, open_sides, state = self.offsets, self.open_sides, self.state
+        target_index = None if target is None else target[0] * self.cols + target[1]
+        width = max(self.costs) + 1
+        buckets = [[] for _ in range(width)]  # 循环使用的桶：代价c的状态放在c % width号桶里
+        start = (pos[0] * self.cols + pos[1]) * 4 + direction
+        best = {start: 0}
+        parent = {start: None}
+        buckets[0].append(start)
+        pending = 1
+        cost = 0
+
+        while pending:
+            bucket = buckets[cost % width]
+            while bucket:
+                state_id = bucket.pop()
+                pending -= 1
+                if best[state_id] != cost:
+                    continue  # 过期的项
+                self.expanded += 1
+                index, heading = state_id >> 2, state_id & 3
+                if (index == target_index if target_index is not None
+                        else state[index] == self.FRONTIER):
+                    cells = []
+                    while state_id is not None:
+                        if not cells or cells[-1] != state_id >> 2:
+                            cells.append(state_id >> 2)
+                        state_id = parent[state_id]
+                    cells.reverse()
+                    return [divmod(cell, self.cols) for cell in cells[1:]]
+                if state[index] != self.VISITED:
+                    continue  # 前沿格子之外只经过到过的格子
+
+                moves = [(index * 4 + (heading + 1) % 4, turn_cost), (index * 4 + (heading + 3) % 4, turn_cost),
+                         (index * 4 + (heading + 2) % 4, u_turn_cost)]
+                if (open_sides[index] >> heading) & 1:
+                    moves.append(((index + offsets[heading]) * 4 + heading, forward_cost))
+                for next_state, price in moves:
+                    next_cost = cost + price
+                    if next_cost < best.get(next_state, next_cost + 1):
+                        best[next_state] = next_cost
+                        parent[next_state] = state_id
+                        buckets[next_cost % width].append(next_state)
+                        pending += 1
+            cost += 1
+
+        return None
+
+
+# 多目标路线：标记数不超过这个值时用Held-Karp求精确顺序（2^n * n^2），更多时用2-opt和Or-opt改进
+HELD_KARP_LIMIT = 12
+
+
+def distance_matrix(maze, points):
+    """points两两之间的最短步数（距离对称，除最后一个点外每个点做一次BFS），不可达为INF"""
+    count = len(points)
+    indices = [maze.to_index(pos) for pos in points]
+    matrix = [[INF] * count for _ in range(count)]
+    matrix[-1][-1] = 0
+    for i in range(count - 1):
+        table = maze.distance_map([points[i]])
+        for j in range(i, count):
+            if table[indices[j]] >= 0:
+                matrix[i][j] = matrix[j][i] = table[indices[j]]
+    return matrix
+
+
+def held_karp(matrix):
+    """Held-Karp状态压缩DP：从第一个点出发经过所有中间点到最后一个点的最短顺序
+
+    返回(中间点的编号列表, 总长)，到不了时返回None。
+    """
+    count = len(matrix) - 2
+    if count == 0:
+        return ([], matrix[0][-1]) if matrix[0][-1] < INF else None
+    full = (1 << count) - 1
+    # best[mask][j]：从起点出发恰好经过mask中的中间点、停在中间点j的最短长度
+    best = [[INF] * count for _ in range(full + 1)]
+    parent = [[-1] * count for _ in range(full + 1)]
+    for j in range(count):
+        best[1 << j][j] = matrix[0][j + 1]
+
+    for mask in range(1, full + 1):
+        row = best[mask]
+        for j in range(count):
+            cost = row[j]
+            if cost == INF:
+                continue
+            distances = matrix[j + 1]
+            for k in range(count):
+                if not (mask >> k) & 1 and cost + distances[k + 1] < best[mask | (1 << k)][k]:
+                    best[mask | (1 << k)][k] = cost + distances[k + 1]
+                    parent[mask | (1 << k)][k] = j
+
+    last = min(range(count), key=lambda j: best[full][j] + matrix[j + 1][-1])
+    total = best[full][last] + matrix[last + 1][-1]
+    if total == INF:
+        return None
+    order = []
+    mask, j = full, last
+    while j >= 0:
+        order.append(j + 1)
+        mask, j = mask ^ (1 << j), parent[mask][j]
+    order.reverse()
+    return order, total
+
+
+def improve_route(matrix, order):
+    """用2-opt（翻转一段）和Or-opt（把1到3个连续的点移到别处，可以反向）改进访问顺序，直到没有改进
+
+    order是中间点的编号列表，第一个点和最后一个点固定在两端；返回(改进后的列表, 总长)。
+    """
+    route = [0] + list(order) + [len(matrix) - 1]
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(route) - 2):
+            for j in range(i + 1, len(route) - 1):
+                before, first, last, after = route[i - 1], route[i], route[j], route[j + 1]
+                if matrix[before][last] + matrix[first][after] < matrix[before][first] + matrix[last][after]:
+                    route[i:j + 1] = route[i:j + 1][::-1]
+                    improved = True
+        for size in (1, 2, 3):
+            i = 1
+            while i + size < len(route):
+                segment = route[i:i + size]
+                before, after = route[i - 1], route[i + size]
+                gain = matrix[before][segment[0]] + matrix[segment[-1]][after] - matrix[before][after]
+                rest = route[:i] + route[i + size:]
+                for k in range(1, len(rest)):
+                    left, right = rest[k - 1], rest[k]
+                    for candidate in (segment, segment[::-1]):
+                        if matrix[left][candidate[0]] + matrix[candidate[-1]][right] - matrix[left][right] < gain:
+                            route = rest[:k] + candidate + rest[k:]
+                            improved = True
+                            break
+                    else:
+                        continue
+                    break
+                i += 1
+    total = sum(matrix[a][b] for a, b in zip(route, route[1:]))
+    return route[1:-1], total
+
+
+def marker_route(maze, start, goal, markers):
+    """多目标路线：从start出发经过markers（名称 -> 位置）中的全部标记再到达goal
+
+    先算出起点、标记和终点两两之间的步数，标记不超过HELD_KARP_LIMIT个时精确求解访问顺序，
+    否则从最近邻顺序出发用2-opt和Or-opt改进，最后在走廊收缩图上把各段拼成逐格路径。
+    返回(按访问顺序的标记名称列表, 包含起点和终点的逐格路径, 总步数)，有标记或终点到不了时返回None。
+    """
+    names = list(markers)
+    points = [start, *markers.values(), goal]
+    matrix = distance_matrix(maze, points)
+    if INF in matrix[0]:
+        return None
+
+    if len(names) <= HELD_KARP_LIMIT:
+        result = held_karp(matrix)
+        if result is None:
+            return None
+        order, total = result
+    else:
+        # 最近邻：每次走向最近的未访问标记
+        order = []
+        current = 0
+        remaining = set(range(1, len(names) + 1))
+        while remaining:
+            current = min(remaining, key=matrix[current].__getitem__)
+            order.append(current)
+            remaining.remove(current)
+        order, total = improve_route(matrix, order)
+
+    graph = maze.get_junction_graph()
+    path = [start]
+    for previous, following in zip([0] + order, order + [len(points) - 1]):
+        path.extend(graph.find_path(points[previous], points[following])[1:])
+    return [names[i - 1] for i in order], path, total
@@ -0,0 +1,145 @@
+"""
+无界面仿真引擎
+Headless Simulation Engine
+
+不打开窗口、不等待帧率，用模拟时钟把Robot的搜索算法一直运行到结束，
+用于批量评测。模拟时间按界面中的节奏计算：每帧100毫秒（clock.tick(10)），
+每robot_speed帧执行一步算法，转向动画持续30帧。
+"""
+
+import argparse
+import time
+
+from algorithms import ALGORITHMS, AlgorithmRun, resolve_algorithm
+
+# 界面的帧间隔（毫秒）和默认速度（每隔几帧执行一步）
+FRAME_MS = 100
+DEFAULT_SPEED = 5
+
+
+class SimulatedClock:
+    """模拟时钟：只有调用advance时时间才会前进"""
+
+    def __init__(self, start=0):
+        self.now = start
+
+    def advance(self, milliseconds):
+        self.now += milliseconds
+
+    def get_ticks(self):
+        """与pygame.time.get_ticks()相同的用法，返回毫秒数"""
+        return self.now
+
+
+def run_algorithm(maze, algorithm, speed=DEFAULT_SPEED, frame_ms=FRAME_MS, max_steps=None):
+    """在迷宫上无界面运行一个算法直到完成，返回结果字典
+
+    返回的字典包含：
+      algorithm     算法名称
+      completed     算法是否正常结束（False表示超过max_steps仍未结束）
+      reached_goal  机器人是否停在终点
+      steps         移动步数
+      turns         转向次数（每次90度）
+      calls         执行一步的次数（含转向动画期间的等待）
+      sim_time      模拟时间（毫秒，与界面计时器一致）
+      wall_time     实际运行时间（秒）
+      stats         算法记录的统计信息（例如A*、JPS、D* Lite展开的格子数expanded，
+                    micromouse每一格的洪水值修正次数，两阶段微型鼠的探索用时、冲刺用时和总分）
+    """
+    from Maze_Simulation_v1 import Robot
+
+    key = resolve_algorithm(algorithm)
+    if max_steps is None:
+        max_steps = 100 * maze.rows * maze.cols + 1000
+
+    clock = SimulatedClock()
+    robot = Robot(maze, clock=clock.get_ticks, verbose=False)
+    robot.reset_dfs()
+    run = AlgorithmRun(robot, key, animate=speed > 1)
+
+    calls = 0
+    speed_counter = 0
+    wall_start = time.perf_counter()
+    while not robot.dfs_complete and calls < max_steps:
+        # 与界面主循环相同：每robot_speed帧执行一步，每帧推进转向动画
+        speed_counter += 1
+        if speed_counter >= speed:
+            run.step()
+            calls += 1
+            speed_counter = 0
+        robot.update_turning_animation()
+        clock.advance(frame_ms)
+    wall_time = time.perf_counter() - wall_start
+
+    start_time = robot.start_time if robot.start_time is not None else 0
+    end_time = robot.end_time if robot.end_time is not None else clock.get_ticks()
+    return {
+        'algorithm': key,
+        'completed': robot.dfs_complete,
+        'reached_goal': robot.position == maze.goal,
+        'steps': robot.current_step,
+        'turns': robot.turns,
+        'calls': calls,
+        'sim_time': end_time - start_time,
+        'wall_time': wall_time,
+        'stats': run.stats
+    }
+
+
+def run_all(maze, algorithms=None, **options):
+    """依次运行多个算法（每次从迷宫起点重新开始），返回结果列表"""
+    return [run_algorithm(maze, name, **options) for name in (algorithms or ALGORITHMS)]
+
+
+def format_results(results):
+    """把结果列表格式化成文本表格（展开数只有规划类算法才有，其余显示为-）
+
+    两阶段微型鼠在表格后面另外列出探索用时、冲刺用时和总分。
+    """
+    lines = [f"{'算法':<12}{'完成':>6}{'到达终点':>8}{'步数':>8}{'转向':>8}{'展开':>8}{'模拟时间(s)':>12}{'实际时间(ms)':>14}"]
+    for result in results:
+        expanded = result.get('stats', {}).get('expanded', '-')
+        lines.append(f"{result['algorithm']:<12}{str(result['completed']):>6}{str(result['reached_goal']):>8}"
+                     f"{result['steps']:>8}{result['turns']:>8}{expanded:>8}{result['sim_time'] / 1000:>12.1f}"
+                     f"{result['wall_time'] * 1000:>14.1f}")
+    for result in results:
+        stats = result.get('stats', {})
+        if 'score' in stats:
+            lines.append(f"{result['algorithm']}: 探索{stats['exploration_time'] / 1000:.1f}s（{stats['exploration_steps']}步）, "
+                         f"冲刺{stats['speed_run_time'] / 1000:.1f}s（{stats['speed_run_steps']}步，最短{stats['optimum']}步）, "
+                         f"总分{stats['score'] / 1000:.2f}s")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="无界面运行迷宫搜索算法并输出统计")
+    parser.add_argument('rows', type=int, nargs='?', default=8, help="迷宫行数（8x8为固定布局）")
+    parser.add_argument('cols', type=int, nargs='?', help="迷宫列数（默认等于行数）")
+    parser.add_argument('--maze', help="从迷宫文件读取（.mazb/.maz/.txt）")
+    parser.add_argument('--algorithm', action='append', help="要运行的算法（可重复，默认全部）")
+    parser.add_argument('--generator', help="用完美迷宫算法生成迷宫（backtracker/kruskal/wilson/prim/eller）")
+    parser.add_argument('--seed', type=int, help="随机种子")
+    parser.add_argument('--speed', type=int, default=DEFAULT_SPEED, help="每隔几帧执行一步（与界面滑块相同）")
+    args = parser.parse_args()
+    if not args.maze and args.rows * (args.cols or args.rows) < 2:
+        parser.error("迷宫至少需要两个格子（起点和终点不能重合）")
+
+    import random
+    from Maze_Simulation_v1 import Maze
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.maze:
+        from maze_io import read_any
+        maze = read_any(args.maze)
+    elif args.generator:
+        maze = Maze(args.rows, args.cols, generate=False)
+        maze.generate_maze(args.generator, seed=args.seed)
+        maze.save_as_original()
+    else:
+        maze = Maze(args.rows, args.cols)
+    print(format_results(run_all(maze, args.algorithm, speed=args.speed)))
+
+
+if __name__ == "__main__":
+    main()
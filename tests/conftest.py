@@ -0,0 +1,6 @@
+"""测试配置：模块都在仓库根目录下，直接运行pytest时也能导入"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,91 @@
+"""搜索算法：在各种完美迷宫和带回路的迷宫上都能到达终点"""
+
+import random
+
+import pytest
+
+from Maze_Simulation_v1 import Maze
+from algorithms import ALGORITHMS, bidirectional_astar_path
+from simulation import run_algorithm
+
+# 只有一行或一列的迷宫中起点两侧都可能有分支，DFS需要能退回起点
+SIZES = [(1, 3), (3, 1), (2, 2), (6, 7)]
+
+
+@pytest.mark.parametrize('algorithm', sorted(ALGORITHMS))
+@pytest.mark.parametrize('rows, cols', SIZES)
+@pytest.mark.parametrize('seed', [0, 5])
+def test_reaches_goal(algorithm, rows, cols, seed):
+    maze = Maze(rows, cols, generate=False)
+    maze.generate_maze('kruskal', braid=0.5, seed=seed)
+    maze.save_as_original()
+    result = run_algorithm(maze, algorithm, speed=1)
+    assert result['completed']
+    assert result['reached_goal']
+
+
+@pytest.mark.parametrize('algorithm', sorted(ALGORITHMS))
+def test_reaches_goal_on_exact_layout(algorithm):
+    random.seed(0)
+    result = run_algorithm(Maze(), algorithm, speed=1)
+    assert result['completed']
+    assert result['reached_goal']
+
+
+def test_bidirectional_astar_matches_bfs():
+    rng = random.Random(6)
+    maze = Maze(14, 11, generate=False)
+    maze.generate_maze('wilson', braid=0.5, seed=6)
+    # 加几面墙，让部分格子对不连通
+    for _ in range(40):
+        maze.set_wall(rng.choice(['horizontal', 'vertical']), (rng.randrange(1, 14), rng.randrange(1, 11)))
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)]
+    for _ in range(200):
+        start, goal = rng.sample(cells, 2)
+        expected = maze.shortest_path(start, goal)
+        stats = {}
+        path = bidirectional_astar_path(maze, start, goal, stats)
+        if expected is None:
+            assert path is None
+            continue
+        assert len(path) == len(expected)
+        assert path[0] == start and path[-1] == goal
+        assert all(maze.is_valid_move_between(a, b) for a, b in zip(path, path[1:]))
+        assert stats['expanded'] > 0
+
+
+def island_maze():
+    """7x7的空旷迷宫，中间3x3被墙围成孤岛；机器人从孤岛左侧出发，朝上时右手扶着孤岛"""
+    maze = Maze(7, 7, generate=False)
+    for index in range(2, 5):
+        maze.set_wall('horizontal', (2, index))
+        maze.set_wall('horizontal', (5, index))
+        maze.set_wall('vertical', (index, 2))
+        maze.set_wall('vertical', (index, 5))
+    maze.castle = maze.robot_pos = (3, 1)
+    maze.goal = (0, 6)
+    maze.save_as_original()
+    return maze
+
+
+def test_wall_follow_detects_loop_around_island():
+    result = run_algorithm(island_maze(), 'wall_follow', speed=5)
+    # 右手法则绕孤岛一圈回到出发状态，记下循环位置后由Tremaux走到终点
+    assert result['stats']['loop'] == (3, 1)
+    assert result['completed'] and result['reached_goal']
+
+
+def test_pledge_leaves_island():
+    result = run_algorithm(island_maze(), 'pledge', speed=5)
+    assert 'loop' not in result['stats']
+    assert result['reached_goal']
+
+
+@pytest.mark.parametrize('algorithm', ['wall_follow', 'pledge'])
+def test_loop_detected_when_goal_is_on_island(algorithm):
+    maze = island_maze()
+    maze.goal = (3, 3)
+    result = run_algorithm(maze, algorithm, speed=5)
+    # 终点被围在孤岛里：两种算法都会绕圈，发现循环后由Tremaux走遍能到的地方再结束
+    assert 'loop' in result['stats']
+    assert result['completed'] and not result['reached_goal']
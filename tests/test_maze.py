@@ -0,0 +1,73 @@
+"""迷宫尺寸和起点、终点的位置"""
+
+import random
+
+import pytest
+
+from Maze_Simulation_v1 import Maze
+
+
+@pytest.mark.parametrize('rows, cols', [(1, 1), (0, 5), (3, 0)])
+def test_rejects_mazes_without_room_for_goal(rows, cols):
+    with pytest.raises(ValueError):
+        Maze(rows, cols)
+
+
+@pytest.mark.parametrize('rows, cols', [(1, 2), (2, 1), (1, 3), (1, 31), (3, 5)])
+@pytest.mark.parametrize('generate', [True, False])
+def test_goal_differs_from_castle(rows, cols, generate):
+    random.seed(rows * 100 + cols)
+    maze = Maze(rows, cols, generate=generate)
+    assert maze.goal != maze.castle
+    assert maze.shortest_path(maze.castle, maze.goal) is not None
+
+
+def test_random_goal_covers_every_other_cell():
+    maze = Maze(2, 2, generate=False)
+    rng = random.Random(1)
+    goals = set()
+    for _ in range(200):
+        maze.generate_random_goal(rng)
+        goals.add(maze.goal)
+    assert goals == {(0, 0), (0, 1), (1, 0), (1, 1)} - {maze.castle}
+
+
+def test_is_connected_tracks_wall_edits():
+    rng = random.Random(8)
+    maze = Maze(10, 12, generate=False)
+    maze.generate_maze('prim', seed=8)
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)]
+    for step in range(300):
+        kind = rng.choice(['horizontal', 'vertical'])
+        wall = (rng.randrange(1, maze.rows), rng.randrange(1, maze.cols))
+        maze.set_wall(kind, wall, step % 3 == 0)  # 添加和移除都有，移除更多
+        start, goal = rng.sample(cells, 2)
+        assert maze.is_connected(start, goal) == (maze.shortest_path(start, goal) is not None)
+
+
+def test_removing_walls_keeps_components_current():
+    maze = Maze(6, 6, generate=False)
+    maze.generate_maze('kruskal', seed=1)
+    maze.fill_walls()
+    assert not maze.is_connected((0, 0), (5, 5))
+    labels = maze.component_labels
+    # 只移除墙壁：分量在并查集上原地合并，不重新标记
+    for col in range(1, 6):
+        maze.remove_wall('vertical', (0, col))
+    for row in range(1, 6):
+        maze.remove_wall('horizontal', (row, 5))
+    assert maze.components_version == maze.version
+    assert maze.is_connected((0, 0), (5, 5))
+    assert maze.component_labels is labels
+
+
+def test_ensure_connectivity_removes_minimum_walls():
+    maze = Maze(5, 5, generate=False)
+    maze.castle, maze.goal = (4, 2), (0, 2)
+    for col in range(5):
+        maze.set_wall('horizontal', (2, col))
+        maze.set_wall('horizontal', (3, col))
+    version = maze.version
+    maze.ensure_connectivity()
+    assert maze.is_connected(maze.castle, maze.goal)
+    assert maze.version - version == 2  # 两道横墙各移除一面
@@ -0,0 +1,52 @@
+"""完美迷宫生成算法：任意尺寸下都连通、边界完整、恰好是一棵生成树"""
+
+import pytest
+
+from Maze_Simulation_v1 import Maze
+from maze_generators import GENERATORS
+
+
+def open_passages(maze):
+    """迷宫内部打通的墙边数"""
+    count = 0
+    for row in range(maze.rows):
+        for col in range(maze.cols):
+            if row + 1 < maze.rows and not maze.has_wall('horizontal', (row + 1, col)):
+                count += 1
+            if col + 1 < maze.cols and not maze.has_wall('vertical', (row, col + 1)):
+                count += 1
+    return count
+
+
+@pytest.mark.parametrize('algorithm', sorted(GENERATORS))
+@pytest.mark.parametrize('rows, cols', [(1, 5), (5, 1), (2, 3), (1, 2), (2, 1), (7, 4), (40, 30)])
+@pytest.mark.parametrize('seed', [0, 3, 17])
+def test_perfect_maze(algorithm, rows, cols, seed):
+    maze = Maze(rows, cols, generate=False)
+    maze.generate_maze(algorithm, seed=seed)
+
+    # 边界完整
+    for col in range(cols):
+        assert maze.has_wall('horizontal', (0, col))
+        assert maze.has_wall('horizontal', (rows, col))
+    for row in range(rows):
+        assert maze.has_wall('vertical', (row, 0))
+        assert maze.has_wall('vertical', (row, cols))
+
+    # 所有格子连通，起点能到终点，而且没有回路
+    distances = maze.distance_map([maze.castle])
+    assert min(distances) >= 0
+    assert maze.shortest_path(maze.castle, maze.goal) is not None
+    assert open_passages(maze) == rows * cols - 1
+
+
+@pytest.mark.parametrize('algorithm', sorted(GENERATORS))
+@pytest.mark.parametrize('rows, cols', [(1, 5), (5, 1), (2, 3), (6, 6)])
+def test_braid_keeps_maze_connected(algorithm, rows, cols):
+    maze = Maze(rows, cols, generate=False)
+    maze.generate_maze(algorithm, braid=1.0, seed=11)
+    assert min(maze.distance_map([maze.castle])) >= 0
+    if rows > 1 and cols > 1:
+        # 能打通的死胡同都打通了
+        masks = maze.get_adjacency()
+        assert all(bin(mask).count('1') > 1 for mask in masks)
@@ -0,0 +1,85 @@
+"""迷宫文件读写：.mazb、.maz和文本格式往返后墙壁、起点、终点和标记不变"""
+
+import pytest
+
+from Maze_Simulation_v1 import Maze
+from maze_generators import generate_eller_file
+from maze_io import format_text, load_maze, parse_text, read_any, save_maze, write_maz, write_text
+
+
+def make_maze(rows, cols, seed=5):
+    maze = Maze(rows, cols, generate=False)
+    maze.generate_maze('kruskal', braid=0.3, seed=seed)
+    return maze
+
+
+def assert_same(loaded, maze, markers=True):
+    assert (loaded.rows, loaded.cols) == (maze.rows, maze.cols)
+    assert bytes(loaded.h_walls.data) == bytes(maze.h_walls.data)
+    assert bytes(loaded.v_walls.data) == bytes(maze.v_walls.data)
+    assert loaded.castle == maze.castle
+    assert loaded.goal == maze.goal
+    if markers:
+        assert loaded.numbered_squares == maze.numbered_squares
+        assert loaded.lettered_circles == maze.lettered_circles
+
+
+def test_exact_layout_round_trip(tmp_path):
+    maze = Maze()
+    for name in ('maze.mazb', 'maze.txt'):
+        path = str(tmp_path / name)
+        (save_maze if name.endswith('.mazb') else write_text)(maze, path)
+        assert_same(read_any(path), maze)
+
+
+@pytest.mark.parametrize('name', ['maze.mazb', 'maze.txt'])
+def test_shared_cells_round_trip(tmp_path, name):
+    maze = make_maze(5, 7)
+    maze.castle = maze.goal = (2, 3)
+    maze.numbered_squares = {1: (2, 3), 12: (0, 0), 3: (4, 6)}
+    maze.lettered_circles = {'A': (2, 3), 'B': (0, 0), 'C': (1, 1)}
+    path = str(tmp_path / name)
+    (save_maze if name.endswith('.mazb') else write_text)(maze, path)
+    assert_same(read_any(path), maze)
+
+
+@pytest.mark.parametrize('use_mmap', [True, False])
+def test_mazb_round_trip(tmp_path, use_mmap):
+    maze = make_maze(9, 4)
+    maze.numbered_squares = {1: (8, 0)}
+    maze.lettered_circles = {'D': (0, 3)}
+    path = str(tmp_path / 'maze.mazb')
+    save_maze(maze, path)
+    assert_same(load_maze(path, use_mmap=use_mmap), maze)
+
+
+def test_maz_round_trip(tmp_path):
+    # .maz只保存墙壁，起点和终点按电脑鼠比赛的约定（左下角、中心）
+    maze = make_maze(16, 16)
+    maze.castle, maze.goal = (15, 0), (8, 8)
+    path = str(tmp_path / 'maze.maz')
+    write_maz(maze, path)
+    assert_same(read_any(path), maze, markers=False)
+
+
+def test_text_rejects_reserved_letters():
+    maze = make_maze(3, 3)
+    maze.lettered_circles = {'S': (0, 0)}
+    with pytest.raises(ValueError):
+        format_text(maze)
+
+
+@pytest.mark.parametrize('rows, cols', [(1, 31), (1, 2), (3, 1), (4, 5)])
+def test_eller_file_keeps_castle_and_goal_apart(tmp_path, rows, cols):
+    path = str(tmp_path / 'eller.mazb')
+    castle, goal = generate_eller_file(path, rows, cols, seed=7)
+    assert castle != goal
+    maze = load_maze(path)
+    assert (maze.castle, maze.goal) == (castle, goal)
+    assert maze.shortest_path(castle, goal) is not None
+    assert_same(parse_text(format_text(maze)), maze)
+
+
+def test_eller_file_rejects_single_cell(tmp_path):
+    with pytest.raises(ValueError):
+        generate_eller_file(str(tmp_path / 'one.mazb'), 1, 1)
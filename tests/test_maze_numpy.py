@@ -0,0 +1,65 @@
+"""NumPy向量化的随机迷宫生成与纯Python版本逐位相同（没有安装numpy时跳过）"""
+
+import random
+import sys
+
+import pytest
+
+from Maze_Simulation_v1 import Maze
+
+pytest.importorskip('numpy')
+import maze_numpy  # noqa: E402
+
+SIZES = [(1, 6), (5, 1), (8, 8), (9, 13), (70, 70)]
+
+
+def pure_python_mazes(monkeypatch, seed, count, rows, cols):
+    """屏蔽maze_numpy后按random.seed(seed)依次生成count个随机迷宫"""
+    monkeypatch.setitem(sys.modules, 'maze_numpy', None)
+    random.seed(seed)
+    mazes = []
+    for _ in range(count):
+        maze = Maze(rows, cols, generate=False)
+        maze.generate_random_maze()
+        mazes.append(maze)
+    monkeypatch.delitem(sys.modules, 'maze_numpy')
+    return mazes
+
+
+def assert_same_maze(maze, expected):
+    assert maze.goal == expected.goal
+    assert maze.h_walls.data == expected.h_walls.data
+    assert maze.v_walls.data == expected.v_walls.data
+
+
+@pytest.mark.parametrize('rows, cols', SIZES)
+@pytest.mark.parametrize('seed', [0, 7, 2024])
+def test_generate_random_maze_matches_pure_python(monkeypatch, rows, cols, seed):
+    expected = pure_python_mazes(monkeypatch, seed, 1, rows, cols)[0]
+    after_pure = random.random()
+
+    random.seed(seed)
+    maze = Maze(rows, cols, generate=False)
+    maze.generate_random_maze()
+    assert_same_maze(maze, expected)
+    # WordStream把消费过的随机数写回Python，之后的随机数序列也一致
+    assert random.random() == after_pure
+
+
+@pytest.mark.parametrize('rows, cols', SIZES)
+def test_generate_random_mazes_matches_pure_python(monkeypatch, rows, cols):
+    expected = pure_python_mazes(monkeypatch, 5, 4, rows, cols)
+    mazes = list(maze_numpy.generate_random_mazes(4, rows, cols, seed=5))
+    assert len(mazes) == 4
+    for maze, reference in zip(mazes, expected):
+        assert_same_maze(maze, reference)
+
+
+def test_word_stream_matches_python_random():
+    rng = random.Random(11)
+    reference = random.Random(11)
+    stream = maze_numpy.WordStream(rng, chunk=16)
+    words = [int(word) for word in stream.take(40)]
+    assert words == [reference.getrandbits(32) for _ in range(40)]
+    stream.sync()
+    assert rng.random() == reference.random()
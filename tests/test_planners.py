@@ -0,0 +1,319 @@
+"""保存搜索状态的路径规划器：结果与BFS（或穷举）一致"""
+
+import itertools
+import random
+
+import pytest
+
+from Maze_Simulation_v1 import DIRECTION_DELTAS, Maze
+from algorithms import EXPLORATION_PENALTY, astar_path, jps_path
+from planners import (DEFAULT_TURN_COSTS, LANDMARK_QUERIES, DStarLite, HierarchicalPlanner, IncrementalFlood,
+                      distance_matrix, fastest_path, held_karp, improve_route, marker_route)
+from simulation import run_algorithm
+
+
+def enclosed_goal_mazes():
+    """终点到不了的迷宫：2x1迷宫中间有墙，以及5x5迷宫中心的终点被四面围住"""
+    narrow = Maze(2, 1, generate=False)
+    narrow.set_wall('horizontal', (1, 0))
+    walled = Maze(5, 5, generate=False)
+    walled.goal = (2, 2)
+    for kind, wall in (('horizontal', (2, 2)), ('horizontal', (3, 2)), ('vertical', (2, 2)), ('vertical', (2, 3))):
+        walled.set_wall(kind, wall)
+    for maze in (narrow, walled):
+        maze.save_as_original()
+    return [narrow, walled]
+
+
+def test_incremental_flood_matches_bfs():
+    rng = random.Random(4)
+    maze = Maze(9, 7, generate=False)
+    maze.generate_maze('kruskal', braid=0.4, seed=4)
+    flood = IncrementalFlood(maze.rows, maze.cols, [maze.goal])
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)]
+    rng.shuffle(cells)
+    for pos in cells:
+        # 按随机顺序把真实迷宫的墙告诉洪水填充，每次都与已知地图上的BFS比较
+        for direction in range(4):
+            if not (maze.get_open_mask(pos) >> direction) & 1:
+                flood.add_wall(pos, direction)
+        flood.update()
+        expected = flood.known.distance_map([maze.goal])
+        for cell in cells:
+            distance = expected[flood.known.to_index(cell)]
+            assert flood.distance(cell) == (None if distance < 0 else distance)
+
+
+def test_incremental_flood_isolated_cell():
+    flood = IncrementalFlood(2, 1, [(0, 0)])
+    assert flood.distance((1, 0)) == 1
+    flood.add_wall((1, 0), 0)
+    flood.update()
+    assert flood.distance((1, 0)) is None
+    assert flood.next_cell((1, 0), 0) is None
+
+
+@pytest.mark.parametrize('algorithm', ['micromouse', 'micromouse_2phase'])
+def test_flood_algorithms_stop_when_goal_is_enclosed(algorithm):
+    for maze in enclosed_goal_mazes():
+        result = run_algorithm(maze, algorithm, speed=1)
+        assert result['completed']
+        assert not result['reached_goal']
+
+
+def test_two_phase_micromouse_scores():
+    maze = Maze(8, 8, generate=False)
+    maze.generate_maze('kruskal', braid=0.3, seed=2)
+    maze.save_as_original()
+    result = run_algorithm(maze, 'micromouse_2phase', speed=5)
+    stats = result['stats']
+    assert result['reached_goal']
+    # 证明的最短步数与真实迷宫上的BFS一致，冲刺不会比它短
+    assert stats['optimum'] == len(maze.shortest_path(maze.castle, maze.goal)) - 1
+    assert stats['speed_run_steps'] >= stats['optimum']
+    assert stats['exploration_time'] > 0 and stats['speed_run_time'] > 0
+    assert stats['score'] == pytest.approx(stats['speed_run_time'] + stats['exploration_time'] / EXPLORATION_PENALTY)
+    assert stats['exploration_time'] + stats['speed_run_time'] == result['sim_time']
+
+
+def braided_maze(rows, cols, seed):
+    maze = Maze(rows, cols, generate=False)
+    maze.generate_maze('kruskal', braid=0.5, seed=seed)
+    return maze
+
+
+def test_one_shot_search_does_not_build_landmarks():
+    maze = braided_maze(12, 12, 1)
+    path = astar_path(maze, maze.castle, maze.goal)
+    assert len(path) == len(maze.shortest_path(maze.castle, maze.goal))
+    assert maze.landmarks is None
+
+
+@pytest.mark.parametrize('search', [astar_path, jps_path])
+def test_alt_paths_match_bfs_after_wall_edit(search):
+    rng = random.Random(9)
+    maze = braided_maze(12, 15, 9)
+    maze.get_landmarks()
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)]
+    for edit in range(6):
+        # 改一面墙后地标过期：先用曼哈顿距离，查询满LANDMARK_QUERIES次后重建地标
+        maze.set_wall(rng.choice(['horizontal', 'vertical']), (rng.randrange(1, 12), rng.randrange(1, 15)), edit % 2 == 0)
+        for query in range(LANDMARK_QUERIES + 2):
+            start, goal = rng.sample(cells, 2)
+            expected = maze.shortest_path(start, goal)
+            path = search(maze, start, goal)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert len(path) == len(expected)
+        assert maze.landmarks.version == maze.version
+
+
+def assert_valid_path(maze, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for current, following in zip(path, path[1:]):
+        assert maze.is_valid_move_between(current, following)
+
+
+@pytest.mark.parametrize('spacing, slack', [(1, 1.0), (4, 1.25)])
+def test_hierarchical_paths_after_wall_edits(spacing, slack):
+    rng = random.Random(spacing)
+    maze = braided_maze(40, 40, spacing)
+    planner = HierarchicalPlanner(maze, 8, spacing)
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)]
+    total = optimal = 0
+    for edit in range(10):
+        # 墙壁监听器只重建墙边所在的簇，路径仍然要合法；入口间距为1时与BFS等长
+        maze.set_wall(rng.choice(['horizontal', 'vertical']), (rng.randrange(1, 40), rng.randrange(1, 40)), edit % 2 == 0)
+        for query in range(10):
+            start, goal = rng.sample(cells, 2)
+            expected = maze.shortest_path(start, goal)
+            path = planner.find_path(start, goal)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert_valid_path(maze, path, start, goal)
+                assert len(path) <= (len(expected) - 1) * slack + 1
+                total += len(path) - 1
+                optimal += len(expected) - 1
+    assert total <= optimal * (1 + (slack - 1) / 5)
+
+
+def test_hpa_follows_path_across_clusters():
+    # 比默认簇大两倍多，机器人沿抽象路径逐段还原、逐格移动
+    maze = braided_maze(70, 70, 3)
+    maze.save_as_original()
+    result = run_algorithm(maze, 'hpa', speed=5)
+    assert result['reached_goal']
+    assert result['steps'] <= (len(maze.shortest_path(maze.castle, maze.goal)) - 1) * 1.25
+
+
+@pytest.mark.parametrize('braid', [0.0, 0.5])
+def test_junction_paths_match_bfs(braid):
+    rng = random.Random(7)
+    maze = Maze(14, 17, generate=False)
+    maze.generate_maze('kruskal', braid=braid, seed=7)
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)]
+    for edit in range(6):
+        for query in range(15):
+            # 同一张图上的查询共用已经追踪过的走廊
+            start, goal = rng.sample(cells, 2)
+            expected = maze.shortest_path(start, goal)
+            path = maze.get_junction_graph().find_path(start, goal)
+            assert (path is None) == (expected is None)
+            if path is not None:
+                assert_valid_path(maze, path, start, goal)
+                assert len(path) == len(expected)
+        maze.set_wall(rng.choice(['horizontal', 'vertical']), (rng.randrange(1, 14), rng.randrange(1, 17)), edit % 2 == 1)
+
+
+def test_junction_path_on_loop_without_nodes():
+    # 没有内墙的2x2迷宫是一个环路，每个格子都有两个通路；去掉特殊标记后起点和终点都不是节点
+    maze = Maze(2, 2, generate=False)
+    graph = maze.get_junction_graph()
+    graph.specials.clear()
+    assert len(graph.find_path((0, 0), (1, 1))) == 3
+    assert graph.find_path((0, 1), (0, 0)) == [(0, 1), (0, 0)]
+
+
+def dstar_route(maze, planner, start):
+    """沿D* Lite的next_cell从start走到终点，返回经过的格子（含起点），到不了时返回None"""
+    route = [start]
+    while route[-1] != maze.goal and len(route) <= maze.rows * maze.cols:
+        following = planner.next_cell(route[-1])
+        if following is None:
+            return None
+        assert maze.is_valid_move_between(route[-1], following)
+        route.append(following)
+    return route
+
+
+def test_dstar_lite_replans_after_wall_edits():
+    rng = random.Random(5)
+    maze = braided_maze(15, 15, 5)
+    position = maze.castle
+    planner = DStarLite(maze, position, maze.goal)
+    route = dstar_route(maze, planner, position)
+    for edit in range(12):
+        # 大多数时候堵住计划路线上的一条边，偶尔拆掉一面墙；机器人每次前进一格
+        if edit % 3 != 2 and len(route) > 2:
+            index = rng.randrange(1, len(route) - 1)
+            maze.set_wall(*maze.wall_between(route[index], route[index + 1]))
+        else:
+            maze.set_wall(rng.choice(['horizontal', 'vertical']), (rng.randrange(1, 15), rng.randrange(1, 15)), False)
+        route = dstar_route(maze, planner, position)
+        expected = maze.shortest_path(position, maze.goal)
+        assert (route is None) == (expected is None)
+        if route is None:
+            break
+        assert len(route) == len(expected)
+        if len(route) > 2:
+            position = route[1]
+    planner.close()
+
+
+def brute_force_route(matrix):
+    """枚举中间点的全部排列，返回最短总长"""
+    last = len(matrix) - 1
+    return min(sum(matrix[a][b] for a, b in zip((0, *order), (*order, last)))
+               for order in itertools.permutations(range(1, last)))
+
+
+@pytest.mark.parametrize('count', [0, 1, 2, 4, 6])
+def test_held_karp_is_optimal(count):
+    rng = random.Random(count)
+    maze = braided_maze(12, 12, count)
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)]
+    for trial in range(3):
+        matrix = distance_matrix(maze, rng.sample(cells, count + 2))
+        order, total = held_karp(matrix)
+        assert sorted(order) == list(range(1, count + 1))
+        assert total == sum(matrix[a][b] for a, b in zip([0, *order], [*order, count + 1]))
+        assert total == brute_force_route(matrix)
+        # 从打乱的顺序出发，局部改进得到合法的排列，而且不会比最优更短
+        shuffled = rng.sample(range(1, count + 1), count)
+        improved, improved_total = improve_route(matrix, shuffled)
+        assert sorted(improved) == list(range(1, count + 1))
+        assert total <= improved_total <= sum(matrix[a][b] for a, b in zip([0, *shuffled], [*shuffled, count + 1]))
+
+
+def test_marker_route_visits_markers_in_order():
+    rng = random.Random(3)
+    maze = braided_maze(14, 14, 3)
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)
+             if (row, col) not in (maze.castle, maze.goal)]
+    markers = dict(zip('12345', rng.sample(cells, 5)))
+    names, path, total = marker_route(maze, maze.castle, maze.goal, markers)
+    assert_valid_path(maze, path, maze.castle, maze.goal)
+    assert len(path) - 1 == total
+    assert total == brute_force_route(distance_matrix(maze, [maze.castle, *markers.values(), maze.goal]))
+    # 按返回的顺序依次经过每个标记
+    position = 0
+    for name in names:
+        position = path.index(markers[name], position)
+    assert sorted(names) == sorted(markers)
+
+
+def timed_cost(cells, heading, costs):
+    """沿逐格路径行驶的用时：每一步先原地转到前进方向（90度，掉头取一次掉头和两次90度中较快的），再前进一格"""
+    u_turn = min(costs['u_turn'], costs['turn'] * 2)
+    total = 0
+    for (row, col), (next_row, next_col) in zip(cells, cells[1:]):
+        direction = DIRECTION_DELTAS.index((next_row - row, next_col - col))
+        turn = (direction - heading) % 4
+        total += (0, costs['turn'], u_turn, costs['turn'])[turn] + costs['forward']
+        heading = direction
+    return total
+
+
+@pytest.mark.parametrize('costs', [None, {'turn': 2.0, 'u_turn': 3.0}, {'turn': 0.0, 'u_turn': 0.0}])
+def test_fastest_path_is_no_slower_than_bfs(costs):
+    rng = random.Random(6)
+    maze = braided_maze(12, 12, 6)
+    prices = dict(DEFAULT_TURN_COSTS, **(costs or {}))
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)]
+    for query in range(20):
+        start, goal = rng.sample(cells, 2)
+        heading = rng.randrange(4)
+        actions, route, cost = fastest_path(maze, start, heading, goal, costs)
+        assert_valid_path(maze, route, start, goal)
+        # 返回的代价就是沿返回路线行驶的用时，而且不比BFS最短路线慢
+        assert cost == pytest.approx(timed_cost(route, heading, prices))
+        assert actions.count('forward') == len(route) - 1
+        assert cost <= timed_cost(maze.shortest_path(start, goal), heading, prices) + 1e-9
+        if not prices['turn'] and not prices['u_turn']:
+            assert len(route) == len(maze.shortest_path(start, goal))
+
+
+def test_frontier_exploration_covers_reachable_cells():
+    maze = braided_maze(10, 12, 4)
+    maze.save_as_original()
+    mazes = [(maze, True)] + [(enclosed, False) for enclosed in enclosed_goal_mazes()]
+    for maze, reachable in mazes:
+        # 探索完能到达的每一个格子后才前往终点；终点被围住时探索完就结束
+        result = run_algorithm(maze, 'explore', speed=5)
+        stats = result['stats']
+        assert result['completed'] and result['reached_goal'] == reachable
+        assert stats['explored'] == sum(distance >= 0 for distance in maze.distance_map([maze.robot_pos]))
+        assert stats['travel_per_cell'] == pytest.approx(stats['travel'] / stats['explored'])
+
+
+@pytest.mark.parametrize('braid', [None, 1.0, 0.0])
+def test_jps_matches_bfs_with_fewer_expansions(braid):
+    rng = random.Random(2)
+    maze = Maze(20, 20, generate=False)
+    if braid is not None:
+        maze.generate_maze('prim', braid=braid, seed=2)
+    cells = [(row, col) for row in range(maze.rows) for col in range(maze.cols)]
+    astar_stats, jps_stats = {}, {}
+    for query in range(30):
+        start, goal = rng.sample(cells, 2)
+        path = jps_path(maze, start, goal, jps_stats)
+        assert_valid_path(maze, path, start, goal)
+        assert len(path) == len(maze.shortest_path(start, goal))
+        astar_path(maze, start, goal, astar_stats)
+    # 空旷和有环的迷宫中跳点比A*展开的格子少得多，完美迷宫中至少不会更多
+    if braid is None:
+        assert jps_stats['expanded'] * 5 < astar_stats['expanded']
+    elif braid:
+        assert jps_stats['expanded'] < astar_stats['expanded']
+    else:
+        assert jps_stats['expanded'] <= astar_stats['expanded']